@@ -1,20 +1,38 @@
+"""
 PRO TRADE ULTIMATE v2.0
 מערכת מסחר וניתוח מתקדמת בזמן אמת
-“””
+"""
 
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import yfinance as yf
+import sys
 from datetime import datetime, timedelta
 
 # Import custom utilities
 
 from utils import (
-StockAnalyzer, MarketData, NewsProvider, Portfolio,
-convert_df_to_csv, get_color_for_value
+    StockAnalyzer, MarketData, NewsProvider, Portfolio,
+    convert_df_to_csv, get_color_for_value
 )
+from backtest import Backtester, DEFAULT_COST_BPS
+from bars import INTERVALS
+from charts import CHART_BUILDER
+from jobs import JOBS
+from panel import PanelIndicators
+from scans import scan_job
+from scoring import SCANNER_RULES, rule_columns
+from screener import compile_query, QueryError
+from shared_cache import MARKET_CACHE
+from signals import SIGNAL_RULES
+from sweep import DEFAULT_SPACE, ParameterSweep, grid, sample
+
+# רענון גרף תוך-יומי במצב Live
+LIVE_REFRESH_SECONDS = 5
+# רענון ההתקדמות של סריקות שרצות ברקע (רק קטע ההתקדמות והטבלה רץ מחדש)
+JOB_REFRESH_SECONDS = 1
+# סימבולים בכל קבוצה של סריקה ברקע - התוצאות החלקיות מתעדכנות אחרי כל קבוצה
+SCAN_BATCH_SIZE = 25
 
 # ═══════════════════════════════════════════════════════════
 
@@ -23,10 +41,10 @@ convert_df_to_csv, get_color_for_value
 # ═══════════════════════════════════════════════════════════
 
 st.set_page_config(
-page_title=“ProTrade Ultimate v2.0”,
-layout=“wide”,
-page_icon=“📈”,
-initial_sidebar_state=“expanded”
+    page_title="ProTrade Ultimate v2.0",
+    layout="wide",
+    page_icon="📈",
+    initial_sidebar_state="expanded"
 )
 
 # ═══════════════════════════════════════════════════════════
@@ -35,14 +53,16 @@ initial_sidebar_state=“expanded”
 
 # ═══════════════════════════════════════════════════════════
 
-if ‘portfolio’ not in st.session_state:
-st.session_state.portfolio = {}
-if ‘watchlist’ not in st.session_state:
-st.session_state.watchlist = [‘NVDA’, ‘AAPL’, ‘TSLA’]
-if ‘alerts’ not in st.session_state:
-st.session_state.alerts = {}
-if ‘theme’ not in st.session_state:
-st.session_state.theme = ‘dark’
+if 'portfolio' not in st.session_state:
+    st.session_state.portfolio = {}
+if 'watchlist' not in st.session_state:
+    st.session_state.watchlist = ['NVDA', 'AAPL', 'TSLA']
+if 'alerts' not in st.session_state:
+    st.session_state.alerts = {}
+if 'theme' not in st.session_state:
+    st.session_state.theme = 'dark'
+if 'saved_screens' not in st.session_state:
+    st.session_state.saved_screens = {}
 
 # ═══════════════════════════════════════════════════════════
 
@@ -51,9 +71,9 @@ st.session_state.theme = ‘dark’
 # ═══════════════════════════════════════════════════════════
 
 def get_css():
-return “””
+    return """
 <style>
-@import url(‘https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap’);
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;600;700&display=swap');
 
 
     * {
@@ -235,7 +255,7 @@ st.markdown(get_css(), unsafe_allow_html=True)
 # ═══════════════════════════════════════════════════════════
 
 ticker_html = MarketData.get_ticker_data()
-st.markdown(f”””
+st.markdown(f"""
 
 <div class="ticker-wrap">
     <div class="ticker">{ticker_html}</div>
@@ -249,59 +269,66 @@ st.markdown(f”””
 # ═══════════════════════════════════════════════════════════
 
 with st.sidebar:
-st.image(“https://img.icons8.com/fluency/96/000000/stock-market.png”, width=80)
-st.title(“ProTrade v2.0”)
-st.markdown(”—”)
-
-
-# Quick Stats
-st.subheader("📊 Quick Stats")
-try:
-    sp500 = yf.Ticker("^GSPC")
-    sp_data = sp500.history(period="1d")
-    if not sp_data.empty:
-        sp_price = sp_data['Close'].iloc[-1]
-        sp_change = ((sp_data['Close'].iloc[-1] - sp_data['Open'].iloc[0]) / sp_data['Open'].iloc[0]) * 100
-        st.metric("S&P 500", f"${sp_price:,.0f}", f"{sp_change:.2f}%")
-except:
-    st.metric("S&P 500", "Loading...")
+    st.image("https://img.icons8.com/fluency/96/000000/stock-market.png", width=80)
+    st.title("ProTrade v2.0")
+    st.markdown("---")
 
-st.markdown("---")
+    # Quick Stats
+    st.subheader("📊 Quick Stats")
+    try:
+        sp_quote = MarketData.get_index_quotes(("^GSPC",)).get("^GSPC")
+        if sp_quote:
+            sp_price, sp_change = sp_quote
+            st.metric("S&P 500", f"${sp_price:,.0f}", f"{sp_change:.2f}%")
+    except:
+        st.metric("S&P 500", "Loading...")
 
-# Watchlist Management
-st.subheader("⭐ Watchlist")
-new_symbol = st.text_input("Add Symbol:", placeholder="AAPL").upper()
-if st.button("➕ Add to Watchlist") and new_symbol:
-    if new_symbol not in st.session_state.watchlist:
-        st.session_state.watchlist.append(new_symbol)
-        st.success(f"✅ {new_symbol} added!")
-        st.rerun()
+    st.markdown("---")
 
-# Display watchlist
-if st.session_state.watchlist:
-    for idx, sym in enumerate(st.session_state.watchlist):
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.write(f"🔹 {sym}")
-        with col2:
-            if st.button("❌", key=f"remove_{sym}"):
-                st.session_state.watchlist.remove(sym)
-                st.rerun()
+    # Watchlist Management
+    st.subheader("⭐ Watchlist")
+    new_symbol = st.text_input("Add Symbol:", placeholder="AAPL").upper()
+    if st.button("➕ Add to Watchlist") and new_symbol:
+        if new_symbol not in st.session_state.watchlist:
+            st.session_state.watchlist.append(new_symbol)
+            st.success(f"✅ {new_symbol} added!")
+            st.rerun()
+
+    # Display watchlist
+    if st.session_state.watchlist:
+        for idx, sym in enumerate(st.session_state.watchlist):
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.write(f"🔹 {sym}")
+            with col2:
+                if st.button("❌", key=f"remove_{sym}"):
+                    st.session_state.watchlist.remove(sym)
+                    st.rerun()
 
-st.markdown("---")
+    st.markdown("---")
 
-# Market Status
-st.subheader("🕐 Market Status")
-now = datetime.now()
-market_open = now.replace(hour=9, minute=30, second=0)
-market_close = now.replace(hour=16, minute=0, second=0)
+    # Market Status
+    st.subheader("🕐 Market Status")
+    now = datetime.now()
+    market_open = now.replace(hour=9, minute=30, second=0)
+    market_close = now.replace(hour=16, minute=0, second=0)
 
-if market_open <= now <= market_close and now.weekday() < 5:
-    st.success("🟢 Market OPEN")
-else:
-    st.error("🔴 Market CLOSED")
+    if market_open <= now <= market_close and now.weekday() < 5:
+        st.success("🟢 Market OPEN")
+    else:
+        st.error("🔴 Market CLOSED")
 
-st.caption(f"🕐 {now.strftime('%H:%M:%S')}")
+    st.caption(f"🕐 {now.strftime('%H:%M:%S')}")
+
+    # Cache Stats - לכיול תקציב הזיכרון לפי העומס
+    with st.expander("🧮 Cache Stats"):
+        history_stats = MarketData.HISTORY.stats()
+        st.caption(f"History: {history_stats['entries']} symbols, "
+                   f"{history_stats['bytes'] / 2**20:.1f}/{history_stats['max_bytes'] / 2**20:.0f} MB, "
+                   f"indicator state: {len(MarketData.INDICATORS)} symbols")
+        st.json(history_stats)
+        st.json(MarketData.BARS.stats())
+        st.json(MARKET_CACHE.stats())
 
 
 # ═══════════════════════════════════════════════════════════
@@ -312,12 +339,13 @@ st.caption(f"🕐 {now.strftime('%H:%M:%S')}")
 
 col1, col2 = st.columns([4, 1])
 with col1:
-st.title(“📈 PRO TRADE TERMINAL”)
-st.caption(“Advanced Trading & Analysis Platform | Real-time Market Data”)
+    st.title("📈 PRO TRADE TERMINAL")
+    st.caption("Advanced Trading & Analysis Platform | Real-time Market Data")
 with col2:
-if st.button(“🔄 Refresh All”, use_container_width=True):
-st.cache_data.clear()
-st.rerun()
+    if st.button("🔄 Refresh All", use_container_width=True):
+        MARKET_CACHE.clear()
+        MarketData.HISTORY.invalidate()
+        st.rerun()
 
 # ═══════════════════════════════════════════════════════════
 
@@ -326,14 +354,136 @@ st.rerun()
 # ═══════════════════════════════════════════════════════════
 
 tabs = st.tabs([
-“📊 Trading Terminal”,
-“🔍 Market Scanner”,
-“💼 Portfolio Tracker”,
-“📰 News & Insights”,
-“🎯 Screener Pro”,
-“📚 Market Overview”
+    "📊 Trading Terminal",
+    "🔍 Market Scanner",
+    "💼 Portfolio Tracker",
+    "📰 News & Insights",
+    "🎯 Screener Pro",
+    "📚 Market Overview",
+    "🧪 Backtest"
 ])
 
+# רענון חי של גרף תוך-יומי: רק הקטע הזה רץ מחדש כל LIVE_REFRESH_SECONDS (לא כל הטאבים),
+# ורק נרות חדשים יורדים ל-ring buffer בכל סבב
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_chart(symbol, period, interval, chart_options):
+    live_df = MarketData.get_intraday_data(symbol, interval=interval, period=period)
+    if live_df is None or live_df.empty:
+        st.warning(f"⚠️ No live bars for {symbol}")
+        return
+    fig = CHART_BUILDER.build(symbol, (period, interval), live_df, **chart_options)
+    st.plotly_chart(fig, use_container_width=True)
+
+# סריקות ברקע: רק קטע ההתקדמות והתוצאות החלקיות רץ מחדש כל JOB_REFRESH_SECONDS, לא כל הסקריפט.
+# כשהעבודה מסתיימת - rerun מלא אחד שמציג את המצב הסופי ומפסיק את הרענון
+def job_panel(render, job):
+    panel = st.fragment(run_every=JOB_REFRESH_SECONDS)(render) if job.active else render
+    panel(job.id, job.active)
+
+def scan_job_panel(job_id, live):
+    scan_job_state = JOBS.get(job_id)
+    if scan_job_state is None:
+        return
+    if live and not scan_job_state.active:
+        st.rerun()
+    results_df = scan_job_state.results('scanner')
+    if not results_df.empty:
+        results_df = results_df.sort_values('Score', ascending=False, kind='stable')
+    
+    if scan_job_state.active:
+        progress_col, cancel_col = st.columns([4, 1])
+        with progress_col:
+            st.progress(scan_job_state.progress,
+                        text=f"🔎 Scanning... {scan_job_state.done}/{scan_job_state.total} symbols")
+        with cancel_col:
+            if st.button("⏹ Cancel", key='scan_cancel', use_container_width=True):
+                JOBS.cancel(scan_job_state.id)
+    elif scan_job_state.status == 'failed':
+        st.error(f"❌ Scanner error: {scan_job_state.error}")
+    elif scan_job_state.status == 'cancelled':
+        st.info(f"⏹ Scan cancelled after {scan_job_state.done}/{scan_job_state.total} symbols")
+    elif not results_df.empty:
+        st.success(f"✅ Found {len(results_df)} opportunities!")
+    else:
+        st.warning("⚠️ No stocks matched your criteria. Try adjusting the filters.")
+    for error in scan_job_state.errors:
+        st.error(f"❌ Scanner error: {error}")
+    
+    if not results_df.empty:
+        # Display results (partial while the job is running)
+        st.dataframe(
+            results_df.style.format({
+                'Price': '${:.2f}',
+                'Change %': '{:+.2f}%',
+                'RSI': '{:.1f}',
+                'Volume': '{:.1f}M'
+            }).map(
+                lambda v: 'color: #00ff88; font-weight: bold' if 'Strong Buy' in str(v) 
+                else 'color: #ffc800; font-weight: bold' if 'Buy' in str(v)
+                else '', subset=['Rating']
+            ),
+            use_container_width=True,
+            height=500
+        )
+        
+        if not scan_job_state.active:
+            # Export
+            scan_csv = convert_df_to_csv(results_df)
+            st.download_button(
+                "📥 Export Results",
+                scan_csv,
+                f"scan_results_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                "text/csv"
+            )
+
+def screen_job_panel(job_id, live):
+    screen_job_state = JOBS.get(job_id)
+    if screen_job_state is None:
+        return
+    if live and not screen_job_state.active:
+        st.rerun()
+    results_df = screen_job_state.results('screener')
+    
+    if screen_job_state.active:
+        progress_col, cancel_col = st.columns([4, 1])
+        with progress_col:
+            st.progress(screen_job_state.progress,
+                        text=f"🔎 Screening... {screen_job_state.done}/{screen_job_state.total} stocks")
+        with cancel_col:
+            if st.button("⏹ Cancel", key='screen_cancel', use_container_width=True):
+                JOBS.cancel(screen_job_state.id)
+    elif screen_job_state.status == 'failed':
+        st.error(f"❌ Screener error: {screen_job_state.error}")
+    elif screen_job_state.status == 'cancelled':
+        st.info(f"⏹ Screen cancelled after {screen_job_state.done}/{screen_job_state.total} stocks")
+    elif not results_df.empty:
+        st.success(f"✅ {len(results_df)} stocks passed all filters!")
+    else:
+        st.warning("⚠️ No stocks matched all criteria. Try relaxing some filters.")
+    for error in screen_job_state.errors:
+        st.error(f"❌ Screener error: {error}")
+    
+    if not results_df.empty:
+        st.dataframe(
+            results_df.style.format({
+                'Price': '${:.2f}',
+                'RSI': '{:.1f}',
+                'Volume (M)': '{:.1f}M',
+                'SMA200': '${:.2f}',
+                'Distance from SMA200 (%)': '{:+.2f}%'
+            }),
+            use_container_width=True
+        )
+        
+        if not screen_job_state.active:
+            csv = convert_df_to_csv(results_df)
+            st.download_button(
+                "📥 Download Screener Results",
+                csv,
+                f"screener_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                "text/csv"
+            )
+
 # ═══════════════════════════════════════════════════════════
 
 # TAB 1: TRADING TERMINAL
@@ -341,217 +491,146 @@ tabs = st.tabs([
 # ═══════════════════════════════════════════════════════════
 
 with tabs[0]:
-col_select, col_info = st.columns([1, 2])
-
-
-with col_select:
-    st.subheader("🎯 Select Asset")
-    
-    # Category selection
-    category = st.selectbox("Category:", list(MarketData.POPULAR_STOCKS.keys()))
-    symbol = st.selectbox("Symbol:", MarketData.POPULAR_STOCKS[category])
-    
-    # Time range
-    period = st.select_slider(
-        "Time Range:",
-        options=['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y'],
-        value='1y'
-    )
+    col_select, col_info = st.columns([1, 2])
 
-# Fetch data
-with st.spinner(f"⏳ Loading {symbol} data..."):
-    df = MarketData.get_stock_data(symbol, period=period)
-    stock_info = MarketData.get_stock_info(symbol)
-
-if df is not None and not df.empty:
-    # Current metrics
-    current_price = df['Close'].iloc[-1]
-    open_price = df['Open'].iloc[-1]
-    high_price = df['High'].iloc[-1]
-    low_price = df['Low'].iloc[-1]
-    volume = df['Volume'].iloc[-1]
-    
-    change = current_price - open_price
-    change_pct = (change / open_price) * 100
-    
-    # Key Metrics Row
-    st.markdown("### 📈 Key Metrics")
-    m1, m2, m3, m4, m5 = st.columns(5)
-    
-    m1.metric("Price", f"${current_price:,.2f}", f"{change_pct:+.2f}%")
-    m2.metric("High", f"${high_price:,.2f}")
-    m3.metric("Low", f"${low_price:,.2f}")
-    m4.metric("Volume", f"{volume/1_000_000:.1f}M")
-    m5.metric("RSI", f"{df['RSI'].iloc[-1]:.1f}")
-    
-    # Technical Indicators Row
-    st.markdown("### 🔧 Technical Indicators")
-    t1, t2, t3, t4 = st.columns(4)
-    
-    t1.metric("SMA 50", f"${df['SMA50'].iloc[-1]:,.2f}", 
-             "Bullish ✅" if current_price > df['SMA50'].iloc[-1] else "Bearish ⚠️")
-    t2.metric("SMA 200", f"${df['SMA200'].iloc[-1]:,.2f}",
-             "Bullish ✅" if current_price > df['SMA200'].iloc[-1] else "Bearish ⚠️")
-    t3.metric("MACD", f"{df['MACD'].iloc[-1]:.2f}")
-    t4.metric("ATR", f"${df['ATR'].iloc[-1]:.2f}")
-    
-    # Stock Info
-    if stock_info:
-        st.markdown("### ℹ️ Company Information")
-        i1, i2, i3, i4 = st.columns(4)
-        i1.metric("Market Cap", f"${stock_info['marketCap']/1e9:.1f}B" if stock_info['marketCap'] > 0 else "N/A")
-        i2.metric("P/E Ratio", f"{stock_info['pe_ratio']:.2f}" if stock_info['pe_ratio'] else "N/A")
-        i3.metric("52W High", f"${stock_info['52w_high']:,.2f}" if stock_info['52w_high'] > 0 else "N/A")
-        i4.metric("52W Low", f"${stock_info['52w_low']:,.2f}" if stock_info['52w_low'] > 0 else "N/A")
-        
-        st.caption(f"**Sector:** {stock_info['sector']} | **Industry:** {stock_info['industry']}")
-    
-    st.markdown("---")
-    
-    # Trading Signals
-    signals = StockAnalyzer.detect_signals(df)
-    if signals:
-        st.markdown("### 🎯 Trading Signals")
-        sig_cols = st.columns(2)
-        for idx, (signal_type, description) in enumerate(signals):
-            with sig_cols[idx % 2]:
-                signal_class = "signal-buy" if "🟢" in signal_type else "signal-sell" if "🔴" in signal_type else "signal-neutral"
-                st.markdown(f"""
-                <div class="signal-card {signal_class}">
-                    <strong>{signal_type}</strong><br>
-                    <small>{description}</small>
-                </div>
-                """, unsafe_allow_html=True)
+    with col_select:
+        st.subheader("🎯 Select Asset")
     
-    st.markdown("---")
+        # Category selection
+        category = st.selectbox("Category:", list(MarketData.POPULAR_STOCKS.keys()))
+        symbol = st.selectbox("Symbol:", MarketData.POPULAR_STOCKS[category])
     
-    # Chart Options
-    chart_col1, chart_col2 = st.columns([3, 1])
-    with chart_col2:
-        st.subheader("Chart Settings")
-        show_sma = st.checkbox("SMA 50/200", value=True)
-        show_bb = st.checkbox("Bollinger Bands", value=False)
-        show_volume = st.checkbox("Volume", value=True)
-        show_rsi = st.checkbox("RSI", value=False)
-    
-    # Create Interactive Chart
-    with chart_col1:
-        st.subheader(f"📊 {symbol} Technical Chart")
-    
-    # Determine number of rows
-    rows = 1
-    row_heights = [0.7]
-    if show_volume:
-        rows += 1
-        row_heights.append(0.15)
-    if show_rsi:
-        rows += 1
-        row_heights.append(0.15)
-    
-    fig = make_subplots(
-        rows=rows, cols=1,
-        shared_xaxes=True,
-        vertical_spacing=0.03,
-        row_heights=row_heights,
-        subplot_titles=(f'{symbol} Price', 'Volume' if show_volume else '', 'RSI' if show_rsi else '')
-    )
+        # Time range
+        period = st.select_slider(
+            "Time Range:",
+            options=['1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y'],
+            value='1y'
+        )
     
-    # Candlestick
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
-            name='Price',
-            increasing_line_color='#00ff88',
-            decreasing_line_color='#ff0055'
-        ),
-        row=1, col=1
-    )
+        # Bar interval - תוך-יומי נטען מה-ring buffer ומתעדכן בלי להוריד את כל הסשן
+        interval = st.selectbox("Interval:", INTERVALS, index=0)
+        live_refresh = interval != '1d' and st.checkbox(f"🔴 Live (every {LIVE_REFRESH_SECONDS}s)", value=False)
+
+    # Fetch data
+    with st.spinner(f"⏳ Loading {symbol} data..."):
+        if interval == '1d':
+            df = MarketData.get_stock_data(symbol, period=period)
+        else:
+            df = MarketData.get_intraday_data(symbol, interval=interval, period=period)
+        stock_info = MarketData.get_stock_info(symbol)
+
+    if df is not None and not df.empty:
+        # Current metrics
+        current_price = df['Close'].iloc[-1]
+        open_price = df['Open'].iloc[-1]
+        high_price = df['High'].iloc[-1]
+        low_price = df['Low'].iloc[-1]
+        volume = df['Volume'].iloc[-1]
+    
+        change = current_price - open_price
+        change_pct = (change / open_price) * 100
+    
+        # Key Metrics Row
+        st.markdown("### 📈 Key Metrics")
+        m1, m2, m3, m4, m5 = st.columns(5)
+    
+        m1.metric("Price", f"${current_price:,.2f}", f"{change_pct:+.2f}%")
+        m2.metric("High", f"${high_price:,.2f}")
+        m3.metric("Low", f"${low_price:,.2f}")
+        m4.metric("Volume", f"{volume/1_000_000:.1f}M")
+        m5.metric("RSI", f"{df['RSI'].iloc[-1]:.1f}")
+    
+        # Technical Indicators Row
+        st.markdown("### 🔧 Technical Indicators")
+        t1, t2, t3, t4 = st.columns(4)
+    
+        t1.metric("SMA 50", f"${df['SMA50'].iloc[-1]:,.2f}", 
+                 "Bullish ✅" if current_price > df['SMA50'].iloc[-1] else "Bearish ⚠️")
+        t2.metric("SMA 200", f"${df['SMA200'].iloc[-1]:,.2f}",
+                 "Bullish ✅" if current_price > df['SMA200'].iloc[-1] else "Bearish ⚠️")
+        t3.metric("MACD", f"{df['MACD'].iloc[-1]:.2f}")
+        t4.metric("ATR", f"${df['ATR'].iloc[-1]:.2f}")
+    
+        # Stock Info
+        if stock_info:
+            st.markdown("### ℹ️ Company Information")
+            i1, i2, i3, i4 = st.columns(4)
+            i1.metric("Market Cap", f"${stock_info['marketCap']/1e9:.1f}B" if stock_info['marketCap'] > 0 else "N/A")
+            i2.metric("P/E Ratio", f"{stock_info['pe_ratio']:.2f}" if stock_info['pe_ratio'] else "N/A")
+            i3.metric("52W High", f"${stock_info['52w_high']:,.2f}" if stock_info['52w_high'] > 0 else "N/A")
+            i4.metric("52W Low", f"${stock_info['52w_low']:,.2f}" if stock_info['52w_low'] > 0 else "N/A")
+        
+            st.caption(f"**Sector:** {stock_info['sector']} | **Industry:** {stock_info['industry']}")
     
-    # SMAs
-    if show_sma:
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA50'], 
-                                line=dict(color='#00ccff', width=1.5),
-                                name='SMA 50'), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['SMA200'],
-                                line=dict(color='#ff0055', width=1.5),
-                                name='SMA 200'), row=1, col=1)
-    
-    # Bollinger Bands
-    if show_bb:
-        fig.add_trace(go.Scatter(x=df.index, y=df['BB_high'],
-                                line=dict(color='rgba(255,255,255,0.2)', width=1, dash='dash'),
-                                name='BB Upper'), row=1, col=1)
-        fig.add_trace(go.Scatter(x=df.index, y=df['BB_low'],
-                                line=dict(color='rgba(255,255,255,0.2)', width=1, dash='dash'),
-                                fill='tonexty', fillcolor='rgba(255,255,255,0.05)',
-                                name='BB Lower'), row=1, col=1)
-    
-    # Volume
-    current_row = 2
-    if show_volume:
-        colors = ['#00ff88' if row['Close'] >= row['Open'] else '#ff0055' 
-                 for _, row in df.iterrows()]
-        fig.add_trace(
-            go.Bar(x=df.index, y=df['Volume'], name='Volume',
-                  marker_color=colors, opacity=0.7),
-            row=current_row, col=1
-        )
-        current_row += 1
-    
-    # RSI
-    if show_rsi:
-        fig.add_trace(
-            go.Scatter(x=df.index, y=df['RSI'], line=dict(color='#ffc800', width=2),
-                      name='RSI'),
-            row=current_row, col=1
-        )
-        # RSI levels
-        fig.add_hline(y=70, line_dash="dash", line_color="red", opacity=0.5, row=current_row, col=1)
-        fig.add_hline(y=30, line_dash="dash", line_color="green", opacity=0.5, row=current_row, col=1)
-    
-    # Layout
-    fig.update_layout(
-        template='plotly_dark',
-        height=700,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        xaxis_rangeslider_visible=False,
-        hovermode='x unified',
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
+        st.markdown("---")
     
-    fig.update_xaxes(gridcolor='rgba(255,255,255,0.1)')
-    fig.update_yaxes(gridcolor='rgba(255,255,255,0.1)')
+        # Trading Signals
+        signals = StockAnalyzer.detect_signals(df)
+        if signals:
+            st.markdown("### 🎯 Trading Signals")
+            sig_cols = st.columns(2)
+            for idx, (signal_type, description) in enumerate(signals):
+                with sig_cols[idx % 2]:
+                    signal_class = "signal-buy" if "🟢" in signal_type else "signal-sell" if "🔴" in signal_type else "signal-neutral"
+                    st.markdown(f"""
+                    <div class="signal-card {signal_class}">
+                        <strong>{signal_type}</strong><br>
+                        <small>{description}</small>
+                    </div>
+                    """, unsafe_allow_html=True)
     
-    st.plotly_chart(fig, use_container_width=True)
+        st.markdown("---")
     
-    # Export Options
-    st.markdown("---")
-    export_col1, export_col2 = st.columns(2)
-    with export_col1:
-        csv_data = convert_df_to_csv(df)
-        st.download_button(
-            label="📥 Download Data (CSV)",
-            data=csv_data,
-            file_name=f"{symbol}_data_{datetime.now().strftime('%Y%m%d')}.csv",
-            mime="text/csv"
-        )
-    with export_col2:
-        st.info(f"📅 Last Updated: {df.index[-1].strftime('%Y-%m-%d %H:%M')}")
+        # Chart Options
+        chart_col1, chart_col2 = st.columns([3, 1])
+        with chart_col2:
+            st.subheader("Chart Settings")
+            show_sma = st.checkbox("SMA 50/200", value=True)
+            show_bb = st.checkbox("Bollinger Bands", value=False)
+            show_volume = st.checkbox("Volume", value=True)
+            show_rsi = st.checkbox("RSI", value=False)
+            show_signals = st.checkbox("Signal Markers", value=False)
+        
+            # זום - חלון צר יותר מוצג ברזולוציה גבוהה יותר (תקציב הנקודות קבוע).
+            # הסליידר שולח רק אחוזים; המיפוי לנרות נעשה בשרת, כך שהדפדפן לא מקבל את כל התאריכים
+            zoom = st.slider("Zoom (% of history):", 0.0, 100.0, (0.0, 100.0), step=0.5)
+            if zoom == (0.0, 100.0):
+                window = None
+            else:
+                last_bar = len(df.index) - 1
+                first, last = (int(round(pct / 100 * last_bar)) for pct in zoom)
+                window = (df.index[first], df.index[max(first, last)])
+                time_format = '%Y-%m-%d' if interval == '1d' else '%Y-%m-%d %H:%M'
+                st.caption(f"{window[0].strftime(time_format)} → {window[1].strftime(time_format)}")
+    
+        # Create Interactive Chart
+        with chart_col1:
+            st.subheader(f"📊 {symbol} Technical Chart")
+    
+        chart_options = dict(show_sma=show_sma, show_bb=show_bb, show_volume=show_volume, show_rsi=show_rsi,
+                             window=window, show_signals=show_signals)
+        if live_refresh:
+            live_chart(symbol, period, interval, chart_options)
+        else:
+            fig = CHART_BUILDER.build(symbol, (period, interval), df, **chart_options)
+            st.plotly_chart(fig, use_container_width=True)
+    
+        # Export Options
+        st.markdown("---")
+        export_col1, export_col2 = st.columns(2)
+        with export_col1:
+            csv_data = convert_df_to_csv(df)
+            st.download_button(
+                label="📥 Download Data (CSV)",
+                data=csv_data,
+                file_name=f"{symbol}_data_{datetime.now().strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        with export_col2:
+            st.info(f"📅 Last Updated: {df.index[-1].strftime('%Y-%m-%d %H:%M')}")
 
-else:
-    st.error(f"❌ Unable to load data for {symbol}. Please try another symbol.")
+    else:
+        st.error(f"❌ Unable to load data for {symbol}. Please try another symbol.")
 
 
 # ═══════════════════════════════════════════════════════════
@@ -561,151 +640,54 @@ else:
 # ═══════════════════════════════════════════════════════════
 
 with tabs[1]:
-st.header(“🔍 Smart Market Scanner”)
-st.caption(“Scan markets for high-probability trading opportunities”)
-
-
-scan_col1, scan_col2 = st.columns([2, 1])
-
-with scan_col2:
-    st.subheader("⚙️ Scanner Settings")
-    scan_category = st.selectbox("Scan Category:", list(MarketData.POPULAR_STOCKS.keys()), key='scan_cat')
-    
-    rsi_min = st.slider("Min RSI:", 0, 100, 30)
-    rsi_max = st.slider("Max RSI:", 0, 100, 70)
+    st.header("🔍 Smart Market Scanner")
+    st.caption("Scan markets for high-probability trading opportunities")
+
+    scan_col1, scan_col2 = st.columns([2, 1])
+
+    with scan_col2:
+        st.subheader("⚙️ Scanner Settings")
+        scan_category = st.selectbox("Scan Category:", list(MarketData.POPULAR_STOCKS.keys()), key='scan_cat')
+    
+        rsi_min = st.slider("Min RSI:", 0, 100, 30)
+        rsi_max = st.slider("Max RSI:", 0, 100, 70)
+    
+        min_volume = st.number_input("Min Volume (M):", min_value=0.0, value=1.0, step=0.5)
+        signal_lookback = st.slider("Signals in last N bars:", 1, 20, 5)
+        scan_partial = st.checkbox("Include short histories", value=False, key='scan_partial',
+                                   help="Keep symbols without enough history; unavailable indicators are left empty")
+    
+        scan_button = st.button("🚀 Run Scanner", use_container_width=True)
+
+    with scan_col1:
+        if scan_button:
+            scan_symbols = MarketData.POPULAR_STOCKS[scan_category]
+            scan_spec = {'kind': 'scanner', 'rsi_min': rsi_min, 'rsi_max': rsi_max, 'min_volume': min_volume,
+                         'signal_lookback': signal_lookback}
+            # The scan runs in the background job pool: batches stream in and the job survives reruns.
+            # A new run replaces the session's previous scan, so that one is cancelled instead of orphaned
+            JOBS.cancel(st.session_state.get('scan_job'))
+            job = JOBS.submit(
+                'scanner', scan_job, scan_symbols, {'scanner': scan_spec}, total=len(scan_symbols),
+                download=lambda batch, period: MarketData.get_batch(tuple(batch), period=period),
+                batch_size=SCAN_BATCH_SIZE, partial=scan_partial, on_latest=MarketData.SNAPSHOT.update_latest
+            )
+            st.session_state.scan_job = job.id
     
-    min_volume = st.number_input("Min Volume (M):", min_value=0.0, value=1.0, step=0.5)
+        scan_job_state = JOBS.get(st.session_state.get('scan_job'))
+        if scan_job_state is not None:
+            job_panel(scan_job_panel, scan_job_state)
     
-    scan_button = st.button("🚀 Run Scanner", use_container_width=True)
-
-with scan_col1:
-    if scan_button:
-        scan_symbols = MarketData.POPULAR_STOCKS[scan_category]
-        
-        with st.spinner(f"🔎 Scanning {len(scan_symbols)} symbols..."):
-            results = []
-            progress_bar = st.progress(0)
-            
-            # Download all at once for speed
-            try:
-                data = yf.download(scan_symbols, period="3mo", group_by='ticker', progress=False, threads=True)
-                
-                for idx, symbol in enumerate(scan_symbols):
-                    try:
-                        # Extract data for this symbol
-                        if len(scan_symbols) == 1:
-                            stock_df = data.copy()
-                        else:
-                            stock_df = data[symbol].dropna()
-                        
-                        if len(stock_df) < 50:
-                            continue
-                        
-                        # Calculate indicators
-                        stock_df = StockAnalyzer.calculate_indicators(stock_df)
-                        if stock_df is None:
-                            continue
-                        
-                        latest = stock_df.iloc[-1]
-                        
-                        # Apply filters
-                        if not (rsi_min <= latest['RSI'] <= rsi_max):
-                            continue
-                        if latest['Volume'] < min_volume * 1_000_000:
-                            continue
-                        
-                        # Calculate score
-                        score = 0
-                        reasons = []
-                        
-                        # Price above SMAs
-                        if latest['Close'] > latest['SMA50']:
-                            score += 1
-                            reasons.append("Above SMA50")
-                        if latest['Close'] > latest['SMA200']:
-                            score += 1
-                            reasons.append("Above SMA200")
-                        
-                        # RSI conditions
-                        if 40 < latest['RSI'] < 60:
-                            score += 1
-                            reasons.append("RSI Neutral")
-                        elif latest['RSI'] < 35:
-                            score += 1
-                            reasons.append("RSI Oversold")
-                        
-                        # MACD positive
-                        if latest['MACD'] > latest['MACD_signal']:
-                            score += 1
-                            reasons.append("MACD Bullish")
-                        
-                        # Volume spike
-                        if latest['Volume'] > latest['Volume_SMA'] * 1.5:
-                            score += 1
-                            reasons.append("High Volume")
-                        
-                        # Determine rating
-                        if score >= 4:
-                            rating = "🟢 Strong Buy"
-                        elif score >= 3:
-                            rating = "🟡 Buy"
-                        elif score >= 2:
-                            rating = "🔵 Watch"
-                        else:
-                            rating = "⚪ Neutral"
-                        
-                        results.append({
-                            'Symbol': symbol,
-                            'Price': latest['Close'],
-                            'Change %': ((latest['Close'] - latest['Open']) / latest['Open'] * 100),
-                            'RSI': latest['RSI'],
-                            'Volume': latest['Volume'] / 1_000_000,
-                            'Score': score,
-                            'Rating': rating,
-                            'Signals': ', '.join(reasons[:3])
-                        })
-                    
-                    except Exception as e:
-                        continue
-                    
-                    progress_bar.progress((idx + 1) / len(scan_symbols))
-                
-                progress_bar.empty()
-                
-                if results:
-                    results_df = pd.DataFrame(results).sort_values('Score', ascending=False)
-                    
-                    st.success(f"✅ Found {len(results)} opportunities!")
-                    
-                    # Display results
-                    st.dataframe(
-                        results_df.style.format({
-                            'Price': '${:.2f}',
-                            'Change %': '{:+.2f}%',
-                            'RSI': '{:.1f}',
-                            'Volume': '{:.1f}M'
-                        }).applymap(
-                            lambda v: 'color: #00ff88; font-weight: bold' if 'Strong Buy' in str(v) 
-                            else 'color: #ffc800; font-weight: bold' if 'Buy' in str(v)
-                            else '', subset=['Rating']
-                        ),
-                        use_container_width=True,
-                        height=500
-                    )
-                    
-                    # Export
-                    scan_csv = convert_df_to_csv(results_df)
-                    st.download_button(
-                        "📥 Export Results",
-                        scan_csv,
-                        f"scan_results_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                        "text/csv"
-                    )
-                else:
-                    st.warning("⚠️ No stocks matched your criteria. Try adjusting the filters.")
-            
-            except Exception as e:
-                st.error(f"❌ Scanner error: {str(e)}")
+        # Results written by the scheduled batch scanner (scans.py) load instantly
+        saved_scans = MarketData.SCANS.list(kind='scanner')
+        if saved_scans:
+            with st.expander(f"📂 Precomputed scans ({len(saved_scans)})", expanded=scan_job_state is None):
+                saved_scan = st.selectbox("Scan:", [m['name'] for m in saved_scans], key='saved_scan')
+                saved_results, saved_meta = MarketData.SCANS.load(saved_scan)
+                if saved_results is not None:
+                    st.caption(f"🕒 {saved_meta['generated_at']} · {saved_meta.get('universe', '')} · "
+                               f"{saved_meta['rows']} results")
+                    st.dataframe(saved_results, use_container_width=True, height=400)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -715,71 +697,70 @@ with scan_col1:
 # ═══════════════════════════════════════════════════════════
 
 with tabs[2]:
-st.header(“💼 Portfolio Tracker”)
+    st.header("💼 Portfolio Tracker")
 
+    port_col1, port_col2 = st.columns([2, 1])
 
-port_col1, port_col2 = st.columns([2, 1])
-
-with port_col2:
-    st.subheader("➕ Add Position")
+    with port_col2:
+        st.subheader("➕ Add Position")
     
-    add_symbol = st.text_input("Symbol:", key='port_symbol').upper()
-    add_shares = st.number_input("Shares:", min_value=0.0, value=1.0, step=0.1)
-    add_cost = st.number_input("Avg Cost ($):", min_value=0.0, value=100.0, step=0.01)
+        add_symbol = st.text_input("Symbol:", key='port_symbol').upper()
+        add_shares = st.number_input("Shares:", min_value=0.0, value=1.0, step=0.1)
+        add_cost = st.number_input("Avg Cost ($):", min_value=0.0, value=100.0, step=0.01)
     
-    if st.button("Add to Portfolio") and add_symbol:
-        st.session_state.portfolio[add_symbol] = {
-            'shares': add_shares,
-            'avg_cost': add_cost
-        }
-        st.success(f"✅ Added {add_shares} shares of {add_symbol}")
-        st.rerun()
+        if st.button("Add to Portfolio") and add_symbol:
+            st.session_state.portfolio[add_symbol] = {
+                'shares': add_shares,
+                'avg_cost': add_cost
+            }
+            st.success(f"✅ Added {add_shares} shares of {add_symbol}")
+            st.rerun()
 
-with port_col1:
-    if st.session_state.portfolio:
-        with st.spinner("📊 Calculating portfolio value..."):
-            portfolio_data = Portfolio.calculate_portfolio_value(st.session_state.portfolio)
+    with port_col1:
+        if st.session_state.portfolio:
+            with st.spinner("📊 Calculating portfolio value..."):
+                portfolio_data = Portfolio.calculate_portfolio_value(st.session_state.portfolio)
         
-        # Summary metrics
-        st.subheader("📈 Portfolio Summary")
-        p1, p2, p3, p4 = st.columns(4)
+            # Summary metrics
+            st.subheader("📈 Portfolio Summary")
+            p1, p2, p3, p4 = st.columns(4)
         
-        p1.metric("Total Value", f"${portfolio_data['total_value']:,.2f}")
-        p2.metric("Total Cost", f"${portfolio_data['total_cost']:,.2f}")
-        p3.metric("Profit/Loss", f"${portfolio_data['total_profit']:,.2f}",
-                 f"{portfolio_data['total_return']:.2f}%")
-        p4.metric("Holdings", len(st.session_state.portfolio))
+            p1.metric("Total Value", f"${portfolio_data['total_value']:,.2f}")
+            p2.metric("Total Cost", f"${portfolio_data['total_cost']:,.2f}")
+            p3.metric("Profit/Loss", f"${portfolio_data['total_profit']:,.2f}",
+                     f"{portfolio_data['total_return']:.2f}%")
+            p4.metric("Holdings", len(st.session_state.portfolio))
         
-        # Holdings table
-        st.markdown("---")
-        st.subheader("📋 Holdings Details")
+            # Holdings table
+            st.markdown("---")
+            st.subheader("📋 Holdings Details")
         
-        holdings_df = pd.DataFrame(portfolio_data['holdings'])
-        if not holdings_df.empty:
-            st.dataframe(
-                holdings_df.style.format({
-                    'Shares': '{:.2f}',
-                    'Avg Cost': '${:.2f}',
-                    'Current Price': '${:.2f}',
-                    'Value': '${:.2f}',
-                    'Profit/Loss': '${:.2f}',
-                    'Return %': '{:+.2f}%'
-                }).applymap(
-                    lambda v: f'color: {get_color_for_value(v)}' if isinstance(v, (int, float)) and v != 0 
-                    else '', subset=['Profit/Loss', 'Return %']
-                ),
-                use_container_width=True
-            )
+            holdings_df = pd.DataFrame(portfolio_data['holdings'])
+            if not holdings_df.empty:
+                st.dataframe(
+                    holdings_df.style.format({
+                        'Shares': '{:.2f}',
+                        'Avg Cost': '${:.2f}',
+                        'Current Price': '${:.2f}',
+                        'Value': '${:.2f}',
+                        'Profit/Loss': '${:.2f}',
+                        'Return %': '{:+.2f}%'
+                    }).map(
+                        lambda v: f'color: {get_color_for_value(v)}' if isinstance(v, (int, float)) and v != 0 
+                        else '', subset=['Profit/Loss', 'Return %']
+                    ),
+                    use_container_width=True
+                )
             
-            # Remove positions
-            st.markdown("---")
-            remove_symbol = st.selectbox("Remove Position:", list(st.session_state.portfolio.keys()))
-            if st.button("🗑️ Remove"):
-                del st.session_state.portfolio[remove_symbol]
-                st.success(f"Removed {remove_symbol}")
-                st.rerun()
-    else:
-        st.info("📝 Your portfolio is empty. Add your first position using the form on the right.")
+                # Remove positions
+                st.markdown("---")
+                remove_symbol = st.selectbox("Remove Position:", list(st.session_state.portfolio.keys()))
+                if st.button("🗑️ Remove"):
+                    del st.session_state.portfolio[remove_symbol]
+                    st.success(f"Removed {remove_symbol}")
+                    st.rerun()
+        else:
+            st.info("📝 Your portfolio is empty. Add your first position using the form on the right.")
 
 
 # ═══════════════════════════════════════════════════════════
@@ -789,63 +770,62 @@ with port_col1:
 # ═══════════════════════════════════════════════════════════
 
 with tabs[3]:
-st.header(“📰 Market News & Insights”)
-
-
-news_tabs = st.tabs(["🌍 Global Markets", "🇮🇱 Israel Markets"])
-
-with news_tabs[0]:
-    if st.button("🔄 Refresh Global News"):
-        st.cache_data.clear()
-        st.rerun()
-    
-    news_items = NewsProvider.get_market_news()
-    
-    if news_items:
-        news_cols = st.columns(2)
-        for idx, item in enumerate(news_items):
-            with news_cols[idx % 2]:
-                st.markdown(f"""
-                <div class="card-glass" style="margin-bottom: 15px; padding: 15px;">
-                    <div style="color: #00ff88; font-size: 12px; margin-bottom: 5px;">
-                        {item['source']}
+    st.header("📰 Market News & Insights")
+
+    news_tabs = st.tabs(["🌍 Global Markets", "🇮🇱 Israel Markets"])
+
+    with news_tabs[0]:
+        if st.button("🔄 Refresh Global News"):
+            NewsProvider.get_market_news.clear()
+            st.rerun()
+    
+        news_items = NewsProvider.get_market_news()
+    
+        if news_items:
+            news_cols = st.columns(2)
+            for idx, item in enumerate(news_items):
+                with news_cols[idx % 2]:
+                    st.markdown(f"""
+                    <div class="card-glass" style="margin-bottom: 15px; padding: 15px;">
+                        <div style="color: #00ff88; font-size: 12px; margin-bottom: 5px;">
+                            {item['source']}
+                        </div>
+                        <a href="{item['link']}" target="_blank" 
+                           style="color: #ffffff; font-weight: 600; text-decoration: none; font-size: 15px;">
+                            {item['title']}
+                        </a>
+                        <div style="color: #888; font-size: 11px; margin-top: 8px;">
+                            {item['published']}
+                        </div>
                     </div>
-                    <a href="{item['link']}" target="_blank" 
-                       style="color: #ffffff; font-weight: 600; text-decoration: none; font-size: 15px;">
-                        {item['title']}
-                    </a>
-                    <div style="color: #888; font-size: 11px; margin-top: 8px;">
-                        {item['published']}
+                    """, unsafe_allow_html=True)
+        else:
+            st.warning("⚠️ Unable to load news. Please check your connection.")
+
+    with news_tabs[1]:
+        if st.button("🔄 Refresh Israel News"):
+            NewsProvider.get_israel_news.clear()
+            st.rerun()
+    
+        il_news = NewsProvider.get_israel_news()
+    
+        if il_news:
+            news_cols = st.columns(2)
+            for idx, item in enumerate(il_news):
+                with news_cols[idx % 2]:
+                    st.markdown(f"""
+                    <div class="card-glass" style="margin-bottom: 15px; padding: 15px;">
+                        <a href="{item.link}" target="_blank" 
+                           style="color: #ffffff; font-weight: 600; text-decoration: none; font-size: 15px;">
+                            {item.title}
+                        </a>
+                        <div style="color: #888; font-size: 11px; margin-top: 8px;">
+                            {item.get('published', 'N/A')}
+                        </div>
                     </div>
-                </div>
-                """, unsafe_allow_html=True)
-    else:
-        st.warning("⚠️ Unable to load news. Please check your connection.")
-
-with news_tabs[1]:
-    if st.button("🔄 Refresh Israel News"):
-        st.cache_data.clear()
-        st.rerun()
-    
-    il_news = NewsProvider.get_israel_news()
-    
-    if il_news:
-        news_cols = st.columns(2)
-        for idx, item in enumerate(il_news):
-            with news_cols[idx % 2]:
-                st.markdown(f"""
-                <div class="card-glass" style="margin-bottom: 15px; padding: 15px;">
-                    <a href="{item.link}" target="_blank" 
-                       style="color: #ffffff; font-weight: 600; text-decoration: none; font-size: 15px;">
-                        {item.title}
-                    </a>
-                    <div style="color: #888; font-size: 11px; margin-top: 8px;">
-                        {item.get('published', 'N/A')}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-    else:
-        st.warning("⚠️ Unable to load Israeli news.")
+                    """, unsafe_allow_html=True)
+        else:
+            st.warning("⚠️ Unable to load Israeli news.")
 
 
 # ═══════════════════════════════════════════════════════════
@@ -855,122 +835,123 @@ with news_tabs[1]:
 # ═══════════════════════════════════════════════════════════
 
 with tabs[4]:
-st.header(“🎯 Advanced Stock Screener”)
-st.caption(“Filter stocks by multiple technical and fundamental criteria”)
-
-
-# Screener settings
-screen_col1, screen_col2, screen_col3 = st.columns(3)
-
-with screen_col1:
-    st.subheader("📊 Technical Filters")
-    screen_rsi_low = st.slider("RSI Lower Bound:", 0, 50, 20, key='screen_rsi_low')
-    screen_rsi_high = st.slider("RSI Upper Bound:", 50, 100, 80, key='screen_rsi_high')
-    price_above_sma200 = st.checkbox("Price > SMA200", value=False)
-
-with screen_col2:
-    st.subheader("💰 Price Filters")
-    min_price = st.number_input("Min Price ($):", min_value=0.0, value=10.0, step=1.0)
-    max_price = st.number_input("Max Price ($):", min_value=0.0, value=1000.0, step=10.0)
-
-with screen_col3:
-    st.subheader("📈 Volume Filters")
-    min_vol_m = st.number_input("Min Daily Volume (M):", min_value=0.0, value=0.5, step=0.1)
-    volume_spike = st.checkbox("Volume Spike (>150% avg)", value=False)
-
-# Categories to screen
-categories_to_screen = st.multiselect(
-    "Select Categories to Screen:",
-    list(MarketData.POPULAR_STOCKS.keys()),
-    default=['Tech Giants']
-)
+    st.header("🎯 Advanced Stock Screener")
+    st.caption("Filter stocks by multiple technical and fundamental criteria")
+
+    # Screener settings
+    screen_col1, screen_col2, screen_col3 = st.columns(3)
+
+    with screen_col1:
+        st.subheader("📊 Technical Filters")
+        screen_rsi_low = st.slider("RSI Lower Bound:", 0, 50, 20, key='screen_rsi_low')
+        screen_rsi_high = st.slider("RSI Upper Bound:", 50, 100, 80, key='screen_rsi_high')
+        price_above_sma200 = st.checkbox("Price > SMA200", value=False)
+
+    with screen_col2:
+        st.subheader("💰 Price Filters")
+        min_price = st.number_input("Min Price ($):", min_value=0.0, value=10.0, step=1.0)
+        max_price = st.number_input("Max Price ($):", min_value=0.0, value=1000.0, step=10.0)
+
+    with screen_col3:
+        st.subheader("📈 Volume Filters")
+        min_vol_m = st.number_input("Min Daily Volume (M):", min_value=0.0, value=0.5, step=0.1)
+        volume_spike = st.checkbox("Volume Spike (>150% avg)", value=False)
+        screen_partial = st.checkbox("Include short histories", value=False, key='screen_partial',
+                                     help="Keep symbols without enough history; unavailable indicators are left empty")
+
+    # Categories to screen
+    categories_to_screen = st.multiselect(
+        "Select Categories to Screen:",
+        list(MarketData.POPULAR_STOCKS.keys()),
+        default=['Tech Giants']
+    )
 
-if st.button("🔍 Run Advanced Screener", use_container_width=True):
-    all_symbols = []
-    for cat in categories_to_screen:
-        all_symbols.extend(MarketData.POPULAR_STOCKS[cat])
-    
-    all_symbols = list(set(all_symbols))  # Remove duplicates
-    
-    with st.spinner(f"🔎 Screening {len(all_symbols)} stocks..."):
-        screener_results = []
-        progress = st.progress(0)
-        
+    # Custom screen expression (compiled once, evaluated on the whole universe)
+    expr_col, saved_col = st.columns([3, 1])
+    with saved_col:
+        saved_choice = st.selectbox("Saved Screens:", ['—'] + list(st.session_state.saved_screens.keys()))
+    with expr_col:
+        custom_screen = st.text_input(
+            "Custom Screen:",
+            value=st.session_state.saved_screens.get(saved_choice, ''),
+            placeholder="RSI between 30 and 50 and Close > SMA200 and Volume > 1.5*Volume_SMA"
+        )
+
+    if custom_screen:
         try:
-            data = yf.download(all_symbols, period="6mo", group_by='ticker', progress=False, threads=True)
-            
-            for idx, sym in enumerate(all_symbols):
-                try:
-                    if len(all_symbols) == 1:
-                        sym_df = data.copy()
-                    else:
-                        sym_df = data[sym].dropna()
-                    
-                    if len(sym_df) < 50:
-                        continue
-                    
-                    sym_df = StockAnalyzer.calculate_indicators(sym_df)
-                    if sym_df is None:
-                        continue
-                    
-                    latest = sym_df.iloc[-1]
-                    
-                    # Apply all filters
-                    if not (screen_rsi_low <= latest['RSI'] <= screen_rsi_high):
-                        continue
-                    if not (min_price <= latest['Close'] <= max_price):
-                        continue
-                    if latest['Volume'] < min_vol_m * 1_000_000:
-                        continue
-                    if price_above_sma200 and latest['Close'] < latest['SMA200']:
-                        continue
-                    if volume_spike and latest['Volume'] < latest['Volume_SMA'] * 1.5:
-                        continue
-                    
-                    # Passed all filters
-                    screener_results.append({
-                        'Symbol': sym,
-                        'Price': latest['Close'],
-                        'RSI': latest['RSI'],
-                        'Volume (M)': latest['Volume'] / 1_000_000,
-                        'SMA200': latest['SMA200'],
-                        'Distance from SMA200 (%)': ((latest['Close'] - latest['SMA200']) / latest['SMA200'] * 100)
-                    })
-                
-                except:
-                    continue
-                
-                progress.progress((idx + 1) / len(all_symbols))
-            
-            progress.empty()
-            
-            if screener_results:
-                results_df = pd.DataFrame(screener_results)
-                st.success(f"✅ {len(results_df)} stocks passed all filters!")
-                
-                st.dataframe(
-                    results_df.style.format({
-                        'Price': '${:.2f}',
-                        'RSI': '{:.1f}',
-                        'Volume (M)': '{:.1f}M',
-                        'SMA200': '${:.2f}',
-                        'Distance from SMA200 (%)': '{:+.2f}%'
-                    }),
-                    use_container_width=True
-                )
-                
-                csv = convert_df_to_csv(results_df)
-                st.download_button(
-                    "📥 Download Screener Results",
-                    csv,
-                    f"screener_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-                    "text/csv"
-                )
-            else:
-                st.warning("⚠️ No stocks matched all criteria. Try relaxing some filters.")
+            compile_query(custom_screen)
+            name_col, save_col = st.columns([3, 1])
+            with name_col:
+                screen_name = st.text_input("Screen Name:", placeholder="Oversold Uptrend")
+            with save_col:
+                if st.button("💾 Save Screen", use_container_width=True) and screen_name:
+                    st.session_state.saved_screens[screen_name] = custom_screen
+                    st.success(f"✅ Screen '{screen_name}' saved!")
+        except QueryError as e:
+            st.error(f"❌ Invalid screen: {str(e)}")
+
+    # Build the full screen from the filter widgets
+    screen_parts = [
+        f"RSI between {screen_rsi_low} and {screen_rsi_high}",
+        f"Close between {min_price} and {max_price}",
+        f"Volume >= {min_vol_m * 1_000_000}"
+    ]
+    if price_above_sma200:
+        screen_parts.append("Close >= SMA200")
+    if volume_spike:
+        screen_parts.append("Volume >= 1.5 * Volume_SMA")
+    if custom_screen:
+        screen_parts.append(f"({custom_screen})")
+    screen_expression = " and ".join(screen_parts)
+    st.caption(f"🧮 Screen: `{screen_expression}`")
+
+    # Full-universe screening straight from the memory-mapped archive (no download)
+    archive = MarketData.get_archive()
+    use_archive = archive is not None and st.checkbox(
+        f"📦 Screen full archive ({len(archive):,} symbols)", value=False
+    )
+
+    if st.button("🔍 Run Advanced Screener", use_container_width=True):
+        if use_archive:
+            all_symbols = archive.symbols
+        else:
+            all_symbols = []
+            for cat in categories_to_screen:
+                all_symbols.extend(MarketData.POPULAR_STOCKS[cat])
         
-        except Exception as e:
-            st.error(f"❌ Screener error: {str(e)}")
+            all_symbols = list(set(all_symbols))  # Remove duplicates
+    
+        try:
+            # Compiled here so an invalid screen is reported before anything is queued
+            compile_query(screen_expression)
+            # Batches run in the background job pool (indicators only for the columns the screen reads);
+            # the session's previous screen is cancelled rather than left running unseen
+            JOBS.cancel(st.session_state.get('screen_job'))
+            job = JOBS.submit(
+                'screener', scan_job, [] if use_archive else all_symbols,
+                {'screener': {'kind': 'screen', 'expression': screen_expression}}, total=len(all_symbols),
+                download=lambda batch, period: MarketData.get_batch(tuple(batch), period=period),
+                archive=archive if use_archive else None, batch_size=SCAN_BATCH_SIZE, partial=screen_partial,
+                on_latest=MarketData.SNAPSHOT.update_latest
+            )
+            st.session_state.screen_job = job.id
+        except QueryError as e:
+            st.error(f"❌ Invalid screen: {str(e)}")
+
+    screen_job_state = JOBS.get(st.session_state.get('screen_job'))
+    if screen_job_state is not None:
+        job_panel(screen_job_panel, screen_job_state)
+
+    # Results written by the scheduled batch scanner (scans.py) load instantly
+    saved_screens = MarketData.SCANS.list(kind='screen')
+    if saved_screens:
+        with st.expander(f"📂 Precomputed screens ({len(saved_screens)})"):
+            saved_screen = st.selectbox("Screen:", [m['name'] for m in saved_screens], key='saved_screen')
+            saved_results, saved_meta = MarketData.SCANS.load(saved_screen)
+            if saved_results is not None:
+                st.caption(f"🕒 {saved_meta['generated_at']} · `{saved_meta['spec']['expression']}` · "
+                           f"{saved_meta['rows']} results")
+                st.dataframe(saved_results, use_container_width=True)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -980,99 +961,188 @@ if st.button("🔍 Run Advanced Screener", use_container_width=True):
 # ═══════════════════════════════════════════════════════════
 
 with tabs[5]:
-st.header(“📚 Market Overview & Heatmap”)
-
+    st.header("📚 Market Overview & Heatmap")
 
-# Major Indices
-st.subheader("📊 Major Indices")
+    # Major Indices
+    st.subheader("📊 Major Indices")
 
-indices = {
-    'S&P 500': '^GSPC',
-    'Dow Jones': '^DJI',
-    'NASDAQ': '^IXIC',
-    'Russell 2000': '^RUT'
-}
+    indices = {
+        'S&P 500': '^GSPC',
+        'Dow Jones': '^DJI',
+        'NASDAQ': '^IXIC',
+        'Russell 2000': '^RUT'
+    }
 
-idx_cols = st.columns(4)
-for idx, (name, ticker) in enumerate(indices.items()):
-    try:
-        data = yf.Ticker(ticker).history(period="1d")
-        if not data.empty:
-            price = data['Close'].iloc[-1]
-            change = ((data['Close'].iloc[-1] - data['Open'].iloc[0]) / data['Open'].iloc[0]) * 100
+    idx_cols = st.columns(4)
+    index_quotes = MarketData.get_index_quotes(tuple(indices.values()))
+    for idx, (name, ticker) in enumerate(indices.items()):
+        if ticker in index_quotes:
+            price, change = index_quotes[ticker]
             idx_cols[idx].metric(name, f"{price:,.0f}", f"{change:+.2f}%")
-    except:
-        idx_cols[idx].metric(name, "N/A")
+        else:
+            idx_cols[idx].metric(name, "N/A")
 
-st.markdown("---")
+    st.markdown("---")
 
-# Sector Performance
-st.subheader("🏭 Sector Performance (Top Stocks)")
+    # Sector Performance
+    st.subheader("🏭 Sector Performance (Top Stocks)")
 
-sector_perf = []
-for category, symbols in MarketData.POPULAR_STOCKS.items():
-    if category in ['Indices', 'Crypto']:
-        continue
-    
+    # Sample 3 stocks from each sector, fetched in one batch into the snapshot table
+    sample_symbols = [
+        sym for category, symbols in MarketData.POPULAR_STOCKS.items()
+        if category not in ['Indices', 'Crypto']
+        for sym in symbols[:3]
+    ]
     try:
-        # Sample 3 stocks from each sector
-        sample_symbols = symbols[:3]
-        sector_data = yf.download(sample_symbols, period="1d", progress=False, threads=True)
+        # מחירים בלבד - ממוזגים לשורות הקיימות בלי למחוק את האינדיקטורים שסריקות כתבו
+        MarketData.SNAPSHOT.update_prices(MarketData.get_batch(tuple(sample_symbols), period="1d"), sample_symbols)
+    except Exception as e:
+        print(f"sector performance refresh failed: {e}", file=sys.stderr)
+
+    sector_perf = MarketData.SNAPSHOT.sector_performance(sample_symbols).rename('Avg Change %')
+
+    if not sector_perf.empty:
+        sector_df = sector_perf.rename_axis('Sector').reset_index().sort_values('Avg Change %', ascending=False)
+    
+        # Create bar chart
+        fig_sector = go.Figure()
+    
+        colors = ['#00ff88' if x > 0 else '#ff0055' for x in sector_df['Avg Change %']]
+    
+        fig_sector.add_trace(go.Bar(
+            x=sector_df['Sector'],
+            y=sector_df['Avg Change %'],
+            marker_color=colors,
+            text=sector_df['Avg Change %'].apply(lambda x: f'{x:+.2f}%'),
+            textposition='outside'
+        ))
+    
+        fig_sector.update_layout(
+            template='plotly_dark',
+            height=400,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            title='Sector Performance Today',
+            yaxis_title='Change %',
+            showlegend=False
+        )
+    
+        st.plotly_chart(fig_sector, use_container_width=True)
+
+
+# ═══════════════════════════════════════════════════════════
+
+# TAB 7: BACKTEST
+
+# ═══════════════════════════════════════════════════════════
+
+with tabs[6]:
+    st.header("🧪 Strategy Backtest")
+    st.caption("How the built-in signals and scanner ratings performed historically (equal-weight, long only)")
+    
+    bt_col1, bt_col2, bt_col3 = st.columns(3)
+    with bt_col1:
+        bt_categories = st.multiselect("Universe:", list(MarketData.POPULAR_STOCKS.keys()),
+                                       default=['Tech Giants'], key='bt_categories')
+        bt_period = st.selectbox("History:", ['1y', '2y', '5y', '10y'], index=2, key='bt_period')
+    with bt_col2:
+        bt_strategy = st.radio("Strategy:", ["Trading Signals", "Scanner Rating"], key='bt_strategy')
+        if bt_strategy == "Trading Signals":
+            signal_names = [rule.name for rule in SIGNAL_RULES]
+            bt_entry = st.multiselect("Enter on:", signal_names,
+                                      default=[r.name for r in SIGNAL_RULES if r.side == 'buy'])
+            bt_exit = st.multiselect("Exit on:", signal_names,
+                                     default=[r.name for r in SIGNAL_RULES if r.side == 'sell'])
+        else:
+            bt_min_score = st.slider("Enter at score ≥", 1, len(SCANNER_RULES), 4,
+                                     help="4 = 🟢 Strong Buy")
+            bt_exit_score = st.slider("Exit below score", 1, len(SCANNER_RULES), 4)
+    with bt_col3:
+        bt_cost = st.number_input("Cost per trade (bps):", min_value=0.0, value=DEFAULT_COST_BPS, step=1.0)
+    
+    if st.button("▶️ Run Backtest", use_container_width=True):
+        bt_symbols = sorted({s for cat in bt_categories for s in MarketData.POPULAR_STOCKS[cat]})
         
-        if not sector_data.empty:
-            avg_change = 0
-            count = 0
-            for sym in sample_symbols:
-                try:
-                    if len(sample_symbols) > 1:
-                        close = sector_data['Close'][sym].iloc[-1]
-                        open_p = sector_data['Open'][sym].iloc[0]
-                    else:
-                        close = sector_data['Close'].iloc[-1]
-                        open_p = sector_data['Open'].iloc[0]
-                    
-                    change = ((close - open_p) / open_p) * 100
-                    avg_change += change
-                    count += 1
-                except:
-                    continue
+        with st.spinner(f"🧪 Backtesting {len(bt_symbols)} symbols..."):
+            try:
+                data = MarketData.get_batch(tuple(bt_symbols), period=bt_period)
+                
+                # Only the indicators the strategy reads, in one vectorized pass
+                if bt_strategy == "Trading Signals":
+                    panel = PanelIndicators.compute(data, bt_symbols, columns=rule_columns(SIGNAL_RULES))
+                    positions = Backtester.signal_positions(panel, entry=bt_entry, exit=bt_exit)
+                else:
+                    panel = PanelIndicators.compute(data, bt_symbols, columns=rule_columns(SCANNER_RULES))
+                    positions = Backtester.score_positions(panel, min_score=bt_min_score, exit_score=bt_exit_score)
+                result = Backtester.run(panel, positions, cost_bps=bt_cost)
+                stats = result.stats()
+                
+                m1, m2, m3, m4, m5 = st.columns(5)
+                m1.metric("Total Return", f"{stats['total_return']:+.1%}")
+                m2.metric("Annual Return", f"{stats['annual_return']:+.1%}")
+                m3.metric("Max Drawdown", f"{stats['max_drawdown']:.1%}")
+                m4.metric("Hit Rate", f"{stats['hit_rate']:.0%}" if stats['trades'] else "N/A")
+                m5.metric("Trades", f"{stats['trades']:,}")
+                
+                fig_equity = go.Figure(go.Scatter(x=result.equity.index, y=result.equity.values,
+                                                  line=dict(color='#00ff88', width=2), name='Equity'))
+                fig_equity.update_layout(
+                    template='plotly_dark',
+                    height=350,
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    title='Equity Curve (start = 1.0)'
+                )
+                st.plotly_chart(fig_equity, use_container_width=True)
+                
+                st.subheader("📋 Per Symbol")
+                st.dataframe(
+                    result.summary.style.format({
+                        'Return %': '{:+.2f}%',
+                        'Buy & Hold %': '{:+.2f}%',
+                        'Max Drawdown %': '{:.2f}%',
+                        'Hit Rate %': '{:.0f}%',
+                        'Exposure %': '{:.0f}%'
+                    }, na_rep='—'),
+                    use_container_width=True
+                )
+                
+                with st.expander(f"🧾 Trades ({len(result.trades):,})"):
+                    st.dataframe(result.trades.style.format({'Return %': '{:+.2f}%'}), use_container_width=True)
+                    st.download_button(
+                        "📥 Download Trades",
+                        convert_df_to_csv(result.trades),
+                        f"backtest_trades_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                        "text/csv"
+                    )
             
-            if count > 0:
-                avg_change /= count
-                sector_perf.append({
-                    'Sector': category,
-                    'Avg Change %': avg_change
-                })
-    except:
-        continue
-
-if sector_perf:
-    sector_df = pd.DataFrame(sector_perf).sort_values('Avg Change %', ascending=False)
-    
-    # Create bar chart
-    fig_sector = go.Figure()
-    
-    colors = ['#00ff88' if x > 0 else '#ff0055' for x in sector_df['Avg Change %']]
-    
-    fig_sector.add_trace(go.Bar(
-        x=sector_df['Sector'],
-        y=sector_df['Avg Change %'],
-        marker_color=colors,
-        text=sector_df['Avg Change %'].apply(lambda x: f'{x:+.2f}%'),
-        textposition='outside'
-    ))
-    
-    fig_sector.update_layout(
-        template='plotly_dark',
-        height=400,
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        title='Sector Performance Today',
-        yaxis_title='Change %',
-        showlegend=False
-    )
-    
-    st.plotly_chart(fig_sector, use_container_width=True)
+            except Exception as e:
+                st.error(f"❌ Backtest error: {str(e)}")
+    
+    # Scanner threshold tuning - grid/random search spread over all CPU cores
+    with st.expander("🔬 Scanner Parameter Sweep"):
+        st.caption(f"Searches RSI bands, oversold level, volume multiple and score cutoff "
+                   f"({len(grid(DEFAULT_SPACE))} combinations) on the selected universe")
+        sweep_samples = st.slider("Random samples (0 = full grid):", 0, len(grid(DEFAULT_SPACE)), 0)
+        sweep_metric = st.selectbox("Rank by:", ['sharpe', 'total_return', 'annual_return', 'hit_rate', 'max_drawdown'])
+        
+        if st.button("🔬 Run Sweep", use_container_width=True):
+            sweep_symbols = sorted({s for cat in bt_categories for s in MarketData.POPULAR_STOCKS[cat]})
+            with st.spinner(f"🔬 Sweeping on {len(sweep_symbols)} symbols..."):
+                try:
+                    data = MarketData.get_batch(tuple(sweep_symbols), period=bt_period)
+                    panel = PanelIndicators.compute(data, sweep_symbols, columns=ParameterSweep.columns())
+                    sweep_params = sample(DEFAULT_SPACE, sweep_samples) if sweep_samples else grid(DEFAULT_SPACE)
+                    ranked = ParameterSweep(panel, cost_bps=bt_cost).run(sweep_params, metric=sweep_metric)
+                    st.dataframe(ranked.head(20), use_container_width=True)
+                    st.download_button(
+                        "📥 Download Sweep Results",
+                        convert_df_to_csv(ranked),
+                        f"sweep_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                        "text/csv"
+                    )
+                except Exception as e:
+                    st.error(f"❌ Sweep error: {str(e)}")
 
 
 # ═══════════════════════════════════════════════════════════
@@ -1081,8 +1151,8 @@ if sector_perf:
 
 # ═══════════════════════════════════════════════════════════
 
-st.markdown(”—”)
-st.markdown(”””
+st.markdown("---")
+st.markdown("""
 
 <div style='text-align: center; color: #888; padding: 20px;'>
     <strong>ProTrade Ultimate v2.0</strong> | Advanced Trading Platform<br>
@@ -0,0 +1,211 @@
+"""
+ProTrade Ultimate - Memory-Mapped History Archive
+ארכיון היסטוריה בינארי ברוחב קבוע (שדה × סימבול × תאריך) שנקרא דרך memmap בלי העתקה.
+כל שדה הוא מערך רציף (סימבולים × תאריכים) - בדיוק הצורה ש-PanelIndicators מקבל,
+ודפי הקובץ ב-page cache של מערכת ההפעלה משותפים לכל התהליכים שקוראים אותו.
+
+מבנה התיקייה:
+    meta.json   - סימבולים, שדות, dtype ואזור זמן
+    dates.npy   - תאריכי העמודות (datetime64[ns], UTC)
+    data.bin    - מערך (שדות × סימבולים × תאריכים) ב-C order
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLUMNS
+from panel import FIELDS, PanelIndicators, indicator_columns, warmup_bars
+from providers import get_provider
+from store import OHLCVStore
+
+DEFAULT_ARCHIVE_DIR = os.environ.get(
+    'PROTRADE_ARCHIVE_DIR',
+    os.path.join(os.path.expanduser('~'), '.protrade', 'archive')
+)
+DEFAULT_DTYPE = 'float64'
+
+
+class HistoryArchive:
+    """ארכיון לקריאה בלבד - כל הגישות מחזירות views של ה-memmap"""
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR):
+        self.root = root
+        self.version = HistoryArchive.version(root)
+        with open(os.path.join(root, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        self.symbols = meta['symbols']
+        self.fields = meta['fields']
+        self.dtype = np.dtype(meta['dtype'])
+        # רזולוציה מפורשת - גם קבצי int64 ישנים נקראים כ-ns ולא לפי ברירת המחדל של pandas
+        dates = pd.DatetimeIndex(np.load(os.path.join(root, 'dates.npy')).astype('datetime64[ns]'))
+        self.dates = dates.tz_localize('UTC').tz_convert(meta['tz']) if meta.get('tz') else dates
+        self._rows = {symbol: row for row, symbol in enumerate(self.symbols)}
+        self.data = np.memmap(os.path.join(root, 'data.bin'), dtype=self.dtype, mode='r',
+                              shape=(len(self.fields), len(self.symbols), len(self.dates)))
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def __contains__(self, symbol):
+        return symbol in self._rows
+
+    @staticmethod
+    def exists(root=DEFAULT_ARCHIVE_DIR):
+        return os.path.exists(os.path.join(root, 'meta.json'))
+
+    @staticmethod
+    def version(root=DEFAULT_ARCHIVE_DIR):
+        """זמן השינוי של meta.json (ns) - משתנה בכל בנייה מחדש; None אם אין ארכיון"""
+        try:
+            return os.stat(os.path.join(root, 'meta.json')).st_mtime_ns
+        except OSError:
+            return None
+
+    def _bound(self, value):
+        # גבול בלי אזור זמן מתפרש בזמן המקומי של הארכיון (כמו FixtureProvider.history)
+        value = pd.Timestamp(value)
+        tz = self.dates.tz
+        if tz is not None and value.tz is None:
+            return value.tz_localize(tz)
+        if tz is None and value.tz is not None:
+            return value.tz_localize(None)
+        return value
+
+    def _columns(self, start=None, end=None):
+        lo = self.dates.searchsorted(self._bound(start)) if start is not None else 0
+        hi = self.dates.searchsorted(self._bound(end), side='right') if end is not None else len(self.dates)
+        return slice(lo, hi)
+
+    def field(self, name, start=None, end=None):
+        """מערך (סימבולים × תאריכים) של שדה - view של ה-memmap, בלי העתקה"""
+        return self.data[self.fields.index(name), :, self._columns(start, end)]
+
+    def arrays(self, start=None, end=None):
+        """מילון שדה -> view (סימבולים × תאריכים), לכל הסימבולים"""
+        return {name: self.field(name, start, end) for name in self.fields}
+
+    def frame(self, symbol, start=None, end=None):
+        """היסטוריה של סימבול בודד כ-DataFrame (רק השורה שלו נקראת מהדיסק)"""
+        row = self._rows[symbol]
+        cols = self._columns(start, end)
+        df = pd.DataFrame({name: np.asarray(self.data[i, row, cols]) for i, name in enumerate(self.fields)},
+                          index=self.dates[cols])
+        return df.dropna(subset=FIELDS)
+
+    def latest(self, min_bars=None, start=None, chunk_size=256, columns=INDICATOR_COLUMNS, partial=False,
+               rows=slice(None)):
+        """
+        טבלת הנר האחרון עם אינדיקטורים (columns) לכל הארכיון - קבוצה אחרי קבוצה של סימבולים.
+        min_bars - ברירת מחדל: נרות החימום של columns
+        rows - טווח שורות של סימבולים (slice), לחישוב חלק מהארכיון
+        """
+        min_bars = warmup_bars(columns) if min_bars is None else min_bars
+        arrays = self.arrays(start=start)
+        return PanelIndicators.latest_arrays(
+            *(arrays[field][rows] for field in FIELDS), self.symbols[rows], self.dates[self._columns(start)],
+            min_bars=min_bars, chunk_size=chunk_size, columns=columns, partial=partial
+        )
+
+    def panel(self, columns=INDICATOR_COLUMNS, start=None, chunk_size=256, rows=slice(None)):
+        """
+        פאנל אינדיקטורים לטווח שורות של סימבולים - מילון שדה -> DataFrame (תאריכים × סימבולים),
+        כמו PanelIndicators.compute. רק השורות המבוקשות נקראות מהדיסק.
+        """
+        cols = self._columns(start)
+        arrays = PanelIndicators.compute_arrays(*(self.field(field, start)[rows] for field in FIELDS),
+                                                chunk_size=chunk_size, columns=indicator_columns(columns))
+        index, symbols = self.dates[cols], pd.Index(self.symbols[rows])
+        return {field: pd.DataFrame(arr.T, index=index, columns=symbols) for field, arr in arrays.items()}
+
+    @staticmethod
+    def build(root, symbols, load, dtype=DEFAULT_DTYPE):
+        """
+        כותב ארכיון חדש. load(symbol) מחזיר פריים OHLCV (או None) ונקרא פעמיים לכל סימבול -
+        פעם ללוח התאריכים ופעם לכתיבה - כך שרק פריים אחד נמצא בזיכרון בכל רגע.
+        כל הסימבולים מיושרים ללוח התאריכים המאוחד; ימים חסרים נשמרים כ-NaN.
+        הכתיבה לתיקייה זמנית ואז החלפה - קוראים קיימים לא רואים ארכיון חצי כתוב.
+        """
+        def utc_index(index):
+            if index.tz is not None:
+                return index.tz_convert('UTC').tz_localize(None)
+            return index
+
+        kept, dates, tz = [], pd.DatetimeIndex([]), None
+        for symbol in symbols:
+            df = load(symbol)
+            if df is None or df.empty:
+                continue
+            kept.append(symbol)
+            dates = dates.union(utc_index(df.index))
+            tz = tz if tz is not None else df.index.tz
+
+        tmp = f"{root}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        data = np.memmap(os.path.join(tmp, 'data.bin'), dtype=dtype, mode='w+',
+                         shape=(len(FIELDS), len(kept), len(dates)))
+        data[:] = np.nan
+        for row, symbol in enumerate(kept):
+            df = load(symbol)
+            cols = dates.get_indexer(utc_index(df.index))
+            for i, name in enumerate(FIELDS):
+                data[i, row, cols] = df[name].to_numpy(dtype=float)
+        data.flush()
+        del data
+
+        np.save(os.path.join(tmp, 'dates.npy'), dates.values.astype('datetime64[ns]'))
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'symbols': kept, 'fields': FIELDS, 'dtype': np.dtype(dtype).name,
+                       'tz': str(tz) if tz is not None else None}, f)
+
+        # קורא שכבר פתח את הקבצים הישנים ממשיך לקרוא אותם (בלינוקס) עד שיפתח מחדש
+        old = f"{root}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(root):
+            os.replace(root, old)
+        os.replace(tmp, root)
+        shutil.rmtree(old, ignore_errors=True)
+        return HistoryArchive(root)
+
+    @staticmethod
+    def from_store(store, symbols, root=DEFAULT_ARCHIVE_DIR, dtype=DEFAULT_DTYPE):
+        """בונה ארכיון מההיסטוריה השמורה ב-OHLCVStore"""
+        return HistoryArchive.build(root, symbols, store.load, dtype=dtype)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ProTrade history archive builder")
+    parser.add_argument('symbols', nargs='*', help="סימבולים (או --universe)")
+    parser.add_argument('--universe', help="קובץ עם סימבול בכל שורה")
+    parser.add_argument('--period', default='5y', help="תקופת ההיסטוריה לסנכרון (ברירת מחדל 5y)")
+    parser.add_argument('--root', default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument('--dtype', default=DEFAULT_DTYPE, choices=['float32', 'float64'])
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols)
+    if args.universe:
+        with open(args.universe, encoding='utf-8') as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not symbols:
+        parser.error("no symbols given")
+
+    # מסנכרנים ל-OHLCVStore (רק נרות חדשים יורדים) ובונים מהדיסק
+    store, provider = OHLCVStore(), get_provider()
+    for symbol in symbols:
+        try:
+            store.sync(symbol, args.period, lambda **kwargs: provider.history(symbol, **kwargs))
+        except Exception as e:
+            print(f"{symbol}: {e}", file=sys.stderr)
+    archive = HistoryArchive.from_store(store, symbols, root=args.root, dtype=args.dtype)
+    print(f"{len(archive)} symbols × {len(archive.dates)} dates -> {archive.root}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,192 @@
+"""
+ProTrade Ultimate - Vectorized Backtester
+בדיקה היסטורית של אותות detect_signals ודירוג הסורק על פאנל סימבולים (זמן × סימבולים).
+הכל פעולות מערכים - אין לולאה על נרות בפייתון.
+
+הנחות ביצוע: ההחלטה מתקבלת בסגירת נר t והפוזיציה מוחזקת מנר t+1 (בלי look-ahead),
+תשואה מסגירה לסגירה, ועמלה + החלקה (cost_bps) על כל כניסה וכל יציאה.
+"""
+
+import numpy as np
+import pandas as pd
+
+from scoring import SCANNER_RULES, score_values
+from signals import SIGNAL_RULES, rule_masks
+
+DEFAULT_COST_BPS = 10.0
+TRADING_DAYS_PER_YEAR = 252
+
+TRADE_COLUMNS = ['Symbol', 'Entry', 'Exit', 'Bars', 'Return %', 'Open']
+
+
+def _ffill(x):
+    return pd.DataFrame(x).ffill().to_numpy()
+
+
+def _arrays(panel):
+    return {col: frame.to_numpy(dtype=float) for col, frame in panel.items()}
+
+
+def _hold(entry, exit_):
+    """פוזיציה 0/1 בסגירת כל נר: נכנסים באות כניסה ומחזיקים עד אות יציאה (יציאה גוברת באותו נר)"""
+    markers = np.where(exit_, 0.0, np.where(entry, 1.0, np.nan))
+    return np.nan_to_num(_ffill(markers), nan=0.0)
+
+
+def _drawdown(equity):
+    peak = np.fmax.accumulate(equity, axis=0)
+    return equity / peak - 1
+
+
+class BacktestResult:
+    """תוצאות בדיקה: תשואות לכל נר, עסקאות, סיכום לכל סימבול ועקומת הון של התיק (משקל שווה)"""
+
+    def __init__(self, index, symbols, returns, held, close, cost):
+        self.index = index
+        self.symbols = list(symbols)
+        self.returns = pd.DataFrame(returns, index=index, columns=symbols)
+
+        # תיק במשקל שווה לכל הסימבולים שנסחרים באותו נר
+        with np.errstate(invalid='ignore'):
+            daily = np.nanmean(np.where(np.isnan(close), np.nan, returns), axis=1) \
+                if returns.shape[1] else np.zeros(len(index))
+        self.portfolio = pd.Series(np.nan_to_num(daily), index=index, name='Return')
+        self.equity = (1 + self.portfolio).cumprod().rename('Equity')
+
+        self.trades = self._trades(index, symbols, returns, held, ~np.isnan(close), cost)
+        self.summary = self._summary(symbols, returns, held, close)
+
+    @staticmethod
+    def _trades(index, symbols, returns, held, present, cost):
+        """עסקה = רצף נרות מוחזקים; התשואה כוללת עמלת כניסה ויציאה (עסקה פתוחה - רק כניסה)"""
+        prev = np.vstack([np.zeros((1, held.shape[1])), held[:-1]])
+        starts = (held > 0) & (prev == 0)
+        # מזהה עסקה גלובלי לכל נר מוחזק, בסדר (סימבול, זמן)
+        trade_of = np.cumsum(starts.T.ravel()).reshape(held.T.shape).T - 1
+        inside = held > 0
+        ids = trade_of[inside]
+        count = int(starts.sum())
+        if count == 0:
+            return pd.DataFrame(columns=TRADE_COLUMNS)
+
+        # תשואה ברוטו של כל נר בעסקה (העמלות נוספות בנפרד)
+        gross = np.log1p(np.nan_to_num(returns[inside] + np.where(starts[inside], cost, 0.0)))
+        log_return = np.bincount(ids, weights=gross, minlength=count)
+        bars = np.bincount(ids, weights=present[inside], minlength=count).astype(np.int64)
+        rows, cols = np.nonzero(inside)
+        first = np.full(count, len(index))
+        last = np.zeros(count, dtype=np.int64)
+        np.minimum.at(first, ids, rows)
+        np.maximum.at(last, ids, rows)
+        symbol = np.zeros(count, dtype=np.int64)
+        symbol[ids] = cols
+
+        is_open = last == len(index) - 1
+        total = np.exp(log_return) * (1 - cost) * np.where(is_open, 1.0, 1 - cost) - 1
+        trades = pd.DataFrame({
+            'Symbol': pd.Categorical.from_codes(symbol, categories=list(symbols)),
+            'Entry': pd.DatetimeIndex(index)[first],
+            'Exit': pd.DatetimeIndex(index)[last],
+            'Bars': bars,
+            'Return %': total * 100,
+            'Open': is_open,
+        }, columns=TRADE_COLUMNS)
+        return trades.sort_values(['Entry', 'Symbol'], kind='stable').reset_index(drop=True)
+
+    def _summary(self, symbols, returns, held, close):
+        equity = np.cumprod(1 + np.nan_to_num(returns), axis=0)
+        first = np.argmax(~np.isnan(close), axis=0)
+        last_close = _ffill(close)[-1]
+        first_close = close[first, np.arange(close.shape[1])]
+        present = ~np.isnan(close)
+
+        codes = self.trades['Symbol'].cat.codes.to_numpy() if len(self.trades) else np.zeros(0, dtype=np.int64)
+        count = np.bincount(codes, minlength=len(symbols))
+        wins = np.bincount(codes, weights=self.trades['Return %'].to_numpy(dtype=float) > 0, minlength=len(symbols)) \
+            if len(self.trades) else np.zeros(len(symbols))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            hit_rate = np.where(count > 0, wins / count * 100, np.nan)
+        return pd.DataFrame({
+            'Return %': (equity[-1] - 1) * 100 if len(equity) else np.zeros(len(symbols)),
+            'Buy & Hold %': (last_close / first_close - 1) * 100,
+            'Max Drawdown %': _drawdown(equity).min(axis=0) * 100 if len(equity) else np.zeros(len(symbols)),
+            'Trades': count,
+            'Hit Rate %': hit_rate,
+            'Exposure %': ((held > 0) & present).sum(axis=0) / np.maximum(present.sum(axis=0), 1) * 100,
+        }, index=pd.Index(symbols, name='Symbol'))
+
+    def stats(self):
+        """סיכום התיק: תשואה, תשואה שנתית, ירידה מקסימלית, Sharpe, עסקאות ו-hit rate"""
+        years = len(self.index) / TRADING_DAYS_PER_YEAR
+        total = float(self.equity.iloc[-1] - 1) if len(self.equity) else 0.0
+        volatility = float(self.portfolio.std())
+        closed = self.trades[~self.trades['Open']] if len(self.trades) else self.trades
+        return {
+            'total_return': total,
+            'annual_return': (1 + total) ** (1 / years) - 1 if years > 0 and total > -1 else np.nan,
+            'max_drawdown': float(_drawdown(self.equity.to_numpy()).min()) if len(self.equity) else 0.0,
+            'sharpe': float(self.portfolio.mean() / volatility * np.sqrt(TRADING_DAYS_PER_YEAR))
+            if volatility > 0 else np.nan,
+            'trades': len(self.trades),
+            'hit_rate': float((closed['Return %'] > 0).mean()) if len(closed) else np.nan,
+            'avg_trade': float(closed['Return %'].mean() / 100) if len(closed) else np.nan,
+            'exposure': float(self.summary['Exposure %'].mean() / 100) if len(self.summary) else 0.0,
+        }
+
+
+class Backtester:
+    """ממיר אותות/ציונים לפוזיציות ומריץ אותן על הפאנל"""
+
+    @staticmethod
+    def signal_positions(panel, entry=None, exit=None, rules=SIGNAL_RULES):
+        """
+        פוזיציה לפי חוקי האותות: כניסה באחד מ-entry (ברירת מחדל - כל אותות הקנייה),
+        יציאה באחד מ-exit (ברירת מחדל - כל אותות המכירה).
+        """
+        entry = set(entry) if entry is not None else {r.name for r in rules if r.side == 'buy'}
+        exit = set(exit) if exit is not None else {r.name for r in rules if r.side == 'sell'}
+        used = [r for r in rules if r.name in entry or r.name in exit]
+        masks = dict(zip((r.name for r in used), rule_masks(_arrays(panel), used)))
+        shape = panel['Close'].shape
+        enter = np.zeros(shape, dtype=bool)
+        leave = np.zeros(shape, dtype=bool)
+        for name, mask in masks.items():
+            if name in entry:
+                enter |= mask
+            if name in exit:
+                leave |= mask
+        return _hold(enter, leave)
+
+    @staticmethod
+    def score_positions(panel, min_score=4, exit_score=None, rules=SCANNER_RULES):
+        """
+        פוזיציה לפי ציון הסורק: כניסה כשהציון >= min_score (4 = Strong Buy),
+        יציאה כשהוא יורד מתחת ל-exit_score (ברירת מחדל - min_score).
+        """
+        scores = score_values(_arrays(panel), rules)
+        exit_score = min_score if exit_score is None else exit_score
+        return _hold(scores >= min_score, scores < exit_score)
+
+    @staticmethod
+    def run(panel, positions, cost_bps=DEFAULT_COST_BPS):
+        """
+        מריץ פוזיציות (0/1 בסגירת כל נר, זמן × סימבולים) על מחירי הסגירה של הפאנל.
+        נר בלי מסחר לסימבול (לוח מסחר אחר) לא מזיז את הפוזיציה ולא מניב תשואה.
+        """
+        close_frame = panel['Close']
+        close = close_frame.to_numpy(dtype=float)
+        cost = cost_bps / 10_000
+        filled = _ffill(close)
+        prev_close = np.vstack([np.full((1, close.shape[1]), np.nan), filled[:-1]])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change = np.where(np.isnan(close), 0.0, filled / prev_close - 1)
+        change = np.nan_to_num(change)
+
+        # הפוזיציה שהוחלטה בסגירת נר של הסימבול מוחזקת מהנר הבא שלו, ומשתנה רק בנרות שלו
+        present = ~np.isnan(close)
+        decided = _ffill(np.where(present, np.asarray(positions, dtype=float), np.nan))
+        held = np.vstack([np.zeros((1, close.shape[1])), decided[:-1]])
+        held = np.nan_to_num(_ffill(np.where(present, held, np.nan)), nan=0.0)
+        prev_held = np.vstack([np.zeros((1, close.shape[1])), held[:-1]])
+        returns = held * change - np.abs(held - prev_held) * cost
+        return BacktestResult(close_frame.index, close_frame.columns, returns, held, close, cost)
@@ -0,0 +1,201 @@
+"""
+ProTrade Ultimate - Intraday Bar Store
+מאגר נרות תוך-יומיים ב-ring buffer לכל (סימבול, אינטרוול) - נרות חדשים מוזנים לאינדיקטורים אחד-אחד
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLUMNS, IncrementalIndicators
+from panel import FIELDS
+
+# אינטרוול -> התקופה שמורידים בטעינה הראשונה (בתוך מגבלות Yahoo לנתונים תוך-יומיים)
+INTRADAY_PERIODS = {
+    '1m': '5d',
+    '5m': '1mo',
+    '15m': '1mo',
+    '1h': '1y',
+}
+INTERVALS = ['1d'] + list(INTRADAY_PERIODS)
+# מספיק לטעינה הראשונה של כל אינטרוול (למשל 5 ימים × 390 דקות)
+DEFAULT_CAPACITY = 2048
+BAR_COLUMNS = FIELDS + INDICATOR_COLUMNS
+# כל סדרה תופסת capacity × (עמודות + זמן) × 8 בתים (~0.3MB) - מספר הסדרות חסום ב-LRU
+DEFAULT_MAX_SERIES = int(os.environ.get('PROTRADE_BAR_SERIES', '256'))
+# סדרה שלא נקראה ולא עודכנה זמן כזה (בשניות) מפונה גם כשיש מקום
+DEFAULT_IDLE = int(os.environ.get('PROTRADE_BAR_IDLE', '3600'))
+
+
+class BarRing:
+    """ring buffer של נרות בגודל קבוע - הנרות הישנים נדרסים"""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, columns=BAR_COLUMNS):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.times = np.zeros(capacity, dtype=np.int64)
+        self.values = np.full((capacity, len(self.columns)), np.nan)
+        self.start = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _pos(self, i):
+        return (self.start + i) % self.capacity
+
+    @property
+    def last_time(self):
+        return int(self.times[self._pos(self.size - 1)]) if self.size else None
+
+    def append(self, time_ns, row):
+        """מוסיף נר (דורס את הישן ביותר כשהמאגר מלא)"""
+        if self.size < self.capacity:
+            pos = self._pos(self.size)
+            self.size += 1
+        else:
+            pos = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[pos] = time_ns
+        self.values[pos] = row
+
+    def set_last(self, row):
+        """מעדכן את הנר האחרון (נר שעוד לא נסגר)"""
+        self.values[self._pos(self.size - 1)] = row
+
+    def frame(self, tz=None):
+        """הנרות לפי הסדר כ-DataFrame"""
+        order = self._pos(np.arange(self.size))
+        index = pd.DatetimeIndex(self.times[order]).tz_localize('UTC')
+        index = index.tz_convert(tz) if tz is not None else index.tz_localize(None)
+        return pd.DataFrame(self.values[order], index=index, columns=self.columns)
+
+
+class _Series:
+    """נרות ומצב אינדיקטורים של (סימבול, אינטרוול)"""
+
+    def __init__(self, capacity, tz):
+        self.ring = BarRing(capacity)
+        self.indicators = IncrementalIndicators(history=False)
+        self.tz = tz
+        self.used = time.monotonic()
+
+    def push(self, timestamp, open_, high, low, close, volume):
+        replace = self.indicators.last_timestamp == timestamp
+        row = self.indicators.update(timestamp, open_, high, low, close, volume)
+        values = [open_, high, low, close, volume] + [row[col] for col in INDICATOR_COLUMNS]
+        if replace:
+            self.ring.set_last(values)
+        else:
+            self.ring.append(timestamp.value, values)
+
+
+class BarStore:
+    """
+    כל הסדרות התוך-יומיות של התהליך - משותף לכל הסשנים.
+    מספר הסדרות חסום (max_series, פינוי LRU) וסדרה שלא נגעו בה idle שניות מפונה -
+    כל סימבול × אינטרוול שנפתח פעם אחת לא נשאר בזיכרון לכל חיי התהליך.
+    מונים: evictions (פינוי LRU), expired (פינוי סדרה שהתיישנה).
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, max_series=DEFAULT_MAX_SERIES, idle=DEFAULT_IDLE):
+        self.capacity = capacity
+        self.max_series = max_series
+        self.idle = idle
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._series)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _touch(self, key):
+        # מחזיר את הסדרה (או None) ומסמן אותה כבשימוש אחרון
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                series.used = time.monotonic()
+                self._series.move_to_end(key)
+            return series
+
+    def _remove(self, key):
+        # נקרא תחת self._lock. המנעול של המפתח נשאר אם מישהו מחזיק אותו עכשיו
+        del self._series[key]
+        lock = self._key_locks.get(key)
+        if lock is not None and not lock.locked():
+            del self._key_locks[key]
+
+    def _evict(self, keep):
+        # נקרא תחת self._lock. קודם סדרות שהתיישנו, אחר כך הפחות בשימוש לאחרונה (תחילת ה-OrderedDict).
+        # הסדרה שעודכנה עכשיו (keep) לא מפונה
+        cutoff = time.monotonic() - self.idle
+        for key in [k for k, series in self._series.items() if k != keep and series.used <= cutoff]:
+            self._remove(key)
+            self.expired += 1
+        while len(self._series) > self.max_series:
+            victim = next((k for k in self._series if k != keep), None)
+            if victim is None:
+                break
+            self._remove(victim)
+            self.evictions += 1
+
+    def last_timestamp(self, symbol, interval):
+        """זמן הנר האחרון במאגר (או None)"""
+        series = self._touch((symbol, interval))
+        return series.indicators.last_timestamp if series is not None else None
+
+    def update(self, symbol, interval, df):
+        """
+        ממזג נרות חדשים ממקור הנתונים ומחזיר את כל הנרות עם האינדיקטורים.
+        df יכול להכיל רק את הנרות האחרונים - כל עוד הוא חופף לנר האחרון שבמאגר.
+        """
+        key = (symbol, interval)
+        with self._key_lock(key):
+            series = self._touch(key)
+            last = series.indicators.last_timestamp if series is not None else None
+            if df is not None and not df.empty:
+                if last is None or df.index[0] > last:
+                    # אין חפיפה (פער בנתונים או טעינה ראשונה) - בונים מחדש מהפריים
+                    series = _Series(self.capacity, df.index.tz)
+                    new = df
+                else:
+                    new = df[df.index >= last]
+                for ts, o, h, l, c, v in zip(new.index, new['Open'].to_numpy(dtype=float),
+                                             new['High'].to_numpy(dtype=float), new['Low'].to_numpy(dtype=float),
+                                             new['Close'].to_numpy(dtype=float), new['Volume'].to_numpy(dtype=float)):
+                    series.push(ts, o, h, l, c, v)
+                with self._lock:
+                    self._series[key] = series
+                    self._series.move_to_end(key)
+                    self._evict(keep=key)
+            return series.ring.frame(series.tz) if series is not None else None
+
+    def frame(self, symbol, interval):
+        """הנרות השמורים של (סימבול, אינטרוול) בלי לפנות לרשת"""
+        series = self._touch((symbol, interval))
+        return series.ring.frame(series.tz) if series is not None else None
+
+    def reset(self, symbol=None):
+        with self._lock:
+            for key in [k for k in self._series if symbol is None or k[0] == symbol]:
+                self._remove(key)
+
+    def stats(self):
+        return {
+            'series': len(self._series),
+            'max_series': self.max_series,
+            'idle_seconds': self.idle,
+            'bytes': sum(s.ring.times.nbytes + s.ring.values.nbytes for s in list(self._series.values())),
+            'evictions': self.evictions,
+            'expired': self.expired,
+        }
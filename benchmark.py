@@ -0,0 +1,397 @@
+"""
+ProTrade Ultimate - Benchmark Suite
+מדידת ביצועים של מסלולי החישוב החמים על נתוני OHLCV סינתטיים
+
+הרצה:
+    python benchmark.py                                  # כל הרשת: 10/500/5000 סימבולים × 1/5/20 שנים
+    python benchmark.py --symbols 10,500 --years 1,5 --output head.json
+    python benchmark.py --compare base.json head.json    # השוואה בין שני commits
+
+התא הגדול (5000 סימבולים × 20 שנים) דורש כ-8GB זיכרון.
+"""
+
+import argparse
+import gc
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import feedparser
+import numpy as np
+import pandas as pd
+
+from backtest import Backtester
+from indicators import IndicatorEngine
+from panel import FIELDS, PanelIndicators
+from providers import DataProvider, set_provider
+from scoring import ScannerScoring, rule_columns
+from screener import compile_query
+from signals import SignalEngine
+from snapshot import SnapshotTable
+
+BARS_PER_YEAR = 252
+DEFAULT_SYMBOLS = [10, 500, 5000]
+DEFAULT_YEARS = [1, 5, 20]
+# שלבים שרצים סימבול-סימבול מוגבלים למדגם, הזמן מנורמל ל-items
+DEFAULT_PER_SYMBOL_LIMIT = 500
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_SCREEN = "RSI between 30 and 70 and Close > SMA200 and Volume > 1.2*Volume_SMA"
+
+# רק תלות חסרה (streamlit/ta) מאפשרת לדלג על שלבי utils, ורק עם --skip-utils; כל שגיאה אחרת עוצרת
+try:
+    from utils import Portfolio, StockAnalyzer
+    UTILS_ERROR = None
+except ImportError as e:
+    Portfolio = StockAnalyzer = None
+    UTILS_ERROR = f"{type(e).__name__}: {e}"
+
+
+def synthetic_ohlcv(n_symbols, n_bars, seed=0):
+    """
+    נתוני OHLCV סינתטיים (random walk גאומטרי) בצורת (סימבולים × זמן).
+    מחזיר (מילון שדה -> מערך, אינדקס ימי מסחר, רשימת סימבולים).
+    """
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0003, 0.02, size=(n_symbols, n_bars))
+    start = rng.uniform(10, 500, size=(n_symbols, 1))
+    close = start * np.exp(np.cumsum(returns, axis=1))
+    gap = rng.normal(0, 0.005, size=close.shape)
+    open_ = np.concatenate([start, close[:, :-1]], axis=1) * (1 + gap)
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.01, size=close.shape)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.01, size=close.shape)))
+    volume = np.round(rng.lognormal(13.5, 0.6, size=close.shape))
+
+    index = pd.bdate_range(end=pd.Timestamp('2024-12-31'), periods=n_bars, name='Date')
+    symbols = [f"SYM{i:05d}" for i in range(n_symbols)]
+    arrays = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+    return arrays, index, symbols
+
+
+def symbol_frame(arrays, index, row):
+    """פריים היסטוריה של סימבול בודד, כמו Ticker.history"""
+    return pd.DataFrame({field: arrays[field][row] for field in FIELDS}, index=index)
+
+
+def download_frame(arrays, index, symbols, rows=slice(None)):
+    """פריים בצורת yf.download(group_by='ticker') - עמודות (סימבול, שדה)"""
+    block = np.stack([arrays[field][:, rows] for field in FIELDS], axis=-1)  # סימבולים × זמן × שדות
+    columns = pd.MultiIndex.from_product([symbols, FIELDS])
+    values = block.transpose(1, 0, 2).reshape(block.shape[1], -1)
+    return pd.DataFrame(values, index=index[rows], columns=columns)
+
+
+class SyntheticProvider(DataProvider):
+    """ספק בזיכרון מעל הנתונים הסינתטיים - כך שלבי התיק לא נוגעים ברשת"""
+
+    name = 'synthetic'
+
+    def __init__(self, arrays, index, symbols):
+        self.arrays = arrays
+        self.index = index
+        self.rows = {symbol: row for row, symbol in enumerate(symbols)}
+
+    def history(self, symbol, period=None, start=None, interval='1d'):
+        return symbol_frame(self.arrays, self.index, self.rows[symbol]).iloc[-1:]
+
+    def download(self, symbols, period=None, start=None, interval='1d'):
+        symbols = [s for s in symbols if s in self.rows]
+        rows = [self.rows[s] for s in symbols]
+        arrays = {field: arr[rows] for field, arr in self.arrays.items()}
+        return download_frame(arrays, self.index, symbols, rows=slice(-1, None))
+
+    def info(self, symbol):
+        return {}
+
+    def news(self, urls):
+        return [feedparser.FeedParserDict(entries=[]) for _ in urls]
+
+
+# --- שלבים ---
+# כל שלב מקבל את ההקשר המשותף ומחזיר את מספר הפריטים שעיבד
+
+def stage_calculate_indicators(ctx):
+    ctx['analyzed'] = {}
+    for symbol, df in ctx['frames'].items():
+        ctx['analyzed'][symbol] = StockAnalyzer.calculate_indicators(df.copy())
+    return len(ctx['frames'])
+
+
+def stage_detect_signals(ctx):
+    for df in ctx['analyzed'].values():
+        StockAnalyzer.detect_signals(df)
+    return len(ctx['analyzed'])
+
+
+def stage_incremental_full(ctx):
+    ctx['engine'] = IndicatorEngine()
+    for symbol, df in ctx['frames'].items():
+        ctx['engine'].update(symbol, df)
+    return len(ctx['frames'])
+
+
+def stage_incremental_tick(ctx):
+    # נר חדש אחד לכל סימבול מעל מצב קיים - המסלול של כל rerun (רק השורות החדשות נבנות)
+    for symbol, df in ctx['ticks'].items():
+        ctx['engine'].advance(symbol, df)
+    return len(ctx['ticks'])
+
+
+def stage_scanner_panel(ctx):
+    ctx['panel'] = PanelIndicators.compute(ctx['download'])
+    return len(ctx['symbols'])
+
+
+def stage_scanner_columns(ctx):
+    # רק האינדיקטורים שהסורק קורא
+    PanelIndicators.compute(ctx['download'], columns=['RSI'] + rule_columns())
+    return len(ctx['symbols'])
+
+
+def stage_scanner_latest(ctx):
+    ctx['latest'] = PanelIndicators.latest(ctx['panel'])
+    return len(ctx['symbols'])
+
+
+def stage_signal_events(ctx):
+    # אותות היסטוריים לכל הנרות של כל הסימבולים
+    SignalEngine.panel_events(ctx['panel'])
+    return len(ctx['symbols'])
+
+
+def stage_backtest(ctx):
+    # אותות detect_signals כאסטרטגיה על כל הפאנל
+    Backtester.run(ctx['panel'], Backtester.signal_positions(ctx['panel'])).stats()
+    return len(ctx['symbols'])
+
+
+def stage_scanner_score(ctx):
+    ScannerScoring.score(ctx['latest'])
+    return len(ctx['latest'])
+
+
+def stage_screener(ctx):
+    snapshot = SnapshotTable()
+    snapshot.update_latest(ctx['latest'])
+    compile_query.cache_clear()
+    compile_query(DEFAULT_SCREEN).filter(snapshot.frame(ctx['latest'].index))
+    return len(ctx['latest'])
+
+
+def stage_portfolio(ctx):
+    Portfolio.get_prices.clear()
+    Portfolio.calculate_portfolio_value(ctx['holdings'])
+    return len(ctx['holdings'])
+
+
+# (שם, פונקציה, דורש utils)
+STAGES = [
+    ('calculate_indicators', stage_calculate_indicators, True),
+    ('detect_signals', stage_detect_signals, True),
+    ('incremental_full', stage_incremental_full, False),
+    ('incremental_tick', stage_incremental_tick, False),
+    ('scanner_panel', stage_scanner_panel, False),
+    ('scanner_columns', stage_scanner_columns, False),
+    ('scanner_latest', stage_scanner_latest, False),
+    ('signal_events', stage_signal_events, False),
+    ('backtest', stage_backtest, False),
+    ('scanner_score', stage_scanner_score, False),
+    ('screener', stage_screener, False),
+    ('portfolio', stage_portfolio, True),
+]
+
+
+def _measure(func, ctx, repeat, memory):
+    """זמן (הטוב מבין repeat הרצות) ושיא זיכרון (הרצה נפרדת תחת tracemalloc)"""
+    seconds = float('inf')
+    items = 0
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        items = func(ctx)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            func(ctx)
+            peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return seconds, items, peak_mb
+
+
+def run_cell(n_symbols, years, stages, repeat=1, memory=True, per_symbol_limit=DEFAULT_PER_SYMBOL_LIMIT, seed=0):
+    """מריץ את כל השלבים על גודל יקום ואורך היסטוריה אחד"""
+    results = []
+
+    def record(stage, seconds, items, peak_mb=None, skipped=None):
+        results.append({
+            'symbols': n_symbols,
+            'years': years,
+            'stage': stage,
+            'seconds': seconds,
+            'items': items,
+            'ms_per_item': seconds / items * 1000 if seconds is not None and items else None,
+            'peak_mb': peak_mb,
+            'skipped': skipped,
+        })
+
+    start = time.perf_counter()
+    arrays, index, symbols = synthetic_ohlcv(n_symbols, years * BARS_PER_YEAR + 1, seed)
+    record('generate', time.perf_counter() - start, n_symbols)
+
+    # הנר האחרון מוחזק בצד ומוזן כ"טיק" בשלב incremental_tick
+    sample = min(n_symbols, per_symbol_limit)
+    ctx = {
+        'symbols': symbols,
+        'frames': {symbols[i]: symbol_frame(arrays, index, i).iloc[:-1] for i in range(sample)},
+        'ticks': {symbols[i]: symbol_frame(arrays, index, i) for i in range(sample)},
+        'download': download_frame(arrays, index, symbols),
+        'holdings': {s: {'shares': 10.0, 'avg_cost': 100.0} for s in symbols},
+    }
+    set_provider(SyntheticProvider(arrays, index, symbols))
+
+    for name, func, needs_utils in stages:
+        if needs_utils and UTILS_ERROR is not None:
+            print(f"  SKIPPED {name}: utils unavailable ({UTILS_ERROR})", file=sys.stderr)
+            record(name, None, 0, skipped=UTILS_ERROR)
+            continue
+        seconds, items, peak_mb = _measure(func, ctx, repeat, memory)
+        record(name, seconds, items, peak_mb)
+        print(f"  {n_symbols:>6} symbols {years:>3}y  {name:<22} {seconds:9.4f}s"
+              + (f"  {peak_mb:9.1f} MB" if peak_mb is not None else ''), file=sys.stderr)
+
+    set_provider(None)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(symbols=DEFAULT_SYMBOLS, years=DEFAULT_YEARS, stages=None, repeat=1, memory=True,
+        per_symbol_limit=DEFAULT_PER_SYMBOL_LIMIT, seed=0):
+    """מריץ את כל הרשת ומחזיר מילון תוצאות שניתן לשמור כ-JSON"""
+    selected = [s for s in STAGES if stages is None or s[0] in stages]
+    results = []
+    for n_symbols in symbols:
+        for n_years in years:
+            results.extend(run_cell(n_symbols, n_years, selected, repeat, memory, per_symbol_limit, seed))
+            gc.collect()
+
+    return {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'repeat': repeat,
+            'per_symbol_limit': per_symbol_limit,
+            'seed': seed,
+            # ru_maxrss ב-KB בלינוקס
+            'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        },
+        'results': results,
+    }
+
+
+def compare(base, head, threshold=DEFAULT_THRESHOLD):
+    """
+    משווה שתי הרצות. מחזיר (טבלת השוואה, רשימת רגרסיות).
+    רגרסיה = שלב שהזמן שלו ל-item עלה ביותר מ-threshold.
+    """
+    def table(report):
+        frame = pd.DataFrame(report['results'])
+        frame = frame[frame['seconds'].notna()]
+        return frame.set_index(['symbols', 'years', 'stage'])[['seconds', 'ms_per_item', 'peak_mb']]
+
+    joined = table(base).join(table(head), lsuffix='_base', rsuffix='_head', how='left')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        joined['time_ratio'] = joined['ms_per_item_head'] / joined['ms_per_item_base']
+        joined['memory_ratio'] = joined['peak_mb_head'] / joined['peak_mb_base']
+    # שלב שנמדד ב-base ולא ב-head (דולג או נמחק) נחשב רגרסיה - לא נעלם מההשוואה
+    regressions = joined[(joined['time_ratio'] > 1 + threshold) | joined['seconds_head'].isna()]
+    return joined, regressions
+
+
+def _print_report(report):
+    frame = pd.DataFrame(report['results'])
+    columns = ['symbols', 'years', 'stage', 'seconds', 'ms_per_item', 'peak_mb', 'skipped']
+    print(frame[columns].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ProTrade benchmark suite")
+    parser.add_argument('--symbols', default=','.join(map(str, DEFAULT_SYMBOLS)),
+                        help="גדלי יקום מופרדים בפסיק")
+    parser.add_argument('--years', default=','.join(map(str, DEFAULT_YEARS)),
+                        help="אורכי היסטוריה בשנים מופרדים בפסיק")
+    parser.add_argument('--stages', help="רק השלבים האלה (מופרדים בפסיק)")
+    parser.add_argument('--repeat', type=int, default=1, help="מספר הרצות לכל שלב (נלקח הזמן הטוב)")
+    parser.add_argument('--per-symbol-limit', type=int, default=DEFAULT_PER_SYMBOL_LIMIT,
+                        help="מקסימום סימבולים לשלבים שרצים סימבול-סימבול")
+    parser.add_argument('--no-memory', action='store_true', help="בלי מדידת שיא זיכרון")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="שמירת התוצאות כ-JSON")
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'),
+                        help="השוואת שתי הרצות שמורות (יציאה עם קוד 1 אם יש רגרסיה)")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="סף רגרסיה יחסי בזמן ל-item (ברירת מחדל 0.10)")
+    parser.add_argument('--skip-utils', action='store_true',
+                        help="דילוג מפורש על שלבי utils כש-streamlit/ta לא מותקנים")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding='utf-8') as f:
+                reports.append(json.load(f))
+        joined, regressions = compare(*reports, threshold=args.threshold)
+        print(joined.to_string(float_format=lambda x: f"{x:.4f}"))
+        if not regressions.empty:
+            print(f"\n{len(regressions)} regressions above {args.threshold:.0%}:")
+            print(regressions[['ms_per_item_base', 'ms_per_item_head', 'time_ratio']].to_string())
+            return 1
+        return 0
+
+    stages = args.stages.split(',') if args.stages else None
+    if stages:
+        unknown = set(stages) - {name for name, *_ in STAGES}
+        if unknown:
+            parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+    needs_utils = [name for name, _, needs in STAGES if needs and (stages is None or name in stages)]
+    if needs_utils and UTILS_ERROR is not None and not args.skip_utils:
+        parser.error(f"stages {', '.join(needs_utils)} need utils.py ({UTILS_ERROR}); "
+                     "install requirements.txt or pass --skip-utils")
+
+    report = run(
+        symbols=[int(s) for s in args.symbols.split(',')],
+        years=[int(y) for y in args.years.split(',')],
+        stages=stages,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        per_symbol_limit=args.per_symbol_limit,
+        seed=args.seed,
+    )
+    _print_report(report)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, default=str)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,241 @@
+"""
+ProTrade Ultimate - Chart Builder
+בניית גרף ה-Trading Terminal מסדרות וקטוריות, עם cache לגרפים לפי (סימבול, תקופה, תצוגה)
+הגרף נשלח בתקציב נקודות קבוע - חלון זום צר יותר מקבל רזולוציה גבוהה יותר
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+
+from downsample import DEFAULT_BUDGET, downsample_ohlc, lttb, time_values
+from scoring import rule_columns
+from signals import SIGNAL_RULES, SignalEngine
+
+UP_COLOR = '#00ff88'
+DOWN_COLOR = '#ff0055'
+GRID_COLOR = 'rgba(255,255,255,0.1)'
+
+# סמני אותות: (צורה, צבע, עמודה למיקום) לפי צד האות
+SIGNAL_MARKERS = {
+    'buy': ('triangle-up', UP_COLOR, 'Low'),
+    'sell': ('triangle-down', DOWN_COLOR, 'High'),
+    'neutral': ('diamond', '#ffc800', 'High'),
+}
+
+
+def _version(df):
+    """מזהה גרסת נתונים - נר חדש או עדכון של הנר האחרון מייצרים גרף חדש"""
+    return len(df), df.index[-1], float(df['Close'].iloc[-1]), float(df['Volume'].iloc[-1])
+
+
+def _window(df, window):
+    if window is None:
+        return df
+    start, end = window
+    return df.loc[start:end]
+
+
+class ChartData:
+    """
+    כל הסדרות של הגרף מחושבות פעם אחת - החלפת תצוגה משתמשת באותם מערכים.
+    נרות ונפח מתמזגים לתקציב budget, קווי האינדיקטורים מודגמים ב-LTTB.
+    """
+
+    def __init__(self, df, budget=DEFAULT_BUDGET):
+        self.bars = len(df)
+        self.x, self.open, self.high, self.low, self.close, self.volume = downsample_ohlc(
+            df.index,
+            df['Open'].to_numpy(dtype=float),
+            df['High'].to_numpy(dtype=float),
+            df['Low'].to_numpy(dtype=float),
+            df['Close'].to_numpy(dtype=float),
+            df['Volume'].to_numpy(dtype=float),
+            budget
+        )
+        self.volume_colors = np.where(self.close >= self.open, UP_COLOR, DOWN_COLOR)
+
+        # כל קו נשמר עם ציר x משלו - LTTB בוחר נקודות שונות לכל סדרה.
+        # שתי רצועות בולינגר חולקות נקודות כדי שהמילוי ביניהן יישאר מדויק
+        t = time_values(df.index)
+        keep = {
+            col: lttb(t, df[col].to_numpy(dtype=float), budget)
+            for col in ('SMA50', 'SMA200', 'BB_high', 'BB_low', 'RSI') if col in df.columns
+        }
+        if 'BB_high' in keep and 'BB_low' in keep:
+            keep['BB_high'] = keep['BB_low'] = np.union1d(keep['BB_high'], keep['BB_low'])
+        self.series = {
+            col: {'x': df.index[rows], 'y': df[col].to_numpy(dtype=float)[rows]}
+            for col, rows in keep.items()
+        }
+
+        # אירועי האותות בחלון ברזולוציה מלאה - מעטים, לא עוברים דילול
+        self.signals = None
+        if len(df) and all(col in df.columns for col in rule_columns(SIGNAL_RULES)):
+            events = SignalEngine.series_events(df)
+            rows = df.index.get_indexer(events['Date'])
+            self.signals = {
+                name: {'x': df.index[rows[group]],
+                       'y': df[SIGNAL_MARKERS[side][2]].to_numpy(dtype=float)[rows[group]],
+                       'side': side}
+                for (name, side), group in events.groupby(['Signal', 'Side'], observed=True).indices.items()
+            }
+
+    @property
+    def downsampled(self):
+        return len(self.close) < self.bars
+
+
+class ChartBuilder:
+    """בונה גרפים ושומר את האחרונים ב-LRU (הגרף עצמו לא משתנה אחרי הבנייה)"""
+
+    def __init__(self, max_figures=64):
+        self.max_figures = max_figures
+        self._figures = OrderedDict()
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, cache, key, factory, limit):
+        with self._lock:
+            if key in cache:
+                cache.move_to_end(key)
+                return cache[key]
+        value = factory()
+        with self._lock:
+            cache[key] = value
+            while len(cache) > limit:
+                cache.popitem(last=False)
+        return value
+
+    def data(self, symbol, period, df, window=None, budget=DEFAULT_BUDGET):
+        """הסדרות המוכנות של (סימבול, תקופה, חלון זום) לגרסת הנתונים הנוכחית"""
+        key = (symbol, period, _version(df), window, budget)
+        return self._cached(self._data, key, lambda: ChartData(_window(df, window), budget), self.max_figures)
+
+    def build(self, symbol, period, df, show_sma=True, show_bb=False, show_volume=True, show_rsi=False,
+              window=None, budget=DEFAULT_BUDGET, show_signals=False):
+        """
+        גרף ה-Trading Terminal - מה-cache אם כבר נבנה לאותם נתונים ותצוגה.
+        window - זוג (התחלה, סוף) לזום; הנרות בחלון מקבלים את כל תקציב הנקודות.
+        """
+        key = (symbol, period, _version(df), show_sma, show_bb, show_volume, show_rsi, show_signals, window, budget)
+        return self._cached(
+            self._figures, key,
+            lambda: self._figure(symbol, self.data(symbol, period, df, window, budget),
+                                 show_sma, show_bb, show_volume, show_rsi, show_signals),
+            self.max_figures
+        )
+
+    def clear(self):
+        with self._lock:
+            self._figures.clear()
+            self._data.clear()
+
+    @staticmethod
+    def _figure(symbol, data, show_sma, show_bb, show_volume, show_rsi, show_signals=False):
+        row_heights = [0.7]
+        titles = [f'{symbol} Price']
+        if show_volume:
+            row_heights.append(0.15)
+            titles.append('Volume')
+        if show_rsi:
+            row_heights.append(0.15)
+            titles.append('RSI')
+
+        fig = make_subplots(
+            rows=len(row_heights), cols=1,
+            shared_xaxes=True,
+            vertical_spacing=0.03,
+            row_heights=row_heights,
+            subplot_titles=titles
+        )
+
+        # Candlestick
+        fig.add_trace(
+            go.Candlestick(
+                x=data.x,
+                open=data.open,
+                high=data.high,
+                low=data.low,
+                close=data.close,
+                name='Price',
+                increasing_line_color=UP_COLOR,
+                decreasing_line_color=DOWN_COLOR
+            ),
+            row=1, col=1
+        )
+
+        # SMAs
+        if show_sma:
+            fig.add_trace(go.Scatter(**data.series['SMA50'],
+                                     line=dict(color='#00ccff', width=1.5),
+                                     name='SMA 50'), row=1, col=1)
+            fig.add_trace(go.Scatter(**data.series['SMA200'],
+                                     line=dict(color='#ff0055', width=1.5),
+                                     name='SMA 200'), row=1, col=1)
+
+        # Bollinger Bands
+        if show_bb:
+            fig.add_trace(go.Scatter(**data.series['BB_high'],
+                                     line=dict(color='rgba(255,255,255,0.2)', width=1, dash='dash'),
+                                     name='BB Upper'), row=1, col=1)
+            fig.add_trace(go.Scatter(**data.series['BB_low'],
+                                     line=dict(color='rgba(255,255,255,0.2)', width=1, dash='dash'),
+                                     fill='tonexty', fillcolor='rgba(255,255,255,0.05)',
+                                     name='BB Lower'), row=1, col=1)
+
+        # Signal markers - one trace per signal so each can be toggled from the legend
+        if show_signals and data.signals:
+            for name, points in data.signals.items():
+                shape, color, _ = SIGNAL_MARKERS[points['side']]
+                fig.add_trace(go.Scatter(x=points['x'], y=points['y'], mode='markers', name=name,
+                                         marker=dict(symbol=shape, color=color, size=10,
+                                                     line=dict(width=1, color='rgba(0,0,0,0.6)'))),
+                              row=1, col=1)
+
+        # Volume
+        current_row = 2
+        if show_volume:
+            fig.add_trace(
+                go.Bar(x=data.x, y=data.volume, name='Volume',
+                       marker_color=data.volume_colors, opacity=0.7),
+                row=current_row, col=1
+            )
+            current_row += 1
+
+        # RSI
+        if show_rsi:
+            fig.add_trace(
+                go.Scatter(**data.series['RSI'], line=dict(color='#ffc800', width=2),
+                           name='RSI'),
+                row=current_row, col=1
+            )
+            fig.add_hline(y=70, line_dash="dash", line_color="red", opacity=0.5, row=current_row, col=1)
+            fig.add_hline(y=30, line_dash="dash", line_color="green", opacity=0.5, row=current_row, col=1)
+
+        fig.update_layout(
+            template='plotly_dark',
+            height=700,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            xaxis_rangeslider_visible=False,
+            hovermode='x unified',
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
+        )
+
+        fig.update_xaxes(gridcolor=GRID_COLOR)
+        fig.update_yaxes(gridcolor=GRID_COLOR)
+        return fig
+
+
+CHART_BUILDER = ChartBuilder()
@@ -0,0 +1,104 @@
+"""
+ProTrade Ultimate - Compact Frames
+ייצוג חסכוני לפריימים שנשמרים בזיכרון: float32 לכל עמודה שהעיגול שלה בתצוגה לא משתנה
+(חוץ מהעמודות שחוקי האותות והניקוד משווים), רק העמודות שבשימוש, ו-DatetimeIndex משותף לסימבולים עם אותו לוח מסחר.
+"""
+
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLUMNS
+from panel import FIELDS
+from scoring import SCANNER_RULES, rule_columns
+from signals import SIGNAL_RULES
+
+# העמודות שהממשק משתמש בהן - Dividends / Stock Splits / Capital Gains של הספק לא נשמרים
+FRAME_COLUMNS = FIELDS + INDICATOR_COLUMNS
+
+# דיוק התצוגה בממשק (ספרות אחרי הנקודה) - float32 רק אם העיגול לדיוק הזה זהה
+UI_DECIMALS = {'Volume': 0, 'Volume_SMA': 0, 'RSI': 1, 'Change %': 2}
+DEFAULT_DECIMALS = 2
+
+# עמודות שחוקי האותות והניקוד משווים זו לזו (SMA50 מול SMA200, MACD מול הסיגנל...) - נשארות float64.
+# בדיקת העיגול מבטיחה רק תצוגה זהה, לא את הסימן של a - b בסדרות קרובות, כך שחצייה יכולה לזוז או להיעלם
+EXACT_COLUMNS = frozenset(rule_columns(SCANNER_RULES) + rule_columns(SIGNAL_RULES))
+
+
+def _to_float32(values, decimals):
+    """
+    המרה ל-float32 ששומרת על העיגול לתצוגה: ערך שנפל לצד השני של גבול עיגול
+    מוזז ב-ulp אחד לכיוון המקורי. מחזיר None אם זה לא מספיק (או שיש גלישה).
+    """
+    with np.errstate(invalid='ignore', over='ignore'):
+        compact = values.astype(np.float32)
+        original = np.round(values, decimals)
+        wrong = np.round(compact.astype(np.float64), decimals) != original
+        wrong &= np.isfinite(values)
+        if wrong.any():
+            toward = np.where(values[wrong] > compact[wrong], np.inf, -np.inf).astype(np.float32)
+            compact[wrong] = np.nextafter(compact[wrong], toward)
+            restored = np.round(compact.astype(np.float64), decimals)
+            if not np.array_equal(restored, original, equal_nan=True):
+                return None
+        if not np.array_equal(np.isfinite(values), np.isfinite(compact)):
+            return None
+    return compact
+
+
+class IndexPool:
+    """
+    מאגר DatetimeIndex משותף - פריימים עם אותו לוח זמנים מחזיקים אובייקט אינדקס אחד.
+    האינדקסים מוחזקים ב-weakref ונעלמים כשאף פריים לא משתמש בהם.
+    """
+
+    def __init__(self):
+        self._pool = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def intern(self, index):
+        if len(index) == 0:
+            return index
+        key = (len(index), index[0], index[-1], str(index.tz) if hasattr(index, 'tz') else None)
+        with self._lock:
+            existing = self._pool.get(key)
+            if existing is not None and existing.equals(index):
+                self.shared += 1
+                return existing
+            self._pool[key] = index
+        return index
+
+
+INDEX_POOL = IndexPool()
+
+
+def compact_frame(df, columns=FRAME_COLUMNS, decimals=None, pool=INDEX_POOL, exact=EXACT_COLUMNS):
+    """
+    עותק חסכוני של פריים: רק columns (מה שקיים), float32 לכל עמודה מספרית שעוברת את בדיקת
+    העיגול לדיוק התצוגה, ואינדקס משותף מ-pool. עמודה שלא עוברת, או שהיא ב-exact, נשארת float64.
+    """
+    if df is None:
+        return None
+    decimals = {**UI_DECIMALS, **(decimals or {})}
+    keep = [c for c in columns if c in df.columns] if columns is not None else list(df.columns)
+
+    data = {}
+    for col in keep:
+        series = df[col]
+        if pd.api.types.is_float_dtype(series) or pd.api.types.is_integer_dtype(series):
+            values = series.to_numpy(dtype=np.float64)
+            compact = _to_float32(values, decimals.get(col, DEFAULT_DECIMALS)) if col not in exact else None
+            data[col] = compact if compact is not None else values
+        else:
+            data[col] = series.to_numpy()
+
+    index = pool.intern(df.index) if pool is not None and isinstance(df.index, pd.DatetimeIndex) else df.index
+    return pd.DataFrame(data, index=index, columns=keep, copy=False)
+
+
+def frame_bytes(df):
+    """גודל פריים בזיכרון (בלי האינדקס, שמשותף בין פריימים)"""
+    return int(df.memory_usage(index=False, deep=True).sum()) if df is not None else 0
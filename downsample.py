@@ -0,0 +1,71 @@
+"""
+ProTrade Ultimate - Chart Downsampling
+הקטנת סדרות לתקציב נקודות קבוע: נרות מתמזגים לנרות של טווח זמן גבוה יותר, קווים ב-LTTB
+"""
+
+import numpy as np
+
+# מספר נרות/נקודות מקסימלי לגרף - בערך רוחב הגרף בפיקסלים חלקי 1.5
+DEFAULT_BUDGET = 800
+
+
+def bucket_starts(n, budget):
+    """תחילת כל קבוצה של נרות רצופים (קבוצות בגודל שווה, האחרונה יכולה להיות קטנה יותר)"""
+    size = max(1, -(-n // max(1, budget)))
+    return np.arange(0, n, size)
+
+
+def downsample_ohlc(x, open_, high, low, close, volume, budget=DEFAULT_BUDGET):
+    """
+    ממזג נרות רצופים לנר אחד: Open ראשון, High מקסימלי, Low מינימלי, Close אחרון, Volume מצטבר.
+    מחזיר (x, open, high, low, close, volume) - x של כל נר הוא זמן הנר הראשון בקבוצה.
+    """
+    n = len(close)
+    if n <= budget:
+        return x, open_, high, low, close, volume
+    starts = bucket_starts(n, budget)
+    ends = np.append(starts[1:], n) - 1
+    return (
+        x[starts],
+        open_[starts],
+        np.fmax.reduceat(high, starts),
+        np.fmin.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(np.nan_to_num(volume), starts),
+    )
+
+
+def lttb(x, y, budget=DEFAULT_BUDGET):
+    """
+    Largest-Triangle-Three-Buckets - אינדקסים של הנקודות שנשמרות (כולל הראשונה והאחרונה).
+    x ו-y מספריים; נקודות NaN מושמטות לפני הדגימה.
+    """
+    finite = np.flatnonzero(np.isfinite(y))
+    n = len(finite)
+    if n <= budget or budget < 3:
+        return finite
+    xs = np.asarray(x, dtype=float)[finite]
+    ys = np.asarray(y, dtype=float)[finite]
+
+    # דליים פנימיים בין הנקודה הראשונה לאחרונה
+    edges = np.linspace(1, n - 1, budget - 1).astype(np.int64)
+    chosen = np.empty(budget, dtype=np.int64)
+    chosen[0], chosen[-1] = 0, n - 1
+    prev = 0
+    for i in range(budget - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # ממוצע הדלי הבא (או הנקודה האחרונה)
+        next_lo, next_hi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[next_lo:next_hi].mean() if next_hi > next_lo else xs[-1]
+        avg_y = ys[next_lo:next_hi].mean() if next_hi > next_lo else ys[-1]
+        # שטח המשולש (פי 2) בין הנקודה הקודמת, כל מועמד והממוצע הבא
+        area = np.abs((xs[prev] - avg_x) * (ys[lo:hi] - ys[prev])
+                      - (xs[prev] - xs[lo:hi]) * (avg_y - ys[prev]))
+        prev = lo + int(np.argmax(area))
+        chosen[i + 1] = prev
+    return finite[chosen]
+
+
+def time_values(index):
+    """ציר זמן כמספרים (ננו-שניות) לחישובי LTTB"""
+    return np.asarray(index.asi8 if hasattr(index, 'asi8') else index, dtype=float)
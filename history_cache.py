@@ -0,0 +1,182 @@
+"""
+ProTrade Ultimate - History Cache
+cache של פריימי היסטוריה (עם אינדיקטורים) בתקציב זיכרון קבוע.
+פריים אחד לכל סימבול - תקופה קצרה נחתכת מהתקופה הארוכה שכבר שמורה ('1y' מתוך '5y').
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from compact import frame_bytes
+from store import period_covers, slice_period
+
+DEFAULT_MAX_BYTES = int(os.environ.get('PROTRADE_HISTORY_CACHE_MB', '256')) * 2 ** 20
+DEFAULT_TTL = 300
+POLICIES = ('lru', 'lfu')
+
+
+class _Entry:
+    __slots__ = ('frame', 'period', 'nbytes', 'expires', 'uses')
+
+    def __init__(self, frame, period, ttl):
+        self.frame = frame
+        self.period = period
+        self.nbytes = frame_bytes(frame)
+        self.expires = time.monotonic() + ttl
+        self.uses = 1
+
+
+class HistoryCache:
+    """
+    cache פריימים לפי סימבול עם תקציב בתים ופינוי LRU או LFU.
+    מונים: hits (כולל sliced - פגיעה שנחתכה מתקופה ארוכה יותר), coalesced (המתינו לטעינה של סשן אחר),
+    misses (טעינות בפועל), evictions, expired (פריים שפג תוקפו - נספר פעם אחת, כשמחליפים או מפנים אותו).
+    on_evict(symbol) נקרא כשסימבול יוצא מה-cache (פינוי או invalidate) - לשחרור מצב נלווה.
+    פריים שפג תוקפו נשאר (ונספר בתקציב) עד שמחליפים או מפנים אותו, כך שהמצב הנלווה נשמר לטעינה הבאה.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, policy='lru', ttl=DEFAULT_TTL, on_evict=None):
+        if policy not in POLICIES:
+            raise ValueError(f"מדיניות פינוי לא נתמכת: {policy}")
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+        self.nbytes = 0
+        self.hits = 0
+        self.sliced = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _lookup(self, symbol, period):
+        # נקרא תחת self._lock
+        entry = self._entries.get(symbol)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            return None
+        if not period_covers(entry.period, period):
+            return None
+        entry.uses += 1
+        self._entries.move_to_end(symbol)
+        self.hits += 1
+        if entry.period != period:
+            self.sliced += 1
+        return entry
+
+    def _remove(self, symbol):
+        entry = self._entries.pop(symbol)
+        self.nbytes -= entry.nbytes
+        return entry
+
+    def _released(self, symbols):
+        # נקרא מחוץ ל-self._lock
+        if self.on_evict is not None:
+            for symbol in symbols:
+                self.on_evict(symbol)
+
+    def _evict(self, keep):
+        # LRU - הכי פחות בשימוש לאחרונה (תחילת ה-OrderedDict); LFU - הכי מעט פגיעות, ובשוויון הישן יותר.
+        # הפריים שנכנס עכשיו (keep) לא מפונה. מחזיר את הסימבולים שפונו
+        victims = []
+        while self.nbytes > self.max_bytes and len(self._entries) > 1:
+            candidates = (s for s in self._entries if s != keep)
+            if self.policy == 'lru':
+                victim = next(candidates)
+            else:
+                victim = min(candidates, key=lambda s: self._entries[s].uses)
+            if self._remove(victim).expires <= time.monotonic():
+                self.expired += 1
+            else:
+                self.evictions += 1
+            victims.append(victim)
+        return victims
+
+    def get(self, symbol, period):
+        """הפריים של התקופה (חתוך מתקופה ארוכה יותר אם צריך), או None אם אין פגיעה"""
+        with self._lock:
+            entry = self._lookup(symbol, period)
+        if entry is None or entry.frame is None:
+            return None
+        return slice_period(entry.frame, period)
+
+    def put(self, symbol, period, frame):
+        """שומר את הפריים המלא של סימבול (מחליף תקופה קצרה יותר או פג תוקף)"""
+        entry = _Entry(frame, period, self.ttl)
+        with self._lock:
+            current = self._entries.get(symbol)
+            if current is not None:
+                stale = current.expires <= time.monotonic()
+                if not stale and period_covers(current.period, period) and current.period != period:
+                    return
+                self._remove(symbol)
+                if stale:
+                    self.expired += 1
+                entry.uses += current.uses
+            self._entries[symbol] = entry
+            self.nbytes += entry.nbytes
+            victims = self._evict(keep=symbol)
+        self._released(victims)
+
+    def get_or_load(self, symbol, period, load):
+        """
+        פריים התקופה מה-cache, או load() פעם אחת לכל סימבול גם כשכמה סשנים מבקשים אותו יחד.
+        load מחזיר את הפריים המלא (יכול להיות ארוך מהתקופה) או None.
+        """
+        with self._lock:
+            entry = self._lookup(symbol, period)
+        if entry is None:
+            with self._symbol_lock(symbol):
+                # מי שחיכה למנעול מוצא את מה שהקודם טען
+                with self._lock:
+                    entry = self._entries.get(symbol)
+                    fresh = entry is not None and entry.expires > time.monotonic() \
+                        and period_covers(entry.period, period)
+                    if fresh:
+                        self.coalesced += 1
+                    else:
+                        self.misses += 1
+                if not fresh:
+                    self.put(symbol, period, load())
+                    with self._lock:
+                        entry = self._entries.get(symbol)
+        if entry is None or entry.frame is None:
+            return None
+        return slice_period(entry.frame, period)
+
+    def invalidate(self, symbol=None):
+        with self._lock:
+            removed = [s for s in self._entries if symbol is None or s == symbol]
+            for key in removed:
+                self._remove(key)
+        self._released(removed)
+
+    def stats(self):
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.nbytes,
+            'max_bytes': self.max_bytes,
+            'policy': self.policy,
+            'hits': self.hits,
+            'sliced_hits': self.sliced,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expired': self.expired,
+        }
@@ -0,0 +1,393 @@
+"""
+ProTrade Ultimate - Incremental Indicators
+מנוע אינדיקטורים אינקרמנטלי - כל נר חדש או מעודכן עולה O(1) לכל אינדיקטור
+"""
+
+import math
+import threading
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+NAN = float('nan')
+
+INDICATOR_COLUMNS = [
+    'SMA20', 'SMA50', 'SMA200', 'EMA12', 'EMA26', 'RSI',
+    'MACD', 'MACD_signal', 'MACD_diff',
+    'BB_high', 'BB_mid', 'BB_low', 'Volume_SMA', 'ATR'
+]
+
+
+class _Rolling:
+    """חלון נע עם ממוצע ושונות (Welford) - כמו rolling().mean()/std(ddof=0)"""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._since_resync = 0
+
+    def _add(self, x):
+        n = len(self.values)
+        delta = x - self.mean
+        self.mean += delta / n
+        self.m2 += delta * (x - self.mean)
+
+    def _remove(self, x):
+        n = len(self.values)
+        if n == 0:
+            self.mean = self.m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / n
+        self.m2 -= delta * (x - self.mean)
+
+    def _resync(self):
+        # מונע הצטברות שגיאות עיגול - O(window) פעם ב-window נרות
+        self.mean = math.fsum(self.values) / len(self.values)
+        self.m2 = math.fsum((v - self.mean) ** 2 for v in self.values)
+        self._since_resync = 0
+
+    def push(self, x):
+        self.values.append(x)
+        self._add(x)
+        if len(self.values) > self.window:
+            self._remove(self.values.popleft())
+        self._since_resync += 1
+        if self._since_resync >= self.window:
+            self._resync()
+
+    def replace_last(self, x):
+        old = self.values.pop()
+        self._remove(old)
+        self.values.append(x)
+        self._add(x)
+
+    @property
+    def ready(self):
+        return len(self.values) >= self.window
+
+    def average(self):
+        return self.mean if self.ready else NAN
+
+    def std(self):
+        return math.sqrt(max(self.m2 / len(self.values), 0.0)) if self.ready else NAN
+
+
+class _EMA:
+    """ממוצע נע אקספוננציאלי - כמו ewm(adjust=False, min_periods=...)"""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+        self._prev = (NAN, 0)
+
+    def _apply(self, x):
+        if x != x:
+            # NaN מוביל (למשל MACD לפני שהתייצב) - ewm מתחיל מהערך התקין הראשון
+            return
+        self.value = x if self.count == 0 else self.value + self.alpha * (x - self.value)
+        self.count += 1
+
+    def push(self, x):
+        self._prev = (self.value, self.count)
+        self._apply(x)
+
+    def replace_last(self, x):
+        self.value, self.count = self._prev
+        self._apply(x)
+
+    def output(self):
+        return self.value if self.count >= self.min_periods else NAN
+
+
+class _RSI:
+    """RSI של Wilder - כמו ta.momentum.rsi"""
+
+    def __init__(self, window=14):
+        self.up = _EMA(1.0 / window, window)
+        self.down = _EMA(1.0 / window, window)
+        self.prev_close = NAN
+        self._prev = NAN
+
+    def _apply(self, close, push):
+        diff = close - self.prev_close
+        up = diff if diff > 0 else 0.0
+        down = -diff if diff < 0 else 0.0
+        if push:
+            self.up.push(up)
+            self.down.push(down)
+        else:
+            self.up.replace_last(up)
+            self.down.replace_last(down)
+
+    def push(self, close):
+        self._prev = self.prev_close
+        self._apply(close, True)
+        self.prev_close = close
+
+    def replace_last(self, close):
+        self.prev_close = self._prev
+        self._apply(close, False)
+        self.prev_close = close
+
+    def output(self):
+        up, down = self.up.output(), self.down.output()
+        if down != down:
+            return NAN
+        if down == 0:
+            return 100.0
+        return 100 - (100 / (1 + up / down))
+
+
+class _ATR:
+    """ATR של Wilder - כמו ta.volatility.average_true_range (אפסים לפני החלון)"""
+
+    def __init__(self, window=14):
+        self.window = window
+        self.count = 0
+        self.seed = 0.0
+        self.value = 0.0
+        self.prev_close = NAN
+        self._prev = (0, 0.0, 0.0, NAN)
+
+    def _apply(self, high, low, close):
+        tr = high - low
+        if self.prev_close == self.prev_close:
+            tr = max(tr, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.count += 1
+        if self.count <= self.window:
+            self.seed += tr
+            self.value = self.seed / self.window if self.count == self.window else 0.0
+        else:
+            self.value = (self.value * (self.window - 1) + tr) / float(self.window)
+        self.prev_close = close
+
+    def push(self, high, low, close):
+        self._prev = (self.count, self.seed, self.value, self.prev_close)
+        self._apply(high, low, close)
+
+    def replace_last(self, high, low, close):
+        self.count, self.seed, self.value, self.prev_close = self._prev
+        self._apply(high, low, close)
+
+    def output(self):
+        return self.value
+
+
+class _Column:
+    """מערך NumPy שגדל בהכפלה - הוספה/החלפה של ערך אחרון ב-O(1)"""
+
+    def __init__(self, dtype=np.float64, capacity=256):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            self.data = np.resize(self.data, len(self.data) * 2)
+        self.data[self.size] = value
+        self.size += 1
+
+    def set_last(self, value):
+        self.data[self.size - 1] = value
+
+    def values(self):
+        return self.data[:self.size]
+
+
+class IncrementalIndicators:
+    """
+    מצב אינדיקטורים של סימבול בודד - מתעדכן נר אחר נר.
+    history=False שומר רק את המצב והשורה האחרונה (זיכרון קבוע, ההיסטוריה נשמרת אצל הקורא).
+    """
+
+    def __init__(self, history=True):
+        self.close20 = _Rolling(20)
+        self.close50 = _Rolling(50)
+        self.close200 = _Rolling(200)
+        self.volume20 = _Rolling(20)
+        self.ema12 = _EMA(2.0 / 13, 12)
+        self.ema26 = _EMA(2.0 / 27, 26)
+        self.macd_signal = _EMA(2.0 / 10, 9)
+        self.rsi = _RSI(14)
+        self.atr = _ATR(14)
+
+        self.history = history
+        self.count = 0
+        self._last = None
+        self._row = None
+        # הנר הראשון, הנר שלפני האחרון וסגירתו - לבדיקה שההיסטוריה לא נכתבה מחדש
+        self.first_timestamp = None
+        self.previous_timestamp = None
+        self.previous_close = NAN
+        self.last_close = NAN
+        # זמני הנרות כ-int64 (ns) - אינדקס הפריים נבנה מהמערך ולא מרשימת Timestamp
+        self.tz = None
+        self.times = _Column(np.int64)
+        self.close = _Column()
+        self.columns = {col: _Column() for col in INDICATOR_COLUMNS}
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def last_timestamp(self):
+        return self._last
+
+    def update(self, timestamp, open_, high, low, close, volume):
+        """מוסיף נר חדש, או מעדכן את הנר האחרון אם זה אותו timestamp"""
+        last = self.last_timestamp
+        if last is not None and timestamp < last:
+            raise ValueError(f"נר ישן מדי: {timestamp} < {last}")
+        replace = last is not None and timestamp == last
+
+        op = 'replace_last' if replace else 'push'
+        for window in (self.close20, self.close50, self.close200):
+            getattr(window, op)(close)
+        getattr(self.volume20, op)(volume)
+        getattr(self.ema12, op)(close)
+        getattr(self.ema26, op)(close)
+        getattr(self.rsi, op)(close)
+        getattr(self.atr, op)(high, low, close)
+
+        macd = self.ema12.output() - self.ema26.output()
+        getattr(self.macd_signal, op)(macd)
+        signal = self.macd_signal.output()
+
+        mid = self.close20.average()
+        band = 2 * self.close20.std()
+        row = {
+            'SMA20': mid,
+            'SMA50': self.close50.average(),
+            'SMA200': self.close200.average(),
+            'EMA12': self.ema12.output(),
+            'EMA26': self.ema26.output(),
+            'RSI': self.rsi.output(),
+            'MACD': macd,
+            'MACD_signal': signal,
+            'MACD_diff': macd - signal,
+            'BB_high': mid + band,
+            'BB_mid': mid,
+            'BB_low': mid - band,
+            'Volume_SMA': self.volume20.average(),
+            'ATR': self.atr.output(),
+        }
+
+        self._row = row
+        if not replace:
+            if self.first_timestamp is None:
+                self.first_timestamp = timestamp
+                self.tz = getattr(timestamp, 'tz', None)
+            self.previous_timestamp = last
+            self.previous_close = self.last_close
+            self.count += 1
+            self._last = timestamp
+        self.last_close = close
+        if not self.history:
+            return row
+
+        if replace:
+            self.close.set_last(close)
+            for col, value in row.items():
+                self.columns[col].set_last(value)
+        else:
+            self.times.append(pd.Timestamp(timestamp).value)
+            self.close.append(close)
+            for col, value in row.items():
+                self.columns[col].append(value)
+        return row
+
+    def latest(self):
+        """ערכי האינדיקטורים בנר האחרון"""
+        return dict(self._row) if self._row is not None else {}
+
+    def timestamps(self):
+        """אינדקס התאריכים של ההיסטוריה (history=True)"""
+        index = pd.DatetimeIndex(self.times.values().astype('datetime64[ns]'))
+        return index.tz_localize('UTC').tz_convert(self.tz) if self.tz is not None else index
+
+    def frame(self):
+        """כל היסטוריית האינדיקטורים כ-DataFrame"""
+        return pd.DataFrame(
+            {col: column.values().copy() for col, column in self.columns.items()},
+            index=self.timestamps()
+        )
+
+
+class IndicatorEngine:
+    """מנוע אינדיקטורים לכל הסימבולים - מזין רק נרות חדשים למצב הקיים"""
+
+    def __init__(self):
+        self._states = {}
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def __len__(self):
+        return len(self._states)
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def state(self, symbol):
+        return self._states.get(symbol)
+
+    def reset(self, symbol=None):
+        """מוחק מצב של סימבול (או של כולם)"""
+        with self._lock:
+            if symbol is None:
+                self._states.clear()
+            else:
+                self._states.pop(symbol, None)
+
+    @staticmethod
+    def _consistent(state, df):
+        """בודק שההיסטוריה לא נכתבה מחדש (התאמת דיבידנד, חלון אחר)"""
+        if len(state) < 2 or df.index[0] != state.first_timestamp:
+            return False
+        ts = state.previous_timestamp
+        if ts not in df.index:
+            return False
+        return df['Close'].loc[ts] == state.previous_close
+
+    def _advance(self, symbol, df):
+        """מזין את הנרות החדשים (או את כל df אם ההיסטוריה השתנתה) - מחזיר את המצב ואת השורות שחושבו"""
+        state = self._states.get(symbol)
+        if state is not None and self._consistent(state, df):
+            new = df.iloc[df.index.searchsorted(state.last_timestamp):]
+        else:
+            state = IncrementalIndicators()
+            new = df
+
+        rows = [state.update(ts, o, h, l, c, v)
+                for ts, o, h, l, c, v in zip(new.index, new['Open'].to_numpy(), new['High'].to_numpy(),
+                                             new['Low'].to_numpy(), new['Close'].to_numpy(),
+                                             new['Volume'].to_numpy(dtype=float))]
+        self._states[symbol] = state
+        return state, new.index, rows
+
+    def advance(self, symbol, df):
+        """
+        מעדכן את מצב הסימבול ומחזיר רק את שורות האינדיקטורים של הנרות שהוזנו (הנר האחרון שעודכן והחדשים) -
+        O(נרות חדשים) גם כשההיסטוריה ארוכה, למסלול החי של נר חדש.
+        """
+        with self._symbol_lock(symbol):
+            _, index, rows = self._advance(symbol, df)
+        return pd.DataFrame(rows, index=index, columns=INDICATOR_COLUMNS)
+
+    def latest(self, symbol):
+        """ערכי האינדיקטורים בנר האחרון של הסימבול (מילון ריק אם אין מצב)"""
+        state = self._states.get(symbol)
+        return state.latest() if state is not None else {}
+
+    def update(self, symbol, df):
+        """מעדכן את מצב הסימבול ומחזיר את df עם עמודות האינדיקטורים (כל ההיסטוריה - O(n) העתקה)"""
+        with self._symbol_lock(symbol):
+            state, _, _ = self._advance(symbol, df)
+            indicators = state.frame()
+        out = df.drop(columns=[c for c in INDICATOR_COLUMNS if c in df.columns])
+        return out.join(indicators.reindex(out.index))
@@ -0,0 +1,141 @@
+"""
+ProTrade Ultimate - Background Jobs
+מריץ עבודות ארוכות (סריקות, Screener) ב-thread pool משותף לכל הסשנים, מחוץ לריצת הסקריפט.
+הסשן שומר רק את מזהה העבודה ב-session_state - העבודה ממשיכה בין reruns,
+ובכל rerun הממשק קורא את ההתקדמות והתוצאות החלקיות מהרישום.
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+# כמה עבודות רצות במקביל (שאר העבודות ממתינות בתור)
+JOB_WORKERS = int(os.environ.get('PROTRADE_JOB_WORKERS', '4'))
+# עבודה שהסתיימה נשארת ברישום כל הזמן הזה (לסשן שהגיש אותה)
+JOB_TTL_SECONDS = 3600
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+
+
+class JobCancelled(Exception):
+    """נזרקת מ-Job.report כשהעבודה בוטלה - עוצרת אותה בין קבוצות"""
+
+
+class Job:
+    """עבודה אחת: מצב, התקדמות (done מתוך total) ותוצאות חלקיות שמצטברות תוך כדי ריצה"""
+
+    def __init__(self, name, total=1):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.total = max(int(total), 1)
+        self.done = 0
+        self.status = QUEUED
+        self.error = None
+        self.errors = []
+        self.created = time.time()
+        self.finished = None
+        self._parts = []
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+
+    @property
+    def progress(self):
+        return min(self.done / self.total, 1.0)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.time()) - self.created
+
+    def report(self, done=0, results=None, error=None):
+        """מתקדם ב-done יחידות ומוסיף תוצאות חלקיות (מילון שם -> DataFrame); נקרא מתוך העבודה"""
+        with self._lock:
+            self.done += done
+            if results is not None:
+                self._parts.append(results)
+            if error is not None:
+                self.errors.append(error)
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def results(self, name):
+        """כל התוצאות החלקיות של name עד עכשיו, בטבלה אחת"""
+        with self._lock:
+            tables = [part[name] for part in self._parts if name in part]
+        return pd.concat(tables, ignore_index=True) if tables else pd.DataFrame()
+
+
+class JobRunner:
+    """רישום עבודות ו-thread pool - העבודות חיות בתהליך, לא בסשן"""
+
+    def __init__(self, workers=JOB_WORKERS, ttl=JOB_TTL_SECONDS):
+        self.workers = workers
+        self.ttl = ttl
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='protrade-job')
+            return self._pool
+
+    def _run(self, job, func, args, kwargs):
+        if job._cancel.is_set():
+            job.status = CANCELLED
+        else:
+            job.status = RUNNING
+            try:
+                func(job, *args, **kwargs)
+                job.status = DONE
+            except JobCancelled:
+                job.status = CANCELLED
+            except Exception as e:
+                job.error = f"{type(e).__name__}: {e}"
+                job.status = FAILED
+        job.finished = time.time()
+
+    def _prune(self):
+        now = time.time()
+        with self._lock:
+            for job_id in [i for i, j in self._jobs.items() if j.finished and now - j.finished > self.ttl]:
+                del self._jobs[job_id]
+
+    def submit(self, name, func, *args, total=1, **kwargs):
+        """מגיש func(job, *args, **kwargs) לריצה ברקע ומחזיר את ה-Job מיד"""
+        self._prune()
+        job = Job(name, total)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor().submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        """העבודה לפי מזהה (או None אם לא קיימת / פגה)"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def active(self):
+        """העבודות שעדיין בתור או רצות"""
+        with self._lock:
+            return [job for job in self._jobs.values() if job.active]
+
+
+JOBS = JobRunner()
@@ -0,0 +1,124 @@
+"""
+ProTrade Ultimate - Async Network Layer
+שכבת רשת אסינכרונית: session משותף עם connection pooling, הגבלת מקביליות לכל שרת, timeout ו-retry
+"""
+
+import asyncio
+import functools
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+YAHOO = 'yahoo'
+GOOGLE_NEWS = 'google_news'
+
+# מספר בקשות מקבילות מקסימלי לכל שרת
+HOST_LIMITS = {
+    YAHOO: 8,
+    GOOGLE_NEWS: 4,
+}
+DEFAULT_LIMIT = 4
+DEFAULT_TIMEOUT = 20
+DEFAULT_RETRIES = 2
+BACKOFF_SECONDS = 0.5
+
+
+class TimeoutAdapter(HTTPAdapter):
+    """adapter עם timeout ברירת מחדל - בקשה שהקורא לא נתן לה timeout לא תחזיק thread לנצח"""
+
+    def __init__(self, *args, timeout=DEFAULT_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+
+def create_session(pool_size=32):
+    """session של requests עם pool חיבורים גדול מספיק לכל הבקשות המקבילות"""
+    session = requests.Session()
+    adapter = TimeoutAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = 'Mozilla/5.0 (ProTrade Ultimate)'
+    return session
+
+
+# session יחיד לכל התהליך - yfinance ו-RSS משתמשים באותם חיבורים
+SESSION = create_session()
+
+
+class AsyncFetcher:
+    """מריץ קריאות רשת חוסמות על event loop ברקע עם הגבלת מקביליות, timeout ו-retry"""
+
+    def __init__(self, limits=None, max_workers=32):
+        self.limits = dict(HOST_LIMITS if limits is None else limits)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='protrade-fetch')
+        self._semaphores = {}
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name='protrade-event-loop', daemon=True)
+                thread.start()
+                self._loop = loop
+            return self._loop
+
+    def _semaphore(self, host):
+        # נקרא רק מתוך ה-loop, אין צורך בנעילה
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self.limits.get(host, DEFAULT_LIMIT))
+        return self._semaphores[host]
+
+    async def call(self, host, func, *args, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES, **kwargs):
+        """מריץ func ב-thread pool תחת מגבלת המקביליות של host, עם retry ו-backoff אקספוננציאלי"""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(func, *args, **kwargs)
+        semaphore = self._semaphore(host)
+        for attempt in range(retries + 1):
+            await semaphore.acquire()
+            future = loop.run_in_executor(self._executor, call)
+            # המקום ב-semaphore משתחרר רק כשה-thread באמת סיים - גם אחרי timeout,
+            # כך שבקשה תקועה וה-retry שלה לא עוברים יחד את מגבלת השרת
+            future.add_done_callback(lambda _: semaphore.release())
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout)
+            except Exception:
+                if attempt == retries:
+                    raise
+            await asyncio.sleep(BACKOFF_SECONDS * 2 ** attempt * (1 + random.random()))
+
+    def run(self, coro):
+        """מריץ coroutine על ה-loop של הרקע וממתין לתוצאה (מתוך קוד סינכרוני)"""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def fetch(self, host, func, *args, **kwargs):
+        """קריאה בודדת - סינכרונית מבחוץ, עם timeout ו-retry"""
+        return self.run(self.call(host, func, *args, **kwargs))
+
+    def fetch_all(self, calls, return_exceptions=True):
+        """
+        מריץ את כל הקריאות במקביל. calls - רשימה של (host, func) כש-func ללא ארגומנטים.
+        מחזיר תוצאות באותו סדר (חריגות מוחזרות כערך כש-return_exceptions=True).
+        """
+        async def gather():
+            return await asyncio.gather(*(self.call(host, func) for host, func in calls),
+                                        return_exceptions=return_exceptions)
+        return self.run(gather())
+
+
+FETCHER = AsyncFetcher()
+
+
+def fetch_feed(url, timeout=DEFAULT_TIMEOUT):
+    """מוריד RSS דרך ה-session המשותף ומפרסר אותו"""
+    response = SESSION.get(url, timeout=timeout)
+    response.raise_for_status()
+    return feedparser.parse(response.content)
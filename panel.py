@@ -0,0 +1,398 @@
+"""
+ProTrade Ultimate - Panel Indicators
+חישוב אינדיקטורים וקטורי לכל הסימבולים במעבר אחד (זמן × סימבולים)
+"""
+
+
+import numpy as np
+import pandas as pd
+
+from indicators import INDICATOR_COLUMNS
+
+FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _align(arrays):
+    """
+    מיישר את הנרות התקינים של כל סימבול לסוף המערך (כמו dropna לכל סימבול).
+    סימבולים עם לוח מסחר שונה (קריפטו מול מניות) או היסטוריה קצרה מקבלים NaN בהתחלה.
+    """
+    valid = np.ones(arrays['Close'].shape, dtype=bool)
+    for arr in arrays.values():
+        valid &= ~np.isnan(arr)
+    order = np.argsort(valid, axis=0, kind='stable')
+    aligned = {
+        field: np.take_along_axis(np.where(valid, arr, np.nan), order, axis=0)
+        for field, arr in arrays.items()
+    }
+    return aligned, order, valid
+
+
+def _unalign(aligned, order, valid):
+    """מחזיר מערך מיושר למיקומי הנרות המקוריים"""
+    out = np.empty_like(aligned)
+    np.put_along_axis(out, order, aligned, axis=0)
+    out[~valid] = np.nan
+    return out
+
+
+def _rolling_mean(x, window, count):
+    """ממוצע נע וקטורי על כל העמודות (סכום מצטבר סביב ערך ייחוס לדיוק)"""
+    ref = np.nan_to_num(x[-1])
+    cs = np.cumsum(np.where(np.isnan(x), 0.0, x - ref), axis=0)
+    cs = np.vstack([np.zeros((1, x.shape[1])), cs])
+    out = np.full(x.shape, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = (cs[window:] - cs[:-window]) / window + ref
+    out[count < window] = np.nan
+    return out
+
+
+def _rolling_std(x, window, mean):
+    """סטיית תקן נעה (ddof=0) בשני מעברים - window פעולות וקטוריות"""
+    out = np.full(x.shape, np.nan)
+    if len(x) < window:
+        return out
+    acc = np.zeros((len(x) - window + 1, x.shape[1]))
+    for k in range(window):
+        acc += (x[k:len(x) - window + 1 + k] - mean[window - 1:]) ** 2
+    out[window - 1:] = np.sqrt(acc / window)
+    return out
+
+
+def _ewm(x, alpha, min_periods):
+    """ewm(adjust=False) - לולאה על הזמן, וקטורית על כל הסימבולים"""
+    out = np.full(x.shape, np.nan)
+    state = np.full(x.shape[1], np.nan)
+    count = np.zeros(x.shape[1], dtype=np.int64)
+    for t in range(len(x)):
+        xt = x[t]
+        ok = ~np.isnan(xt)
+        state = np.where(ok, np.where(count == 0, xt, state + alpha * (xt - state)), state)
+        count += ok
+        out[t] = np.where(count >= min_periods, state, np.nan)
+    return out
+
+
+# רישום אינדיקטורים: שם -> (תלויות, פונקציה על מילון הערכים שכבר חושבו).
+# שמות שמתחילים ב-_ הם תוצאות ביניים משותפות; השדות (FIELDS) תמיד קיימים
+_NODES = {}
+
+# מספר הנרות עד הערך התקין הראשון של כל אינדיקטור (MACD_signal = 26 + 9 - 1)
+WARMUP = {}
+
+
+def _node(name, *deps, warmup=1):
+    def decorator(func):
+        _NODES[name] = (deps, func)
+        WARMUP[name] = warmup
+        return func
+    return decorator
+
+
+@_node('_present', 'Close')
+def _present(x):
+    return ~np.isnan(x['Close'])
+
+
+@_node('_count', '_present')
+def _count(x):
+    return np.cumsum(x['_present'], axis=0)
+
+
+@_node('SMA20', 'Close', '_count', warmup=20)
+def _sma20(x):
+    return _rolling_mean(x['Close'], 20, x['_count'])
+
+
+@_node('SMA50', 'Close', '_count', warmup=50)
+def _sma50(x):
+    return _rolling_mean(x['Close'], 50, x['_count'])
+
+
+@_node('SMA200', 'Close', '_count', warmup=200)
+def _sma200(x):
+    return _rolling_mean(x['Close'], 200, x['_count'])
+
+
+@_node('EMA12', 'Close', warmup=12)
+def _ema12(x):
+    return _ewm(x['Close'], 2 / 13, 12)
+
+
+@_node('EMA26', 'Close', warmup=26)
+def _ema26(x):
+    return _ewm(x['Close'], 2 / 27, 26)
+
+
+@_node('RSI', 'Close', '_present', warmup=14)
+def _rsi(x):
+    # RSI (Wilder) - כמו ta.momentum.rsi; הנר הראשון של כל סימבול נספר כשינוי 0
+    c, present = x['Close'], x['_present']
+    diff = np.vstack([np.full((1, c.shape[1]), np.nan), np.diff(c, axis=0)])
+    up = np.where(present, np.where(diff > 0, diff, 0.0), np.nan)
+    down = np.where(present, np.where(diff < 0, -diff, 0.0), np.nan)
+    emaup = _ewm(up, 1 / 14, 14)
+    emadn = _ewm(down, 1 / 14, 14)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + emaup / emadn))
+    return np.where(emadn == 0, 100.0, rsi)
+
+
+@_node('MACD', 'EMA12', 'EMA26', warmup=26)
+def _macd(x):
+    return x['EMA12'] - x['EMA26']
+
+
+@_node('MACD_signal', 'MACD', warmup=34)
+def _macd_signal(x):
+    return _ewm(x['MACD'], 2 / 10, 9)
+
+
+@_node('MACD_diff', 'MACD', 'MACD_signal', warmup=34)
+def _macd_diff(x):
+    return x['MACD'] - x['MACD_signal']
+
+
+@_node('_std20', 'Close', 'SMA20', warmup=20)
+def _std20(x):
+    return _rolling_std(x['Close'], 20, x['SMA20'])
+
+
+@_node('BB_mid', 'SMA20', warmup=20)
+def _bb_mid(x):
+    return x['SMA20']
+
+
+@_node('BB_high', 'BB_mid', '_std20', warmup=20)
+def _bb_high(x):
+    return x['BB_mid'] + 2 * x['_std20']
+
+
+@_node('BB_low', 'BB_mid', '_std20', warmup=20)
+def _bb_low(x):
+    return x['BB_mid'] - 2 * x['_std20']
+
+
+@_node('Volume_SMA', 'Volume', '_count', warmup=20)
+def _volume_sma(x):
+    return _rolling_mean(x['Volume'], 20, x['_count'])
+
+
+@_node('ATR', 'High', 'Low', 'Close', '_count', '_present', warmup=14)
+def _atr(x):
+    # ATR (Wilder) - זרע של ממוצע 14 נרות ואז החלקה, אפסים לפני החלון כמו ta
+    h, l, c, count = x['High'], x['Low'], x['Close'], x['_count']
+    prev_close = np.vstack([np.full((1, c.shape[1]), np.nan), c[:-1]])
+    tr = np.fmax(h - l, np.fmax(np.abs(h - prev_close), np.abs(l - prev_close)))
+    seeded = np.where(count > 14, tr, _rolling_mean(tr, 14, count))
+    seeded[count < 14] = np.nan
+    atr = _ewm(seeded, 1 / 14, 0)
+    return np.where(x['_present'], np.where(count >= 14, atr, 0.0), np.nan)
+
+
+def resolve(columns):
+    """העמודות ועוד כל התלויות שלהן, בסדר חישוב (תלות לפני מי שצריך אותה)"""
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen or name in FIELDS:
+            return
+        if name not in _NODES:
+            raise KeyError(f"אינדיקטור לא מוכר: {name}")
+        seen.add(name)
+        for dep in _NODES[name][0]:
+            visit(dep)
+        order.append(name)
+
+    for column in columns:
+        visit(column)
+    return order
+
+
+class LazyIndicators:
+    """אינדיקטורים לפי דרישה על מערכים מיושרים (זמן × סימבולים) - כל צומת מחושב פעם אחת ונשמר"""
+
+    def __init__(self, arrays):
+        self._values = dict(arrays)
+
+    def __contains__(self, name):
+        return name in self._values
+
+    def __getitem__(self, name):
+        for node in resolve([name]):
+            if node not in self._values:
+                self._values[node] = _NODES[node][1](self._values)
+        return self._values[name]
+
+    def compute(self, columns=INDICATOR_COLUMNS):
+        return {col: self[col] for col in columns}
+
+
+def warmup_bars(columns):
+    """מספר הנרות שצריך כדי שכל העמודות המבוקשות (והתלויות שלהן) יהיו תקינות בנר האחרון"""
+    return max([WARMUP[name] for name in resolve(indicator_columns(columns))], default=1)
+
+
+def indicator_columns(columns):
+    """עמודות האינדיקטורים מתוך רשימת עמודות (שדות ועמודות אחרות כמו 'Change %' מושמטים)"""
+    wanted = set(columns)
+    return [col for col in INDICATOR_COLUMNS if col in wanted]
+
+
+def _indicators(o, h, l, c, v, columns=INDICATOR_COLUMNS):
+    """האינדיקטורים המבוקשים (ברירת מחדל - כל אלה של calculate_indicators) על מערכים מיושרים"""
+    return LazyIndicators(dict(zip(FIELDS, (o, h, l, c, v)))).compute(columns)
+
+
+class PanelIndicators:
+    """אינדיקטורים וקטוריים לכל היקום - מחליף לולאה של calculate_indicators לכל סימבול"""
+
+    @staticmethod
+    def split_fields(data, symbols=None):
+        """ממיר פריים של yf.download למילון שדה -> DataFrame (זמן × סימבולים)"""
+        if not isinstance(data.columns, pd.MultiIndex):
+            # סימבול בודד - yfinance מחזיר עמודות שטוחות
+            symbol = symbols[0] if symbols else 'SYMBOL'
+            return {field: data[[field]].set_axis([symbol], axis=1) for field in FIELDS}
+
+        level = 0 if 'Close' in data.columns.get_level_values(0) else 1
+        fields = {field: data.xs(field, axis=1, level=level) for field in FIELDS}
+        if symbols is not None:
+            fields = {field: frame.reindex(columns=list(symbols)) for field, frame in fields.items()}
+        return fields
+
+    @staticmethod
+    def iter_chunks(open_, high, low, close, volume, chunk_size=1024, columns=INDICATOR_COLUMNS):
+        """
+        מחשב אינדיקטורים לקבוצות של chunk_size סימבולים בכל פעם (מערכים בצורת סימבולים × זמן).
+        מחזיר (slice של השורות, מילון שדה -> מערך של הקבוצה) - הזיכרון תלוי רק בגודל הקבוצה,
+        כך שגם מערכי memmap גדולים לא נטענים במלואם.
+        רק columns (והתלויות שלהן) מחושבות.
+        """
+        arrays = {'Open': open_, 'High': high, 'Low': low, 'Close': close, 'Volume': volume}
+        for start in range(0, len(close), chunk_size):
+            rows = slice(start, start + chunk_size)
+            chunk = {field: np.asarray(arr[rows], dtype=float) for field, arr in arrays.items()}
+            aligned, order, valid = _align({field: arr.T for field, arr in chunk.items()})
+            lazy = LazyIndicators(aligned)
+            chunk.update({col: _unalign(arr, order, valid).T for col, arr in lazy.compute(columns).items()})
+            yield rows, chunk
+
+    @staticmethod
+    def compute_arrays(open_, high, low, close, volume, chunk_size=1024, columns=INDICATOR_COLUMNS):
+        """
+        מחשב אינדיקטורים על מערכי NumPy בצורת (סימבולים × זמן).
+        מחזיר מילון שדה -> מערך באותה צורה (השדות ו-columns). chunk_size מגביל את הזיכרון הזמני.
+        """
+        arrays = {
+            'Open': np.asarray(open_, dtype=float),
+            'High': np.asarray(high, dtype=float),
+            'Low': np.asarray(low, dtype=float),
+            'Close': np.asarray(close, dtype=float),
+            'Volume': np.asarray(volume, dtype=float),
+        }
+        result = dict(arrays)
+        result.update({col: np.empty(arrays['Close'].shape) for col in columns})
+
+        for rows, chunk in PanelIndicators.iter_chunks(*(arrays[field] for field in FIELDS), chunk_size=chunk_size,
+                                                       columns=columns):
+            for col in columns:
+                result[col][rows] = chunk[col]
+        return result
+
+    @staticmethod
+    def latest_arrays(open_, high, low, close, volume, symbols, index, min_bars=200, chunk_size=256,
+                      columns=INDICATOR_COLUMNS, partial=False):
+        """
+        טבלת הנר האחרון ישירות ממערכים (סימבולים × זמן) בלי לבנות את כל הפאנל בזיכרון -
+        כמו latest(compute(...)) אבל קבוצה אחרי קבוצה. index - תאריכי עמודות המערכים.
+        """
+        indicators = indicator_columns(columns)
+        columns = FIELDS + indicators
+        values = np.empty((len(symbols), len(columns)))
+        bars = np.zeros(len(symbols), dtype=np.int64)
+        last = np.zeros(len(symbols), dtype=np.int64)
+
+        for rows, chunk in PanelIndicators.iter_chunks(open_, high, low, close, volume, chunk_size=chunk_size,
+                                                       columns=indicators):
+            valid = np.ones(chunk['Close'].shape, dtype=bool)
+            for field in FIELDS:
+                valid &= ~np.isnan(chunk[field])
+            width = valid.shape[1]
+            chunk_last = width - 1 - np.argmax(valid[:, ::-1], axis=1)
+            picked = np.arange(len(valid))
+            bars[rows] = valid.sum(axis=1)
+            last[rows] = chunk_last
+            values[rows] = np.column_stack([chunk[col][picked, chunk_last] for col in columns])
+
+        latest = pd.DataFrame(values, index=pd.Index(symbols), columns=columns)
+        latest['Bars'] = bars
+        latest['Date'] = pd.DatetimeIndex(index)[last]
+        return PanelIndicators._select(latest, min_bars, partial)
+
+    @staticmethod
+    def _select(latest, min_bars, partial):
+        """
+        בלי partial - רק סימבולים עם לפחות min_bars נרות, כמו ב-calculate_indicators.
+        עם partial - כל סימבול עם נרות נשאר, ואינדיקטור שעוד לא התחמם אצלו (פחות נרות מ-WARMUP) הוא NaN.
+        """
+        bars = latest['Bars'].to_numpy()
+        if not partial:
+            return latest[(bars > 0) & (bars >= min_bars)]
+        latest = latest[bars > 0].copy()
+        for col in indicator_columns(latest.columns):
+            latest.loc[latest['Bars'] < WARMUP[col], col] = np.nan
+        return latest
+
+    @staticmethod
+    def sma_array(close, window):
+        """ממוצע נע בחלון כלשהו על מערך (זמן × סימבולים) - לכל סימבול על הנרות שלו בלבד"""
+        aligned, order, valid = _align({'Close': np.asarray(close, dtype=float)})
+        count = np.cumsum(~np.isnan(aligned['Close']), axis=0)
+        return _unalign(_rolling_mean(aligned['Close'], window, count), order, valid)
+
+    @staticmethod
+    def compute(data, symbols=None, columns=INDICATOR_COLUMNS):
+        """
+        מחשב אינדיקטורים לכל הסימבולים בפריים של yf.download(group_by='ticker').
+        רק columns (והתלויות שלהן) מחושבות.
+        מחזיר מילון שדה -> DataFrame (תאריכים × סימבולים).
+        """
+        columns = indicator_columns(columns)
+        fields = PanelIndicators.split_fields(data, symbols)
+        index, symbols_index = fields['Close'].index, fields['Close'].columns
+        arrays = PanelIndicators.compute_arrays(*(fields[field].to_numpy(dtype=float).T for field in FIELDS),
+                                                columns=columns)
+        return {
+            field: pd.DataFrame(arr.T, index=index, columns=symbols_index)
+            for field, arr in arrays.items()
+        }
+
+    @staticmethod
+    def symbol_frame(panel, symbol):
+        """מחזיר פריים של סימבול בודד - כמו calculate_indicators(data[symbol].dropna())"""
+        df = pd.DataFrame({field: frame[symbol] for field, frame in panel.items()})
+        return df.dropna(subset=FIELDS)
+
+    @staticmethod
+    def latest(panel, min_bars=200, partial=False):
+        """
+        טבלת הנר האחרון של כל סימבול (שורה לסימבול).
+        סימבולים עם פחות מ-min_bars נרות מושמטים, כמו ב-calculate_indicators (או נשארים עם partial).
+        """
+        valid = np.ones(panel['Close'].shape, dtype=bool)
+        for field in FIELDS:
+            valid &= panel[field].notna().to_numpy()
+        bars = valid.sum(axis=0)
+        last = len(valid) - 1 - np.argmax(valid[::-1], axis=0)
+        cols = np.arange(valid.shape[1])
+
+        latest = pd.DataFrame(
+            {field: frame.to_numpy()[last, cols] for field, frame in panel.items()
+             if field in FIELDS or field in INDICATOR_COLUMNS},
+            index=panel['Close'].columns
+        )
+        latest['Bars'] = bars
+        latest['Date'] = panel['Close'].index[last]
+        return PanelIndicators._select(latest, min_bars, partial)
@@ -0,0 +1,243 @@
+"""
+ProTrade Ultimate - Data Providers
+ממשק ספק נתונים: yfinance כספק חי, וספק Fixtures שמריץ נתונים מוקלטים בלי רשת
+"""
+
+import json
+import os
+from abc import ABC, abstractmethod
+from functools import partial
+from urllib.parse import quote
+
+import feedparser
+import pandas as pd
+import yfinance as yf
+
+from network import FETCHER, SESSION, YAHOO, GOOGLE_NEWS, fetch_feed
+from store import period_start
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+# העמודות של yf.download(actions=False) - Close לא מותאם ו-Adj Close לצידו
+DOWNLOAD_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+def _intraday(interval):
+    return interval.endswith(('m', 'h')) and not interval.endswith('mo')
+
+
+def _quote(history):
+    """(מחיר אחרון, שינוי % מפתיחת היום) מתוך היסטוריה של יום"""
+    if history is None or history.empty:
+        return None
+    price = history['Close'].iloc[-1]
+    change = ((history['Close'].iloc[-1] - history['Open'].iloc[0]) / history['Open'].iloc[0]) * 100
+    return price, change
+
+
+class DataProvider(ABC):
+    """ממשק ספק נתונים - כל הגישה לנתוני שוק עוברת דרכו"""
+
+    name = 'base'
+
+    @abstractmethod
+    def history(self, symbol, period=None, start=None, interval='1d'):
+        """היסטוריית נרות של סימבול (כמו Ticker.history)"""
+
+    @abstractmethod
+    def download(self, symbols, period=None, start=None, interval='1d'):
+        """הורדה מרוכזת - פריים עם עמודות (סימבול, שדה) כמו yf.download(group_by='ticker')"""
+
+    def quotes(self, symbols):
+        """מילון סימבול -> (מחיר, שינוי %) של היום"""
+        quotes = {}
+        for symbol in symbols:
+            try:
+                quote_ = _quote(self.history(symbol, period='1d'))
+            except Exception:
+                continue
+            if quote_ is not None:
+                quotes[symbol] = quote_
+        return quotes
+
+    @abstractmethod
+    def info(self, symbol):
+        """מידע פונדמנטלי גולמי (כמו Ticker.info)"""
+
+    @abstractmethod
+    def news(self, urls):
+        """פידי RSS לפי סדר הכתובות (חריגה במקום פיד שנכשל)"""
+
+
+class YFinanceProvider(DataProvider):
+    """ספק חי - Yahoo Finance לנתוני מחירים ו-Google News RSS לחדשות"""
+
+    name = 'yfinance'
+
+    def __init__(self, fetcher=FETCHER, session=SESSION):
+        self.fetcher = fetcher
+        self.session = session
+
+    @staticmethod
+    def _range(period, start):
+        return {'start': start} if start is not None else {'period': period or '1mo'}
+
+    def history(self, symbol, period=None, start=None, interval='1d'):
+        ticker = yf.Ticker(symbol, session=self.session)
+        return self.fetcher.fetch(YAHOO, ticker.history, interval=interval, **self._range(period, start))
+
+    def download(self, symbols, period=None, start=None, interval='1d'):
+        # לא yf.download: הוא אוסף את התוצאות במשתנים גלובליים של yfinance (shared._DFS, shared._ERRORS),
+        # כך ששתי הורדות במקביל (עבודות רקע, סשנים, שירות הציטוטים) מערבבות סימבולים זו של זו.
+        # Ticker.history לכל סימבול דרך ה-fetcher - מקביליות לפי מגבלת השרת ו-timeout לכל סימבול,
+        # ואותו פריים כמו yf.download(group_by='ticker'): מחירים לא מותאמים, ובנרות יומיים בלי אזור זמן
+        symbols = list(symbols)
+        results = self.fetcher.fetch_all([
+            (YAHOO, partial(yf.Ticker(s, session=self.session).history, interval=interval, auto_adjust=False,
+                            actions=False, **self._range(period, start)))
+            for s in symbols
+        ])
+        frames = {}
+        for symbol, df in zip(symbols, results):
+            if isinstance(df, Exception) or df is None or df.empty:
+                continue
+            if not _intraday(interval) and df.index.tz is not None:
+                df = df.tz_localize(None)
+            frames[symbol] = df[[col for col in DOWNLOAD_COLUMNS if col in df]]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).sort_index()
+
+    def quotes(self, symbols):
+        # כל הסימבולים במקביל דרך ה-fetcher
+        symbols = list(symbols)
+        results = self.fetcher.fetch_all([
+            (YAHOO, partial(yf.Ticker(s, session=self.session).history, period='1d')) for s in symbols
+        ])
+        quotes = {}
+        for symbol, history in zip(symbols, results):
+            if isinstance(history, Exception):
+                continue
+            quote_ = _quote(history)
+            if quote_ is not None:
+                quotes[symbol] = quote_
+        return quotes
+
+    def info(self, symbol):
+        ticker = yf.Ticker(symbol, session=self.session)
+        return self.fetcher.fetch(YAHOO, lambda: ticker.info)
+
+    def news(self, urls):
+        return self.fetcher.fetch_all([(GOOGLE_NEWS, partial(fetch_feed, url)) for url in urls])
+
+
+class FixtureProvider(DataProvider):
+    """
+    ספק offline שמריץ נתונים מוקלטים - לבנצ'מרקים ובדיקות עומס דטרמיניסטיות.
+    מבנה התיקייה: <symbol>.parquet או <symbol>.csv לנרות יומיים, <symbol>@<interval>.parquet/csv
+    לאינטרוולים אחרים (5m, 1h...), info.json ו-news.json (אופציונליים).
+    תקופות נחתכות יחסית ל-as_of (ברירת מחדל: הנר האחרון בקובץ) - וגם slice_period חותך יחסית לנר האחרון,
+    כך ש-fixture ישן מחזיר את אותו חלון בכל המסלולים. אינטרוול שלא הוקלט מחזיר פריים ריק.
+    """
+
+    name = 'fixtures'
+
+    def __init__(self, root, as_of=None):
+        self.root = root
+        self.as_of = pd.Timestamp(as_of) if as_of is not None else None
+        self._frames = {}
+
+    @staticmethod
+    def _name(symbol, interval='1d'):
+        name = quote(symbol, safe='')
+        return name if interval == '1d' else f"{name}@{interval}"
+
+    def _path(self, symbol, ext, interval='1d'):
+        return os.path.join(self.root, f"{self._name(symbol, interval)}.{ext}")
+
+    def _load(self, symbol, interval='1d'):
+        key = (symbol, interval)
+        if key not in self._frames:
+            df = None
+            if os.path.exists(self._path(symbol, 'parquet', interval)):
+                df = pd.read_parquet(self._path(symbol, 'parquet', interval))
+            elif os.path.exists(self._path(symbol, 'csv', interval)):
+                df = pd.read_csv(self._path(symbol, 'csv', interval), index_col=0, parse_dates=True)
+            self._frames[key] = df
+        return self._frames[key]
+
+    def _read_json(self, name):
+        try:
+            with open(os.path.join(self.root, name), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def history(self, symbol, period=None, start=None, interval='1d'):
+        df = self._load(symbol, interval)
+        if df is None or df.empty:
+            return pd.DataFrame(columns=OHLCV)
+        tz = df.index.tz
+        if self.as_of is not None:
+            as_of = self.as_of.tz_localize(tz) if tz is not None and self.as_of.tz is None else self.as_of
+            df = df[df.index <= as_of]
+        if start is not None:
+            start = pd.Timestamp(start)
+            if tz is not None and start.tz is None:
+                start = start.tz_localize(tz)
+            return df[df.index >= start].copy()
+        if period and not df.empty:
+            first = period_start(period, df.index[-1])
+            if first is not None:
+                df = df[df.index >= first]
+        return df.copy()
+
+    def download(self, symbols, period=None, start=None, interval='1d'):
+        frames = {s: self.history(s, period=period, start=start, interval=interval) for s in symbols}
+        frames = {s: df[OHLCV] for s, df in frames.items() if not df.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1).sort_index()
+
+    def info(self, symbol):
+        return self._read_json('info.json').get(symbol, {})
+
+    def news(self, urls):
+        feeds = self._read_json('news.json')
+        return [
+            feedparser.FeedParserDict(entries=[feedparser.FeedParserDict(e) for e in feeds.get(url, [])])
+            for url in urls
+        ]
+
+    @staticmethod
+    def record(provider, symbols, root, period='1y', interval='1d'):
+        """מקליט היסטוריה מספק קיים לתיקיית fixtures"""
+        os.makedirs(root, exist_ok=True)
+        for symbol in symbols:
+            df = provider.history(symbol, period=period, interval=interval)
+            if df is not None and not df.empty:
+                df.to_parquet(os.path.join(root, f"{FixtureProvider._name(symbol, interval)}.parquet"))
+
+
+def _provider_from_env():
+    # PROTRADE_PROVIDER=yfinance (ברירת מחדל) או fixtures:/path/to/dir
+    spec = os.environ.get('PROTRADE_PROVIDER', 'yfinance')
+    if spec.startswith('fixtures:'):
+        return FixtureProvider(spec.split(':', 1)[1])
+    return YFinanceProvider()
+
+
+_provider = None
+
+
+def get_provider():
+    """הספק הפעיל של התהליך"""
+    global _provider
+    if _provider is None:
+        _provider = _provider_from_env()
+    return _provider
+
+
+def set_provider(provider):
+    """מחליף את הספק הפעיל (למשל ל-FixtureProvider בבנצ'מרק)"""
+    global _provider
+    _provider = provider
@@ -0,0 +1,118 @@
+"""
+ProTrade Ultimate - Live Quote Service
+שירות ציטוטים ברקע: poller יחיד מעדכן טבלת מחירים משותפת לכל הסשנים
+"""
+
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from panel import PanelIndicators
+from providers import get_provider
+
+# מחיר אחרון, שינוי % מפתיחת היום, וזמן העדכון
+Quote = namedtuple('Quote', ['price', 'change', 'updated'])
+
+POLL_SECONDS = 15
+# סימבול שאף אחד לא קרא כל הזמן הזה יוצא מהסבב
+IDLE_SECONDS = 600
+# המתנה מקסימלית לסבב הראשון כשסימבול חדש מתבקש
+FIRST_QUOTE_TIMEOUT = 10
+
+
+class QuoteService:
+    """טבלת ציטוטים בזיכרון - נקראת בלי רשת, מתעדכנת בהורדה מרוכזת אחת לכל סבב"""
+
+    def __init__(self, poll_seconds=POLL_SECONDS, idle_seconds=IDLE_SECONDS, provider=None):
+        self.poll_seconds = poll_seconds
+        self.idle_seconds = idle_seconds
+        self._provider = provider
+        self._quotes = {}
+        self._last_read = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._polled = threading.Condition(self._lock)
+        self._thread = None
+        self.polls = 0
+        self.errors = 0
+
+    @property
+    def provider(self):
+        return self._provider if self._provider is not None else get_provider()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='protrade-quotes', daemon=True)
+            self._thread.start()
+
+    def _active_symbols(self):
+        now = time.monotonic()
+        with self._lock:
+            for symbol in [s for s, t in self._last_read.items() if now - t > self.idle_seconds]:
+                del self._last_read[symbol]
+                self._quotes.pop(symbol, None)
+            return list(self._last_read)
+
+    def poll(self):
+        """סבב עדכון אחד לכל הסימבולים הפעילים"""
+        symbols = self._active_symbols()
+        if not symbols:
+            return
+        try:
+            data = self.provider.download(symbols, period='1d')
+            fields = PanelIndicators.split_fields(data, symbols)
+            close = fields['Close'].ffill().iloc[-1]
+            open_ = fields['Open'].bfill().iloc[0]
+            now = time.time()
+            updates = {}
+            for symbol in close.index:
+                price, first = close[symbol], open_[symbol]
+                if np.isfinite(price) and np.isfinite(first) and first:
+                    updates[symbol] = Quote(float(price), float((price - first) / first * 100), now)
+        except Exception:
+            self.errors += 1
+            updates = {}
+        with self._lock:
+            self._quotes.update(updates)
+            self.polls += 1
+            self._polled.notify_all()
+
+    def _run(self):
+        while True:
+            self.poll()
+            self._wakeup.wait(self.poll_seconds)
+            self._wakeup.clear()
+
+    def quotes(self, symbols):
+        """מילון סימבול -> Quote מהטבלה. סימבול חדש מצטרף לסבב וממתין לעדכון הראשון שלו"""
+        symbols = list(symbols)
+        now = time.monotonic()
+        with self._lock:
+            missing = [s for s in symbols if s not in self._last_read]
+            for symbol in symbols:
+                self._last_read[symbol] = now
+        self._ensure_thread()
+
+        if missing:
+            with self._lock:
+                polls = self.polls
+                self._wakeup.set()
+                deadline = time.monotonic() + FIRST_QUOTE_TIMEOUT
+                # ממתינים לסבב שהתחיל אחרי ההרשמה (לא לסבב שכבר רץ בלעדיהם)
+                while self.polls < polls + 2 and any(s not in self._quotes for s in missing):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._polled.wait(remaining)
+
+        with self._lock:
+            return {s: self._quotes[s] for s in symbols if s in self._quotes}
+
+    def get(self, symbol):
+        """ציטוט של סימבול בודד (או None)"""
+        return self.quotes([symbol]).get(symbol)
+
+
+QUOTES = QuoteService()
@@ -0,0 +1,313 @@
+"""
+ProTrade Ultimate - Batch Scans
+סריקות בשם (Market Scanner / ביטויי Screener Pro) על יקום מקובץ, בלי ממשק.
+אותן פונקציות תוצאה משמשות את הטאבים בממשק, כך שתוצאה שחושבה מראש זהה לסריקה אינטראקטיבית.
+התוצאות נשמרות ב-PROTRADE_SCAN_DIR (Parquet/CSV + meta JSON) והממשק טוען אותן מיד.
+
+    python scans.py --universe universe.txt --scan market-scanner --format parquet,csv
+
+להרצה לפני הפתיחה (cron, שעון השרת ב-ET):
+    30 8 * * 1-5  cd /opt/protrade && python scans.py --universe universe.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+from archive import HistoryArchive
+from panel import PanelIndicators, warmup_bars
+from providers import get_provider
+from scoring import ScannerScoring, rule_columns
+from screener import compile_query
+from signals import SIGNAL_RULES, SignalEngine
+from store import period_for_bars
+
+DEFAULT_SCAN_DIR = os.environ.get(
+    'PROTRADE_SCAN_DIR',
+    os.path.join(os.path.expanduser('~'), '.protrade', 'scans')
+)
+DEFAULT_BATCH_SIZE = 200
+FORMATS = ('parquet', 'csv')
+
+# העמודות של Market Scanner: מסנני RSI/נפח, חוקי הניקוד והאותות האחרונים
+SCANNER_COLUMNS = ['RSI'] + rule_columns() + rule_columns(SIGNAL_RULES)
+# עמודות שטבלת התוצאות של Screener Pro מציגה
+SCREEN_RESULT_COLUMNS = ['RSI', 'SMA200']
+
+# סריקות בשם. kind: 'scanner' (הגדרות Market Scanner) או 'screen' (ביטוי Screener Pro)
+SCANS = {
+    'market-scanner': {'kind': 'scanner', 'rsi_min': 30, 'rsi_max': 70, 'min_volume': 1.0, 'signal_lookback': 5},
+    'default-screen': {'kind': 'screen',
+                       'expression': "RSI between 20 and 80 and Close between 10 and 1000 and Volume >= 500000"},
+    'oversold-uptrend': {'kind': 'screen',
+                         'expression': "RSI between 30 and 50 and Close > SMA200 and Volume > 1.5 * Volume_SMA"},
+}
+
+
+def scanner_results(latest, rsi_min=30, rsi_max=70, min_volume=1.0, recent_signals=None):
+    """טבלת התוצאות של Market Scanner מטבלת הנר האחרון (מסננים, ניקוד ודירוג)"""
+    latest = latest[
+        latest['RSI'].between(rsi_min, rsi_max) &
+        (latest['Volume'] >= min_volume * 1_000_000)
+    ]
+    scores = ScannerScoring.score(latest)
+    results = pd.DataFrame({
+        'Symbol': latest.index,
+        'Price': latest['Close'].values,
+        'Change %': ((latest['Close'] - latest['Open']) / latest['Open'] * 100).values,
+        'RSI': latest['RSI'].values,
+        'Volume': (latest['Volume'] / 1_000_000).values,
+        'Score': scores['Score'].values,
+        'Rating': scores['Rating'].values,
+        'Signals': scores['Signals'].values,
+    })
+    if recent_signals is not None:
+        results['Recent Signals'] = recent_signals.reindex(latest.index, fill_value='').values
+    return results
+
+
+def screener_results(candidates, screen):
+    """טבלת התוצאות של Screener Pro - השורות שעברו את הביטוי המקומפל"""
+    matches = screen.filter(candidates)
+    return pd.DataFrame({
+        'Symbol': matches.index,
+        'Price': matches['Close'].values,
+        'RSI': matches['RSI'].values,
+        'Volume (M)': (matches['Volume'] / 1_000_000).values,
+        'SMA200': matches['SMA200'].values,
+        'Distance from SMA200 (%)': ((matches['Close'] - matches['SMA200']) / matches['SMA200'] * 100).values
+    })
+
+
+def scan_columns(scans):
+    """כל האינדיקטורים שהסריקות קוראות"""
+    columns = []
+    for spec in scans.values():
+        if spec['kind'] == 'scanner':
+            columns += SCANNER_COLUMNS
+        else:
+            columns += list(compile_query(spec['expression']).columns) + SCREEN_RESULT_COLUMNS
+    return list(dict.fromkeys(columns))
+
+
+def _batch_results(latest, events, scans):
+    # assign מחזיר עותק - טבלת הקורא (למשל זו שעברה ל-on_latest) לא משתנה
+    latest = latest.assign(**{'Change %': (latest['Close'] - latest['Open']) / latest['Open'] * 100})
+    results = {}
+    for name, spec in scans.items():
+        if spec['kind'] == 'scanner':
+            recent = SignalEngine.summary(events, spec['signal_lookback'], latest.index) \
+                if events is not None else None
+            results[name] = scanner_results(latest, spec['rsi_min'], spec['rsi_max'], spec['min_volume'],
+                                            recent_signals=recent)
+        else:
+            results[name] = screener_results(latest, compile_query(spec['expression']))
+    return results
+
+
+def iter_scans(symbols, scans, download=None, archive=None, batch_size=DEFAULT_BATCH_SIZE, partial=False,
+               on_latest=None):
+    """
+    מריץ את הסריקות קבוצה אחרי קבוצה של batch_size סימבולים ומניב (batch, תוצאות, שגיאה) לכל קבוצה -
+    תוצאות הן מילון שם -> טבלה חלקית (או None אם הקבוצה נכשלה).
+    הנתונים יורדים דרך download(batch, period) - חלון לפי נרות החימום - או נקראים מהארכיון.
+    on_latest(latest) נקרא עם טבלת הנר האחרון של כל קבוצה.
+    """
+    columns = scan_columns(scans)
+    warmup = warmup_bars(columns)
+    lookback = max([spec.get('signal_lookback', 0) for spec in scans.values()], default=0)
+
+    if archive is not None:
+        wanted = set(symbols) if symbols else None
+        for lo in range(0, len(archive), batch_size):
+            rows = slice(lo, lo + batch_size)
+            batch = [s for s in archive.symbols[rows] if wanted is None or s in wanted]
+            if not batch:
+                continue
+            try:
+                if lookback:
+                    # האותות צריכים את כל הפאנל - האינדיקטורים מחושבים פעם אחת והנר האחרון נלקח ממנו
+                    panel = archive.panel(columns=columns, rows=rows)
+                    latest = PanelIndicators.latest(panel, min_bars=warmup, partial=partial)
+                    events = SignalEngine.recent(SignalEngine.panel_events(panel), lookback)
+                else:
+                    latest = archive.latest(min_bars=warmup, columns=columns, partial=partial, rows=rows)
+                    events = None
+                latest = latest[latest.index.isin(batch)]
+                yield batch, _batch_results(latest, events, scans), None
+            except Exception as e:
+                yield batch, None, e
+        return
+
+    if download is None:
+        provider = get_provider()
+        download = lambda batch, period: provider.download(batch, period=period)
+    period = period_for_bars(warmup)
+    for start in range(0, len(symbols), batch_size):
+        batch = symbols[start:start + batch_size]
+        try:
+            panel = PanelIndicators.compute(download(batch, period), batch, columns=columns)
+            latest = PanelIndicators.latest(panel, min_bars=warmup, partial=partial)
+            if on_latest is not None:
+                on_latest(latest)
+            events = SignalEngine.recent(SignalEngine.panel_events(panel), lookback) if lookback else None
+            yield batch, _batch_results(latest, events, scans), None
+        except Exception as e:
+            yield batch, None, e
+
+
+def combine(parts, name):
+    """מאחד את הטבלאות החלקיות של סריקה (טבלת scanner ממוינת לפי Score)"""
+    tables = [part[name] for part in parts if part is not None and name in part]
+    if not tables:
+        return pd.DataFrame()
+    table = pd.concat(tables, ignore_index=True)
+    if 'Score' in table:
+        table = table.sort_values('Score', ascending=False, kind='stable').reset_index(drop=True)
+    return table
+
+
+def run_scans(symbols, scans, on_error=None, **kwargs):
+    """מריץ את הסריקות על היקום ומחזיר מילון שם -> טבלת תוצאות (kwargs כמו ב-iter_scans)"""
+    parts = []
+    for batch, results, error in iter_scans(symbols, scans, **kwargs):
+        if error is not None and on_error is not None:
+            on_error(batch, error)
+        parts.append(results)
+    return {name: combine(parts, name) for name in scans}
+
+
+def scan_job(job, symbols, scans, **kwargs):
+    """עבודת רקע (jobs.JOBS) - כל קבוצה שהסתיימה מתווספת לתוצאות החלקיות של העבודה"""
+    for batch, results, error in iter_scans(symbols, scans, **kwargs):
+        job.report(len(batch), results, error=f"{batch[0]}..{batch[-1]}: {error}" if error else None)
+
+
+class ScanStore:
+    """תוצאות סריקות שחושבו מראש - קובץ תוצאות ו-meta JSON לכל שם (כתיבה אטומית)"""
+
+    def __init__(self, root=DEFAULT_SCAN_DIR):
+        self.root = root
+
+    def _path(self, name, ext):
+        return os.path.join(self.root, f"{name}.{ext}")
+
+    def _replace(self, path, write):
+        tmp = f"{path}.tmp"
+        write(tmp)
+        os.replace(tmp, path)
+
+    def save(self, name, results, meta, formats=('parquet',)):
+        os.makedirs(self.root, exist_ok=True)
+        for fmt in formats:
+            if fmt == 'parquet':
+                self._replace(self._path(name, fmt), lambda p: results.to_parquet(p, index=False))
+            elif fmt == 'csv':
+                self._replace(self._path(name, fmt), lambda p: results.to_csv(p, index=False))
+            else:
+                raise ValueError(f"פורמט לא נתמך: {fmt}")
+        meta = {**meta, 'name': name, 'rows': len(results), 'formats': list(formats),
+                'generated_at': datetime.now().isoformat(timespec='seconds')}
+
+        def write_meta(path):
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False, indent=2)
+        self._replace(self._path(name, 'json'), write_meta)
+        return meta
+
+    def list(self, kind=None):
+        """meta של כל הסריקות השמורות (או רק מסוג kind), מהחדשה לישנה"""
+        if not os.path.isdir(self.root):
+            return []
+        metas = []
+        for entry in os.listdir(self.root):
+            if not entry.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(self.root, entry), encoding='utf-8') as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if kind is None or meta.get('kind') == kind:
+                metas.append(meta)
+        return sorted(metas, key=lambda m: m.get('generated_at', ''), reverse=True)
+
+    def load(self, name):
+        """(תוצאות, meta) של סריקה שמורה, או (None, None)"""
+        try:
+            with open(self._path(name, 'json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        for fmt in FORMATS:
+            if fmt in meta.get('formats', []) and os.path.exists(self._path(name, fmt)):
+                reader = pd.read_parquet if fmt == 'parquet' else pd.read_csv
+                return reader(self._path(name, fmt)), meta
+        return None, None
+
+
+def _read_universe(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ProTrade batch scanner")
+    parser.add_argument('symbols', nargs='*', help="סימבולים (או --universe)")
+    parser.add_argument('--universe', help="קובץ עם סימבול בכל שורה")
+    parser.add_argument('--scan', action='append', choices=sorted(SCANS),
+                        help="סריקה בשם (אפשר כמה פעמים; ברירת מחדל - כולן)")
+    parser.add_argument('--screen', action='append', default=[], metavar='NAME=EXPR',
+                        help="ביטוי Screener נוסף בשם")
+    parser.add_argument('--format', default='parquet', help="parquet, csv או parquet,csv")
+    parser.add_argument('--output-dir', default=DEFAULT_SCAN_DIR)
+    parser.add_argument('--archive', action='store_true', help="קריאה מארכיון ה-memmap במקום הורדה")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--partial', action='store_true', help="כולל סימבולים עם היסטוריה קצרה")
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols) + (_read_universe(args.universe) if args.universe else [])
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols and not args.archive:
+        parser.error("no symbols given")
+    formats = [f.strip() for f in args.format.split(',') if f.strip()]
+    if set(formats) - set(FORMATS):
+        parser.error(f"unknown format: {args.format}")
+
+    scans = {name: SCANS[name] for name in (args.scan or sorted(SCANS))}
+    for item in args.screen:
+        name, sep, expression = item.partition('=')
+        if not sep:
+            parser.error(f"--screen expects NAME=EXPR: {item}")
+        scans[name.strip()] = {'kind': 'screen', 'expression': expression.strip()}
+    for spec in scans.values():
+        if spec['kind'] == 'screen':
+            compile_query(spec['expression'])
+
+    archive = None
+    if args.archive:
+        if not HistoryArchive.exists():
+            parser.error("no archive found (build one with archive.py)")
+        archive = HistoryArchive()
+
+    def report(batch, error):
+        print(f"batch {batch[0]}..{batch[-1]} failed: {error}", file=sys.stderr)
+
+    results = run_scans(symbols, scans, archive=archive, batch_size=args.batch_size, partial=args.partial,
+                        on_error=report)
+    store = ScanStore(args.output_dir)
+    universe = args.universe or ('archive' if args.archive and not symbols else ','.join(symbols[:5]))
+    for name, table in results.items():
+        spec = scans[name]
+        meta = store.save(name, table, {'kind': spec['kind'], 'spec': spec, 'universe': universe,
+                                        'symbols': len(symbols) if symbols else len(archive)}, formats)
+        print(f"{name}: {meta['rows']} rows -> {store.root}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+ProTrade Ultimate - Scanner Scoring
+טבלת חוקי ניקוד ודירוג של הסורק - מחושבת וקטורית לכל היקום בבת אחת
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# reason - הטקסט שמוצג, left/right - עמודות או מספרים, factor - מכפיל של right
+# op: '>' / '<' / 'between' (right הוא זוג גבולות, לא כולל)
+ScoreRule = namedtuple('ScoreRule', ['reason', 'left', 'op', 'right', 'factor'], defaults=[1.0])
+
+
+def scanner_rules(rsi_neutral=(40, 60), rsi_oversold=35, volume_mult=1.5):
+    """חוקי הניקוד של Market Scanner (כל חוק שמתקיים = נקודה)"""
+    return [
+        ScoreRule('Above SMA50', 'Close', '>', 'SMA50'),
+        ScoreRule('Above SMA200', 'Close', '>', 'SMA200'),
+        ScoreRule('RSI Neutral', 'RSI', 'between', rsi_neutral),
+        ScoreRule('RSI Oversold', 'RSI', '<', rsi_oversold),
+        ScoreRule('MACD Bullish', 'MACD', '>', 'MACD_signal'),
+        ScoreRule('High Volume', 'Volume', '>', 'Volume_SMA', volume_mult),
+    ]
+
+
+SCANNER_RULES = scanner_rules()
+
+
+def rule_columns(rules=SCANNER_RULES):
+    """העמודות שהחוקים קוראים - כדי לחשב רק את האינדיקטורים הדרושים"""
+    columns = []
+    for rule in rules:
+        for operand in (rule.left, rule.right):
+            if isinstance(operand, str) and operand not in columns:
+                columns.append(operand)
+    return columns
+
+# (ציון מינימלי, דירוג) - מהגבוה לנמוך
+RATINGS = [
+    (4, '🟢 Strong Buy'),
+    (3, '🟡 Buy'),
+    (2, '🔵 Watch'),
+]
+DEFAULT_RATING = '⚪ Neutral'
+
+
+def _operand(frame, value):
+    if isinstance(value, str):
+        return np.asarray(frame[value], dtype=float)
+    return value
+
+
+def rule_mask(frame, rule):
+    """מחשב חוק על כל השורות (או על מערך דו-ממדי) - NaN נחשב כלא מתקיים"""
+    left = _operand(frame, rule.left)
+    if rule.op == 'between':
+        low, high = rule.right
+        return (left > low) & (left < high)
+    right = _operand(frame, rule.right) * rule.factor
+    if rule.op == '>':
+        return left > right
+    if rule.op == '<':
+        return left < right
+    raise ValueError(f"אופרטור לא נתמך: {rule.op}")
+
+
+def score_values(frame, rules=SCANNER_RULES):
+    """ציון לכל שורה - עובד גם על מילון של מערכים (זמן × סימבולים)"""
+    return sum(rule_mask(frame, rule).astype(np.int64) for rule in rules)
+
+
+def rate(scores, ratings=RATINGS, default=DEFAULT_RATING):
+    """ממפה ציונים לדירוגים"""
+    scores = np.asarray(scores)
+    return np.select([scores >= threshold for threshold, _ in ratings],
+                     [label for _, label in ratings], default=default)
+
+
+class ScannerScoring:
+    """ניקוד ודירוג וקטורי של טבלת הנר האחרון"""
+
+    @staticmethod
+    def score(latest, rules=SCANNER_RULES, ratings=RATINGS, max_reasons=3):
+        """מחזיר Score, Rating ו-Signals לכל סימבול בטבלה"""
+        masks = np.column_stack([rule_mask(latest, rule) for rule in rules]) if len(rules) \
+            else np.zeros((len(latest), 0), dtype=bool)
+        scores = masks.sum(axis=1)
+
+        # רק max_reasons הסיבות הראשונות שהתקיימו נכנסות לטקסט
+        shown = masks & (np.cumsum(masks, axis=1) <= max_reasons)
+        signals = np.full(len(latest), '', dtype=object)
+        for col, rule in enumerate(rules):
+            sep = np.where(signals != '', ', ', '')
+            signals = np.where(shown[:, col], signals + sep + rule.reason, signals)
+
+        return pd.DataFrame({
+            'Score': scores,
+            'Rating': rate(scores, ratings),
+            'Signals': signals,
+        }, index=latest.index)
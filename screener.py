@@ -0,0 +1,241 @@
+"""
+ProTrade Ultimate - Screener Query Language
+שפת סינון הצהרתית - ביטוי מתקמפל פעם אחת לפרדיקט וקטורי על טבלת הנר האחרון
+
+דוגמה: RSI between 30 and 50 and Close > SMA200 and Volume > 1.5*Volume_SMA
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from indicators import INDICATOR_COLUMNS
+from panel import FIELDS
+
+KEYWORDS = {'and', 'or', 'not', 'between'}
+COMPARISONS = {
+    '>': np.greater,
+    '<': np.less,
+    '>=': np.greater_equal,
+    '<=': np.less_equal,
+    '==': np.equal,
+    '=': np.equal,
+    '!=': np.not_equal,
+}
+ARITHMETIC = {
+    '+': np.add,
+    '-': np.subtract,
+    '*': np.multiply,
+    '/': np.divide,
+}
+SUFFIXES = {'k': 1e3, 'm': 1e6, 'b': 1e9}
+
+# עמודות טבלת הנר האחרון שמותר להשתמש בהן בביטוי
+SCREEN_COLUMNS = tuple(FIELDS + INDICATOR_COLUMNS)
+
+TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<number>\d+(?:\.\d*)?|\.\d+)(?P<suffix>[kKmMbB](?![A-Za-z0-9_]))?
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<op>>=|<=|==|!=|[-+*/()<>=])
+    )""", re.VERBOSE)
+
+
+class QueryError(ValueError):
+    """שגיאת תחביר או עמודה לא קיימת בביטוי סינון"""
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise QueryError(f"תו לא צפוי במיקום {pos}: '{text[pos:pos + 10]}'")
+        if match.group('number'):
+            value = float(match.group('number'))
+            if match.group('suffix'):
+                value *= SUFFIXES[match.group('suffix').lower()]
+            tokens.append(('number', value))
+        elif match.group('name'):
+            name = match.group('name')
+            kind = 'keyword' if name.lower() in KEYWORDS else 'name'
+            tokens.append((kind, name.lower() if kind == 'keyword' else name))
+        else:
+            tokens.append(('op', match.group('op')))
+        pos = match.end()
+    return tokens
+
+
+class _Parser:
+    """מפרש רקורסיבי - כל צומת מחזיר (סוג, פונקציה על הטבלה)"""
+
+    def __init__(self, text, columns=None):
+        self.tokens = _tokenize(text)
+        self.pos = 0
+        self.columns = {c.lower(): c for c in columns} if columns is not None else None
+        self.referenced = set()
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _accept(self, kind, value=None):
+        tok_kind, tok_value = self._peek()
+        if tok_kind == kind and (value is None or tok_value == value):
+            self.pos += 1
+            return tok_value
+        return None
+
+    def _expect(self, kind, value=None):
+        result = self._accept(kind, value)
+        if result is None:
+            found = self._peek()[1]
+            raise QueryError(f"צפוי '{value or kind}' אבל נמצא '{found if found is not None else 'סוף הביטוי'}'")
+        return result
+
+    @staticmethod
+    def _require(node, kind, context):
+        if node[0] != kind:
+            expected = 'תנאי' if kind == 'bool' else 'ערך מספרי'
+            raise QueryError(f"{context}: צפוי {expected}")
+        return node[1]
+
+    def parse(self):
+        node = self._or()
+        if self.pos != len(self.tokens):
+            raise QueryError(f"טקסט מיותר בסוף הביטוי: '{self._peek()[1]}'")
+        return self._require(node, 'bool', 'ביטוי סינון')
+
+    def _or(self):
+        node = self._and()
+        while self._accept('keyword', 'or'):
+            left = self._require(node, 'bool', "or")
+            right = self._require(self._and(), 'bool', "or")
+            node = ('bool', lambda t, a=left, b=right: a(t) | b(t))
+        return node
+
+    def _and(self):
+        node = self._not()
+        while self._accept('keyword', 'and'):
+            left = self._require(node, 'bool', "and")
+            right = self._require(self._not(), 'bool', "and")
+            node = ('bool', lambda t, a=left, b=right: a(t) & b(t))
+        return node
+
+    def _not(self):
+        if self._accept('keyword', 'not'):
+            inner = self._require(self._not(), 'bool', "not")
+            return ('bool', lambda t, a=inner: ~a(t))
+        return self._comparison()
+
+    def _comparison(self):
+        node = self._arith()
+        if self._accept('keyword', 'between'):
+            value = self._require(node, 'num', "between")
+            low = self._require(self._arith(), 'num', "between")
+            self._expect('keyword', 'and')
+            high = self._require(self._arith(), 'num', "between")
+            return ('bool', lambda t, v=value, lo=low, hi=high: (v(t) >= lo(t)) & (v(t) <= hi(t)))
+
+        kind, op = self._peek()
+        if kind == 'op' and op in COMPARISONS:
+            self.pos += 1
+            left = self._require(node, 'num', op)
+            right = self._require(self._arith(), 'num', op)
+            func = COMPARISONS[op]
+            return ('bool', lambda t, a=left, b=right, f=func: f(a(t), b(t)))
+        return node
+
+    def _binary(self, operand, ops):
+        node = operand()
+        while True:
+            kind, op = self._peek()
+            if kind != 'op' or op not in ops:
+                return node
+            self.pos += 1
+            left = self._require(node, 'num', op)
+            right = self._require(operand(), 'num', op)
+            func = ARITHMETIC[op]
+            node = ('num', lambda t, a=left, b=right, f=func: f(a(t), b(t)))
+
+    def _arith(self):
+        return self._binary(self._term, ('+', '-'))
+
+    def _term(self):
+        return self._binary(self._unary, ('*', '/'))
+
+    def _unary(self):
+        if self._accept('op', '-'):
+            inner = self._require(self._unary(), 'num', '-')
+            return ('num', lambda t, a=inner: -a(t))
+        return self._atom()
+
+    def _atom(self):
+        number = self._accept('number')
+        if number is not None:
+            return ('num', lambda t, v=number: v)
+
+        name = self._accept('name')
+        if name is not None:
+            column = self._resolve(name)
+            self.referenced.add(column)
+            return ('num', lambda t, c=column: np.asarray(t[c], dtype=float))
+
+        if self._accept('op', '('):
+            node = self._or()
+            self._expect('op', ')')
+            return node
+
+        found = self._peek()[1]
+        raise QueryError(f"צפוי ערך, עמודה או '(' אבל נמצא '{found if found is not None else 'סוף הביטוי'}'")
+
+    def _resolve(self, name):
+        if self.columns is None:
+            return name
+        if name in self.columns.values():
+            return name
+        if name.lower() in self.columns:
+            return self.columns[name.lower()]
+        raise QueryError(f"עמודה לא מוכרת: '{name}'")
+
+
+class ScreenQuery:
+    """ביטוי סינון מקומפל"""
+
+    def __init__(self, text, predicate, columns):
+        self.text = text
+        self._predicate = predicate
+        self.columns = columns
+
+    def __repr__(self):
+        return f"ScreenQuery({self.text!r})"
+
+    @staticmethod
+    def compile(text, columns=None):
+        """מקמפל ביטוי סינון. columns - רשימת עמודות מותרות לבדיקה מוקדמת"""
+        if not text or not text.strip():
+            raise QueryError("ביטוי סינון ריק")
+        parser = _Parser(text, columns)
+        predicate = parser.parse()
+        return ScreenQuery(text, predicate, frozenset(parser.referenced))
+
+    def evaluate(self, table):
+        """מחזיר מסכה בוליאנית לכל שורה בטבלה (NaN אינו עובר תנאי השוואה)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mask = self._predicate(table)
+        return np.broadcast_to(np.asarray(mask, dtype=bool), (len(table),))
+
+    def filter(self, table):
+        """מחזיר רק את השורות שעברו את הסינון"""
+        missing = [c for c in self.columns if c not in table.columns]
+        if missing:
+            raise QueryError(f"עמודות חסרות בטבלה: {', '.join(sorted(missing))}")
+        return table[self.evaluate(table)]
+
+
+@lru_cache(maxsize=256)
+def compile_query(text, columns=SCREEN_COLUMNS):
+    """קימפול עם cache - מסך שמור מקומפל פעם אחת בלבד"""
+    return ScreenQuery.compile(text, columns)
@@ -0,0 +1,168 @@
+"""
+ProTrade Ultimate - Shared Market Cache
+cache משותף לכל הסשנים בתהליך, עם single-flight: בקשות מקבילות לאותו מפתח מפעילות קריאה אחת לספק
+"""
+
+import copy
+import functools
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+# ניקוי ערכים שפג תוקפם לכל היותר כל כך הרבה שניות (בכל גישה ל-cache)
+PURGE_SECONDS = 30
+
+
+def _copy(value):
+    """העתק לקורא - כמו st.cache_data, שינוי במקום לא דולף לסשנים אחרים"""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+class _Flight:
+    """חישוב שרץ כרגע - הממתינים מקבלים את אותה תוצאה (או את אותה חריגה)"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SharedCache:
+    """טבלת key -> ערך עם TTL, משותפת לכל ה-threads (כל סשן של streamlit רץ ב-thread משלו)"""
+
+    def __init__(self, name='default', copy_values=True):
+        self.name = name
+        self.copy_values = copy_values
+        self._values = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._next_purge = time.monotonic() + PURGE_SECONDS
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    def _out(self, value):
+        return _copy(value) if self.copy_values else value
+
+    def _lookup(self, key):
+        # נקרא תחת self._lock. ערך שפג תוקפו נמחק מיד, ואחת ל-PURGE_SECONDS נמחקים כל הפגים
+        now = time.monotonic()
+        if now >= self._next_purge:
+            self._purge(now)
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= now:
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key, default=None):
+        """העתק של ערך תקף מה-cache (בלי לחשב)"""
+        with self._lock:
+            entry = self._lookup(key)
+        return self._out(entry[0]) if entry is not None else default
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl)
+
+    def get_or_compute(self, key, compute, ttl):
+        """
+        מחזיר ערך תקף, או מחשב אותו פעם אחת בלבד גם כשכמה threads מבקשים אותו בו-זמנית.
+        כל קורא מקבל העתק משלו (copy_values). חריגה בחישוב מועברת לכל הממתינים ולא נשמרת.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                return self._out(entry[0])
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return self._out(flight.value)
+
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            self.set(key, flight.value, ttl)
+            return self._out(flight.value)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def clear(self, predicate=None):
+        """מוחק את כל הערכים (או רק מפתחות ש-predicate מחזיר עליהם True)"""
+        with self._lock:
+            if predicate is None:
+                self._values.clear()
+            else:
+                for key in [k for k in self._values if predicate(k)]:
+                    del self._values[key]
+
+    def _purge(self, now):
+        # נקרא תחת self._lock
+        for key in [k for k, (_, expires) in self._values.items() if expires <= now]:
+            del self._values[key]
+        self._next_purge = now + PURGE_SECONDS
+
+    def purge(self):
+        """מוחק ערכים שפג תוקפם"""
+        with self._lock:
+            self._purge(time.monotonic())
+
+    def stats(self):
+        return {'name': self.name, 'entries': len(self._values), 'hits': self.hits,
+                'misses': self.misses, 'coalesced': self.coalesced}
+
+
+MARKET_CACHE = SharedCache('market')
+
+
+def _freeze(value):
+    # רשימות/מילונים/סטים כמפתח hashable
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, set):
+        return frozenset(_freeze(v) for v in value)
+    return value
+
+
+def shared_cache(ttl, cache=MARKET_CACHE):
+    """
+    דקורטור במקום st.cache_data - cache אחד לכל הסשנים עם single-flight.
+    כל קורא מקבל העתק של התוצאה, כך שמותר לשנות אותה במקום. func.clear() מוחק את ערכי הפונקציה.
+    """
+    def decorator(func):
+        name = func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (name, _freeze(args), _freeze(kwargs))
+            return cache.get_or_compute(key, lambda: func(*args, **kwargs), ttl)
+
+        wrapper.clear = lambda: cache.clear(lambda key: key[0] == name)
+        return wrapper
+    return decorator
@@ -0,0 +1,160 @@
+"""
+ProTrade Ultimate - Signal Engine
+זיהוי אותות וקטורי על כל הנרות של סדרה או של פאנל סימבולים במעבר אחד,
+עם טבלת אירועים קומפקטית (שורה לכל אות שהופיע)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# name/icon - מה שמוצג, side - buy/sell/neutral, left/right - עמודות או מספרים, factor - מכפיל של right
+# op: '>' / '<' / 'cross_above' / 'cross_below' (חצייה מהנר הקודם לנוכחי)
+# text - תיאור, יכול לכלול ערכי עמודות של הנר ({RSI:.1f})
+SignalRule = namedtuple('SignalRule', ['name', 'icon', 'side', 'left', 'op', 'right', 'factor', 'text'],
+                        defaults=[1.0, ''])
+
+# האותות של detect_signals, באותו סדר
+SIGNAL_RULES = [
+    SignalRule('Golden Cross', '🟢', 'buy', 'SMA50', 'cross_above', 'SMA200',
+               text="אות קנייה חזק - SMA50 חצה מעל SMA200"),
+    SignalRule('Death Cross', '🔴', 'sell', 'SMA50', 'cross_below', 'SMA200',
+               text="אות מכירה חזק - SMA50 חצה מתחת ל-SMA200"),
+    SignalRule('RSI Oversold', '🟢', 'buy', 'RSI', '<', 30,
+               text="RSI נמוך ({RSI:.1f}) - אזור קנייה פוטנציאלי"),
+    SignalRule('RSI Overbought', '🔴', 'sell', 'RSI', '>', 70,
+               text="RSI גבוה ({RSI:.1f}) - אזור מכירה פוטנציאלי"),
+    SignalRule('MACD Cross Up', '🟢', 'buy', 'MACD', 'cross_above', 'MACD_signal',
+               text="MACD חצה מעל קו האות - מומנטום חיובי"),
+    SignalRule('MACD Cross Down', '🔴', 'sell', 'MACD', 'cross_below', 'MACD_signal',
+               text="MACD חצה מתחת לקו האות - מומנטום שלילי"),
+    SignalRule('BB Breakout Low', '🟡', 'neutral', 'Close', '<', 'BB_low',
+               text="המחיר מתחת ל-Bollinger Band התחתון"),
+    SignalRule('BB Breakout High', '🟡', 'neutral', 'Close', '>', 'BB_high',
+               text="המחיר מעל ל-Bollinger Band העליון"),
+    SignalRule('Volume Spike', '📊', 'neutral', 'Volume', '>', 'Volume_SMA', 2.0,
+               text="נפח מסחר חריג - פי 2 מהממוצע"),
+]
+
+NO_SIGNALS = ("⚪ No Signals", "אין אותות ברורים כרגע")
+
+EVENT_COLUMNS = ['Date', 'Symbol', 'Signal', 'Side', 'Close', 'BarsAgo']
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=float)
+    return values.reshape(-1, 1) if values.ndim == 1 else values
+
+
+def _previous(x):
+    """הערך בנר הקודם של אותה עמודה - מדלג על חורים של לוח מסחר של סימבול אחר"""
+    filled = pd.DataFrame(x).ffill().to_numpy()
+    return np.vstack([np.full((1, x.shape[1]), np.nan), filled[:-1]])
+
+
+def _operand(frame, value, cache):
+    if isinstance(value, str):
+        if value not in cache:
+            cache[value] = _as_2d(frame[value])
+        return cache[value]
+    return value
+
+
+def rule_masks(frame, rules=SIGNAL_RULES):
+    """
+    מסכה בוליאנית (זמן × סימבולים) לכל חוק - frame הוא פריים של סדרה או מילון עמודה -> מערך דו-ממדי.
+    NaN (כולל נר ראשון בחצייה) נחשב כלא מתקיים.
+    """
+    cache, previous, masks = {}, {}, []
+    with np.errstate(invalid='ignore'):
+        for rule in rules:
+            left = _operand(frame, rule.left, cache)
+            right = _operand(frame, rule.right, cache) * rule.factor
+            if rule.op == '>':
+                mask = left > right
+            elif rule.op == '<':
+                mask = left < right
+            elif rule.op in ('cross_above', 'cross_below'):
+                # a - b שומר על הסימן של ההשוואה (ושווה 0 רק כש-a == b)
+                now = left - right
+                key = (rule.left, rule.right, rule.factor)
+                if key not in previous:
+                    previous[key] = _previous(_as_2d(now))
+                before = previous[key]
+                mask = (before <= 0) & (now > 0) if rule.op == 'cross_above' else (before >= 0) & (now < 0)
+            else:
+                raise ValueError(f"אופרטור לא נתמך: {rule.op}")
+            masks.append(np.broadcast_to(mask, np.broadcast_shapes(np.shape(left), np.shape(right))))
+    return masks
+
+
+def _events(frame, index, symbols, rules):
+    close = _as_2d(frame['Close'])
+    present = ~np.isnan(close)
+    # כמה נרות של אותו סימבול אחרי כל נר (0 = הנר האחרון)
+    bars_ago = present.sum(axis=0) - np.cumsum(present, axis=0)
+
+    rows, cols, codes = [], [], []
+    for code, mask in enumerate(rule_masks(frame, rules)):
+        r, c = np.nonzero(mask & present)
+        rows.append(r)
+        cols.append(c)
+        codes.append(np.full(len(r), code, dtype=np.int16))
+    rows, cols, codes = np.concatenate(rows), np.concatenate(cols), np.concatenate(codes)
+    order = np.lexsort((codes, cols, rows))
+    rows, cols, codes = rows[order], cols[order], codes[order]
+
+    names = [rule.name for rule in rules]
+    sides = [rule.side for rule in rules]
+    return pd.DataFrame({
+        'Date': pd.DatetimeIndex(index)[rows],
+        'Symbol': pd.Categorical.from_codes(cols, categories=list(symbols)),
+        'Signal': pd.Categorical.from_codes(codes, categories=names),
+        'Side': pd.Categorical(np.asarray(sides, dtype=object)[codes] if len(codes) else [],
+                               categories=['buy', 'sell', 'neutral']),
+        'Close': close[rows, cols],
+        'BarsAgo': bars_ago[rows, cols].astype(np.int32),
+    }, columns=EVENT_COLUMNS)
+
+
+class SignalEngine:
+    """אותות היסטוריים וקטוריים - לגרף (סמנים), לסורק (אותות ב-N הנרות האחרונים) ולכרטיסי האותות"""
+
+    @staticmethod
+    def series_events(df, symbol=None, rules=SIGNAL_RULES):
+        """טבלת האירועים של סדרה אחת (פריים היסטוריה עם אינדיקטורים)"""
+        return _events(df, df.index, [symbol if symbol is not None else ''], rules)
+
+    @staticmethod
+    def panel_events(panel, rules=SIGNAL_RULES):
+        """טבלת האירועים לכל הסימבולים בפאנל (מילון שדה -> DataFrame תאריכים × סימבולים)"""
+        close = panel['Close']
+        return _events({col: frame.to_numpy(dtype=float) for col, frame in panel.items()},
+                       close.index, close.columns, rules)
+
+    @staticmethod
+    def recent(events, bars):
+        """רק אירועים מ-bars הנרות האחרונים של כל סימבול"""
+        return events[events['BarsAgo'] < bars]
+
+    @staticmethod
+    def summary(events, bars, symbols=None):
+        """שמות האותות ב-bars הנרות האחרונים לכל סימבול (מחרוזת אחת לסימבול, החדשים קודם)"""
+        recent = SignalEngine.recent(events, bars).sort_values('BarsAgo', kind='stable')
+        recent = recent.drop_duplicates(['Symbol', 'Signal'])
+        text = recent.groupby('Symbol', observed=True)['Signal'].agg(lambda s: ', '.join(s.astype(str)))
+        return text.reindex(symbols, fill_value='') if symbols is not None else text
+
+    @staticmethod
+    def latest(df, rules=SIGNAL_RULES):
+        """האותות של הנר האחרון כזוגות (כותרת, תיאור) - כמו detect_signals"""
+        if df is None or len(df) < 2:
+            return None
+        # שני הנרות האחרונים מספיקים - חצייה בודקת רק את הנר הקודם
+        tail = df.iloc[-2:]
+        masks = rule_masks(tail, rules)
+        values = tail.iloc[-1].to_dict()
+        signals = [(f"{rule.icon} {rule.name}", rule.text.format(**values))
+                   for rule, mask in zip(rules, masks) if mask[-1, 0]]
+        return signals if signals else [NO_SIGNALS]
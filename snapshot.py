@@ -0,0 +1,121 @@
+"""
+ProTrade Ultimate - Latest-Bar Snapshot
+טבלת "הנר האחרון" של כל היקום - שורה לכל סימבול, גישה ב-O(1)
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+from compact import compact_frame
+from indicators import INDICATOR_COLUMNS
+from panel import FIELDS, PanelIndicators
+
+SNAPSHOT_COLUMNS = FIELDS + INDICATOR_COLUMNS + ['Change %', 'Date', 'Sector']
+
+
+def _row_values(row):
+    values = {col: row[col] for col in FIELDS + INDICATOR_COLUMNS if col in row and pd.notna(row[col])}
+    if 'Close' in values and values.get('Open'):
+        values['Change %'] = (values['Close'] - values['Open']) / values['Open'] * 100
+    return values
+
+
+class SnapshotTable:
+    """טבלת snapshot מתעדכנת - מאונדקסת לפי סימבול וסקטור"""
+
+    def __init__(self, sectors=None, compact=False):
+        self.compact = compact
+        self._rows = {}
+        self._sector_of = {}
+        self._by_sector = {}
+        self._frame = None
+        self._lock = threading.Lock()
+        for sector, symbols in (sectors or {}).items():
+            for symbol in symbols:
+                self._sector_of.setdefault(symbol, sector)
+                self._by_sector.setdefault(sector, set()).add(symbol)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, symbol):
+        return symbol in self._rows
+
+    def upsert(self, symbol, values, timestamp, replace=True):
+        """
+        מעדכן שורה של סימבול. נר חדש מחליף את השורה, אותו נר ממוזג, נר ישן נדחה.
+        replace=False - גם נר חדש ממוזג לשורה הקיימת (עדכון מחיר בלבד לא מוחק את האינדיקטורים)
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tz is not None:
+            # yf.download מחזיר תאריכים בלי אזור זמן ו-history עם - משווים בזמן המקומי של הבורסה
+            timestamp = timestamp.tz_localize(None)
+        with self._lock:
+            current = self._rows.get(symbol)
+            if current is not None:
+                if timestamp < current['Date']:
+                    return False
+                if timestamp == current['Date'] or not replace:
+                    values = {**current, **values}
+            sector = self._sector_of.get(symbol, 'Other')
+            self._by_sector.setdefault(sector, set()).add(symbol)
+            self._rows[symbol] = {**values, 'Date': timestamp, 'Sector': sector}
+            self._frame = None
+        return True
+
+    def update(self, symbol, df, replace=True):
+        """מעדכן מהנר האחרון של פריים היסטוריה (עם או בלי אינדיקטורים; replace כמו ב-upsert)"""
+        if df is None or df.empty:
+            return False
+        return self.upsert(symbol, _row_values(df.iloc[-1]), df.index[-1], replace=replace)
+
+    def update_prices(self, data, symbols):
+        """
+        ממזג את הנר האחרון של כל סימבול מפריים yf.download (OHLCV בלבד) לשורות הקיימות -
+        האינדיקטורים והניקוד שסריקות כתבו נשמרים עד הסריקה הבאה
+        """
+        fields = PanelIndicators.split_fields(data, symbols)
+        for symbol in symbols:
+            bars = pd.DataFrame({field: frame[symbol] for field, frame in fields.items()}).dropna()
+            self.update(symbol, bars, replace=False)
+        return fields
+
+    def update_latest(self, latest):
+        """עדכון גורף מטבלת נר אחרון (שורה לסימבול, עמודת Date)"""
+        for symbol, row in zip(latest.index, latest.to_dict('records')):
+            self.upsert(symbol, _row_values(row), row['Date'])
+
+    def get(self, symbol):
+        """שורת הסימבול כמילון (או None)"""
+        row = self._rows.get(symbol)
+        return dict(row) if row is not None else None
+
+    def symbols(self, sector=None):
+        """כל הסימבולים בטבלה, או רק אלה של סקטור"""
+        with self._lock:
+            if sector is None:
+                return list(self._rows)
+            return [s for s in self._by_sector.get(sector, ()) if s in self._rows]
+
+    def frame(self, symbols=None, sector=None):
+        """הטבלה כ-DataFrame (נבנית מחדש רק אחרי עדכון)"""
+        with self._lock:
+            if self._frame is None:
+                self._frame = pd.DataFrame.from_dict(self._rows, orient='index') \
+                    .reindex(columns=SNAPSHOT_COLUMNS)
+                if self.compact:
+                    self._frame = compact_frame(self._frame, columns=None, pool=None)
+            frame = self._frame
+        if sector is not None:
+            frame = frame[frame['Sector'] == sector]
+        if symbols is not None:
+            frame = frame[frame.index.isin(list(symbols))]
+        return frame
+
+    def sector_performance(self, symbols=None, exclude=()):
+        """ממוצע שינוי יומי לכל סקטור"""
+        frame = self.frame(symbols)
+        frame = frame[~frame['Sector'].isin(list(exclude)) & np.isfinite(frame['Change %'].astype(float))]
+        return frame.groupby('Sector')['Change %'].mean()
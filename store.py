@@ -0,0 +1,208 @@
+"""
+ProTrade Ultimate - Local OHLCV Store
+אחסון מקומי של היסטוריית מחירים - קובץ Parquet לכל סימבול
+"""
+
+import json
+import os
+import threading
+from urllib.parse import quote
+
+import pandas as pd
+
+DEFAULT_STORE_DIR = os.environ.get(
+    'PROTRADE_STORE_DIR',
+    os.path.join(os.path.expanduser('~'), '.protrade', 'ohlcv')
+)
+
+# סדר התקופות של yfinance - תקופה ארוכה מכסה את כל הקצרות ממנה
+PERIOD_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', 'ytd', '1y', '2y', '5y', '10y', 'max']
+
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+# מספר נרות יומיים מינימלי בכל תקופה (ימי מסחר בבורסה האמריקאית, אחרי חגים)
+PERIOD_BARS = {
+    '1d': 1,
+    '5d': 5,
+    '1mo': 20,
+    '3mo': 62,
+    '6mo': 124,
+    '1y': 250,
+    '2y': 502,
+    '5y': 1256,
+    '10y': 2514,
+}
+
+# שינוי יחסי במחיר סגירה של בר סגור שמעיד על התאמה רטרואקטיבית (דיבידנד/ספליט)
+ADJUSTMENT_TOLERANCE = 1e-6
+
+
+def period_start(period, now=None):
+    """מחזיר את תחילת חלון הזמן של תקופה (None עבור max)"""
+    now = now if now is not None else pd.Timestamp.now()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return now.normalize().replace(month=1, day=1)
+    return now - PERIOD_OFFSETS[period]
+
+
+def period_covers(longer, period):
+    """האם היסטוריה של תקופה longer מכילה את כל התקופה period"""
+    if longer not in PERIOD_ORDER or period not in PERIOD_ORDER:
+        return False
+    return PERIOD_ORDER.index(longer) >= PERIOD_ORDER.index(period)
+
+
+def period_for_bars(bars):
+    """התקופה הקצרה ביותר שמכילה לפחות bars נרות יומיים ('max' אם אין כזו)"""
+    for period in PERIOD_ORDER:
+        if PERIOD_BARS.get(period, 0) >= bars:
+            return period
+    return 'max'
+
+
+def slice_period(df, period, now=None):
+    """
+    חותך היסטוריה לחלון של התקופה המבוקשת - יחסית לנר האחרון (או ל-now), כמו ה-FixtureProvider,
+    כך שהיסטוריה מוקלטת או ישנה לא נחתכת לחלון ריק
+    """
+    if df is None or df.empty:
+        return df
+    start = period_start(period, now if now is not None else df.index[-1])
+    if start is None:
+        return df
+    return df[df.index >= start].copy()
+
+
+class OHLCVStore:
+    """מאגר מקומי של נרות OHLCV עם עדכון אינקרמנטלי"""
+
+    MANIFEST = '_manifest.json'
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._symbol_locks = {}
+
+    def _path(self, symbol):
+        return os.path.join(self.root, f"{quote(symbol, safe='')}.parquet")
+
+    def _symbol_lock(self, symbol):
+        with self._lock:
+            return self._symbol_locks.setdefault(symbol, threading.Lock())
+
+    def _read_manifest(self):
+        try:
+            with open(os.path.join(self.root, self.MANIFEST), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, symbol, period):
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest[symbol] = {'period': period}
+            tmp = os.path.join(self.root, f"{self.MANIFEST}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            os.replace(tmp, os.path.join(self.root, self.MANIFEST))
+
+    def covers(self, symbol, period):
+        """האם ההיסטוריה השמורה כבר מכסה את התקופה המבוקשת"""
+        return period_covers(self._read_manifest().get(symbol, {}).get('period'), period)
+
+    def load(self, symbol):
+        """טוען היסטוריה שמורה של סימבול"""
+        path = self._path(symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            return pd.read_parquet(path)
+        except Exception:
+            return None
+
+    def save(self, symbol, df, period=None):
+        """שומר היסטוריה של סימבול (כתיבה אטומית)"""
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(symbol)
+        tmp = f"{path}.tmp"
+        df.to_parquet(tmp)
+        os.replace(tmp, path)
+        if period is not None:
+            self._write_manifest(symbol, period)
+
+    @staticmethod
+    def merge(stored, fresh):
+        """ממזג נרות חדשים לתוך ההיסטוריה - הנר החדש גובר על הישן"""
+        if stored is None or stored.empty:
+            return fresh
+        if fresh is None or fresh.empty:
+            return stored
+        merged = pd.concat([stored, fresh])
+        merged = merged[~merged.index.duplicated(keep='last')]
+        return merged.sort_index()
+
+    @staticmethod
+    def _adjusted(stored, fresh):
+        """מזהה התאמה רטרואקטיבית של מחירים שמחייבת הורדה מלאה"""
+        if len(stored) < 2 or fresh is None or fresh.empty:
+            return False
+        for col in ('Dividends', 'Stock Splits'):
+            if col in fresh.columns and (fresh[col].iloc[1:] != 0).any():
+                return True
+        ts = stored.index[-2]
+        if ts not in fresh.index:
+            return False
+        old = stored['Close'].loc[ts]
+        new = fresh['Close'].loc[ts]
+        return abs(new - old) > ADJUSTMENT_TOLERANCE * abs(old)
+
+    def sync(self, symbol, period, fetch):
+        """
+        מחזיר את כל ההיסטוריה השמורה (לפחות התקופה המבוקשת) ומוריד רק נרות חדשים.
+        fetch(period=...) או fetch(start=...) מחזיר DataFrame של yfinance.
+        """
+        with self._symbol_lock(symbol):
+            stored = self.load(symbol)
+
+            if stored is None or stored.empty or not self.covers(symbol, period):
+                fresh = fetch(period=period)
+                if fresh is None or fresh.empty:
+                    return stored
+                merged = self.merge(stored, fresh)
+                self.save(symbol, merged, period)
+                return merged
+
+            # חפיפה של שני נרות: הנר האחרון עשוי להיות חלקי, הקודם משמש לזיהוי התאמות
+            start = stored.index[-2] if len(stored) > 1 else stored.index[-1]
+            try:
+                fresh = fetch(start=start.strftime('%Y-%m-%d'))
+            except Exception:
+                return stored
+
+            if self._adjusted(stored, fresh):
+                stored_period = self._read_manifest()[symbol]['period']
+                try:
+                    full = fetch(period=stored_period)
+                except Exception:
+                    # ההורדה המלאה נכשלה - ממשיכים עם המיזוג הרגיל עד הסנכרון הבא
+                    full = None
+                if full is not None and not full.empty:
+                    self.save(symbol, full, stored_period)
+                    return full
+
+            merged = self.merge(stored, fresh)
+            if fresh is not None and not fresh.empty:
+                self.save(symbol, merged)
+            return merged
@@ -0,0 +1,207 @@
+"""
+ProTrade Ultimate - Parameter Sweep
+חיפוש grid או אקראי על ספי הסורק וחלונות הממוצעים, מפוזר על ProcessPoolExecutor.
+הפאנל ההיסטורי נכתב פעם אחת ל-shared memory וכל worker ממפה אותו בלי pickling של המערכים,
+כך שכל משימה שולחת רק מילון פרמטרים ומחזירה שורת סטטיסטיקות.
+
+    python sweep.py AAPL MSFT NVDA --period 5y --samples 200 --output sweep.csv
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import DEFAULT_COST_BPS, Backtester
+from panel import PanelIndicators
+from providers import get_provider
+from scoring import scanner_rules
+
+# מרחב ברירת המחדל - הערכים שהיום קבועים ב-scanner_rules וב-RATINGS, ומעט סביבם
+DEFAULT_SPACE = {
+    'rsi_low': [35, 40, 45],
+    'rsi_high': [60, 65],
+    'rsi_oversold': [30, 35],
+    'volume_mult': [1.5, 2.0],
+    'min_score': [2, 3, 4],
+    'sma_fast': [50],
+    'sma_slow': [200],
+}
+
+# העמודות שהחוקים קוראים (SMA50/SMA200 מוחלפים בחלונות של הפרמטרים)
+SWEEP_FIELDS = ['Close', 'Volume', 'RSI', 'MACD', 'MACD_signal', 'Volume_SMA']
+
+DEFAULT_METRIC = 'sharpe'
+
+
+def grid(space=DEFAULT_SPACE):
+    """כל הצירופים של המרחב (רשימת מילונים)"""
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def sample(space=DEFAULT_SPACE, n=50, seed=0):
+    """n צירופים אקראיים שונים מהמרחב (או כל ה-grid אם הוא קטן יותר)"""
+    combos = grid(space)
+    if n >= len(combos):
+        return combos
+    return random.Random(seed).sample(combos, n)
+
+
+def _rules(params):
+    rules = scanner_rules(
+        rsi_neutral=(params.get('rsi_low', 40), params.get('rsi_high', 60)),
+        rsi_oversold=params.get('rsi_oversold', 35),
+        volume_mult=params.get('volume_mult', 1.5),
+    )
+    windows = {'SMA50': f"SMA{params.get('sma_fast', 50)}", 'SMA200': f"SMA{params.get('sma_slow', 200)}"}
+    return [rule._replace(right=windows.get(rule.right, rule.right)) for rule in rules]
+
+
+class _SweepPanel:
+    """פאנל (מילון שדה -> DataFrame) מעל מערכים משותפים, עם cache של ממוצעים בחלונות נוספים"""
+
+    def __init__(self, arrays, index, symbols):
+        self.index = index
+        self.symbols = symbols
+        self.frames = {
+            field: pd.DataFrame(arr, index=index, columns=symbols, copy=False)
+            for field, arr in arrays.items()
+        }
+
+    def for_params(self, params):
+        for window in (params.get('sma_fast', 50), params.get('sma_slow', 200)):
+            name = f"SMA{window}"
+            if name not in self.frames:
+                self.frames[name] = pd.DataFrame(
+                    PanelIndicators.sma_array(self.frames['Close'].to_numpy(), window),
+                    index=self.index, columns=self.symbols
+                )
+        return self.frames
+
+
+def evaluate(panel, params, cost_bps=DEFAULT_COST_BPS):
+    """מריץ צירוף פרמטרים אחד ומחזיר את הפרמטרים עם סטטיסטיקות התיק"""
+    frames = panel.for_params(params)
+    min_score = params.get('min_score', 4)
+    positions = Backtester.score_positions(frames, min_score=min_score,
+                                           exit_score=params.get('exit_score', min_score), rules=_rules(params))
+    return {**params, **Backtester.run(frames, positions, cost_bps=cost_bps).stats()}
+
+
+# מצב ה-worker - נטען פעם אחת ב-initializer
+_WORKER = {}
+
+# fork מתוך תהליך עם threads (Streamlit, ה-fetcher, עבודות רקע) עלול להעתיק מנעולים נעולים -
+# ה-workers נוצרים מ-forkserver נקי (spawn איפה שאין forkserver)
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _init_worker(name, shape, fields, index, symbols, cost_bps):
+    # ה-workers חולקים את ה-resource tracker של האב - רק האב עושה unlink
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _WORKER['shm'] = shm
+    _WORKER['panel'] = _SweepPanel(dict(zip(fields, block)), index, symbols)
+    _WORKER['cost_bps'] = cost_bps
+
+
+def _run_one(params):
+    return evaluate(_WORKER['panel'], params, _WORKER['cost_bps'])
+
+
+class ParameterSweep:
+    """מריץ רשימת צירופים על פאנל אחד ומחזיר טבלה מדורגת"""
+
+    def __init__(self, panel, cost_bps=DEFAULT_COST_BPS, workers=None):
+        """panel - תוצאת PanelIndicators.compute עם לפחות SWEEP_FIELDS"""
+        self.panel = panel
+        self.cost_bps = cost_bps
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+
+    @staticmethod
+    def columns():
+        """האינדיקטורים שצריך לחשב בפאנל לפני ה-sweep"""
+        return SWEEP_FIELDS + ['SMA50', 'SMA200']
+
+    def _rank(self, rows, metric):
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+        table = table.sort_values(metric, ascending=False, na_position='last', kind='stable')
+        table.insert(0, 'Rank', np.arange(1, len(table) + 1))
+        return table.reset_index(drop=True)
+
+    def run(self, params, metric=DEFAULT_METRIC):
+        """מריץ את כל הצירופים (במקביל אם workers > 1) ומדרג לפי metric, מהגבוה לנמוך"""
+        params = list(params)
+        close = self.panel['Close']
+        index, symbols = close.index, list(close.columns)
+        fields = [f for f in self.panel if f in SWEEP_FIELDS or f in ('SMA50', 'SMA200')]
+        arrays = {f: self.panel[f].to_numpy(dtype=float) for f in fields}
+
+        if self.workers <= 1 or len(params) <= 1:
+            panel = _SweepPanel(arrays, index, symbols)
+            return self._rank([evaluate(panel, p, self.cost_bps) for p in params], metric)
+
+        shape = (len(fields),) + close.shape
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * 8)
+        try:
+            block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+            for i, field in enumerate(fields):
+                block[i] = arrays[field]
+            del arrays
+            with ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context(START_METHOD),
+                initializer=_init_worker, initargs=(shm.name, shape, fields, index, symbols, self.cost_bps)
+            ) as pool:
+                # כמה צירופים לכל הודעה - פחות תקורה בלי לאבד איזון עומסים
+                chunksize = max(1, len(params) // (self.workers * 4))
+                rows = list(pool.map(_run_one, params, chunksize=chunksize))
+            del block
+        finally:
+            shm.close()
+            shm.unlink()
+        return self._rank(rows, metric)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ProTrade scanner parameter sweep")
+    parser.add_argument('symbols', nargs='*', help="סימבולים (או --universe)")
+    parser.add_argument('--universe', help="קובץ עם סימבול בכל שורה")
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--samples', type=int, default=0, help="מספר צירופים אקראיים (0 = כל ה-grid)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=None, help="ברירת מחדל: מספר הליבות")
+    parser.add_argument('--cost-bps', type=float, default=DEFAULT_COST_BPS)
+    parser.add_argument('--metric', default=DEFAULT_METRIC)
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--output', help="שמירת הטבלה המדורגת כ-CSV")
+    args = parser.parse_args(argv)
+
+    symbols = list(args.symbols)
+    if args.universe:
+        with open(args.universe, encoding='utf-8') as f:
+            symbols += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    if not symbols:
+        parser.error("no symbols given")
+
+    data = get_provider().download(symbols, period=args.period)
+    panel = PanelIndicators.compute(data, symbols, columns=ParameterSweep.columns())
+    params = sample(DEFAULT_SPACE, args.samples, args.seed) if args.samples else grid(DEFAULT_SPACE)
+    table = ParameterSweep(panel, cost_bps=args.cost_bps, workers=args.workers).run(params, metric=args.metric)
+    print(table.head(args.top).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    if args.output:
+        table.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""
+בדיקות לארכיון ה-memmap: תאריכים עם אזור זמן וגבולות start/end כמחרוזת
+"""
+
+import numpy as np
+import pandas as pd
+
+from archive import HistoryArchive
+from panel import FIELDS
+
+
+def _frame(index):
+    close = np.arange(1.0, len(index) + 1)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 0.5, 'Close': close,
+                         'Volume': close * 1000}, index=index)
+
+
+def _archive(tmp_path, tz='America/New_York'):
+    index = pd.date_range('2024-01-01', periods=300, freq='B', tz=tz)
+    frames = {'AAA': _frame(index), 'BBB': _frame(index[50:])}
+    return HistoryArchive.build(str(tmp_path / 'archive'), list(frames), frames.get), index
+
+
+def test_dates_roundtrip_with_timezone(tmp_path):
+    archive, index = _archive(tmp_path)
+    reopened = HistoryArchive(archive.root)
+    assert reopened.dates.equals(index)
+    assert reopened.dates[0].year == 2024
+
+
+def test_string_bounds_on_tz_aware_archive(tmp_path):
+    archive, index = _archive(tmp_path)
+    start, end = '2024-06-03', '2024-06-28'
+    expected = index[(index >= pd.Timestamp(start, tz=index.tz)) & (index <= pd.Timestamp(end, tz=index.tz))]
+
+    assert archive.field('Close', start=start, end=end).shape == (2, len(expected))
+    assert set(archive.arrays(start=start)) == set(FIELDS)
+    assert archive.frame('AAA', start=start, end=end).index.equals(expected)
+    assert archive.panel(columns=['RSI'], start=start)['Close'].index[0] == expected[0]
+    latest = archive.latest(start=start, columns=['RSI'], min_bars=1)
+    assert list(latest.index) == ['AAA', 'BBB']
+
+
+def test_aware_bound_on_naive_archive(tmp_path):
+    archive, index = _archive(tmp_path, tz=None)
+    frame = archive.frame('AAA', start=pd.Timestamp('2024-06-03', tz='America/New_York'))
+    assert frame.index[0] == pd.Timestamp('2024-06-03')
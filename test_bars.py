@@ -0,0 +1,49 @@
+"""
+בדיקות למאגר הנרות התוך-יומיים: פינוי LRU וסדרות שהתיישנו
+"""
+
+import numpy as np
+import pandas as pd
+
+from bars import BarStore
+
+
+def _bars(periods=30, start='2024-06-03 09:30'):
+    index = pd.date_range(start, periods=periods, freq='5min', tz='America/New_York')
+    close = np.linspace(100.0, 110.0, periods)
+    return pd.DataFrame({'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close,
+                         'Volume': np.full(periods, 1000.0)}, index=index)
+
+
+def test_lru_eviction_bounds_series():
+    store = BarStore(capacity=64, max_series=2)
+    store.update('AAA', '5m', _bars())
+    store.update('BBB', '5m', _bars())
+    # קריאה מסמנת את AAA כבשימוש אחרון - BBB הוא הפחות בשימוש
+    assert store.frame('AAA', '5m') is not None
+    store.update('CCC', '5m', _bars())
+
+    assert len(store) == 2
+    assert store.frame('BBB', '5m') is None
+    assert store.last_timestamp('AAA', '5m') == _bars().index[-1]
+    assert store.stats()['evictions'] == 1
+    assert set(store._key_locks) <= {('AAA', '5m'), ('CCC', '5m')}
+
+
+def test_idle_series_expire():
+    store = BarStore(capacity=64, max_series=10, idle=0)
+    store.update('AAA', '5m', _bars())
+    store.update('AAA', '1h', _bars())
+
+    assert len(store) == 1
+    assert store.frame('AAA', '5m') is None
+    assert store.stats()['expired'] == 1
+
+
+def test_update_after_eviction_rebuilds():
+    store = BarStore(capacity=64, max_series=1)
+    store.update('AAA', '5m', _bars())
+    store.update('BBB', '5m', _bars())
+    frame = store.update('AAA', '5m', _bars(periods=5, start='2024-06-03 11:00'))
+    assert len(frame) == 5
+    assert store.frame('BBB', '5m') is None
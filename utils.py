@@ -1,297 +1,349 @@
-“””
+"""
 ProTrade Ultimate - Utility Functions
 מערכת עזר לניתוח מניות וניהול נתונים
-“””
+"""
 
-import yfinance as yf
 import pandas as pd
+import numpy as np
 import ta
-import feedparser
 import streamlit as st
 from datetime import datetime, timedelta
 import requests
+import os
+
+from archive import DEFAULT_ARCHIVE_DIR, HistoryArchive
+from bars import BarStore, INTRADAY_PERIODS
+from compact import compact_frame
+from history_cache import HistoryCache
+from indicators import IndicatorEngine
+from panel import PanelIndicators
+from providers import get_provider
+from quotes import QUOTES
+from scans import ScanStore
+from shared_cache import shared_cache
+from signals import SignalEngine
+from snapshot import SnapshotTable
+from store import OHLCVStore, slice_period
 
 class StockAnalyzer:
-“”“מחלקה לניתוח טכני של מניות”””
-
-```
-@staticmethod
-def calculate_indicators(df):
-    """מחשב את כל האינדיקטורים הטכניים"""
-    if df is None or df.empty or len(df) < 200:
-        return None
+    """מחלקה לניתוח טכני של מניות"""
+
+    @staticmethod
+    def calculate_indicators(df):
+        """מחשב את כל האינדיקטורים הטכניים"""
+        if df is None or df.empty or len(df) < 200:
+            return None
     
-    try:
-        # Moving Averages
-        df['SMA20'] = ta.trend.sma_indicator(df['Close'], window=20)
-        df['SMA50'] = ta.trend.sma_indicator(df['Close'], window=50)
-        df['SMA200'] = ta.trend.sma_indicator(df['Close'], window=200)
-        df['EMA12'] = ta.trend.ema_indicator(df['Close'], window=12)
-        df['EMA26'] = ta.trend.ema_indicator(df['Close'], window=26)
+        try:
+            # Moving Averages
+            df['SMA20'] = ta.trend.sma_indicator(df['Close'], window=20)
+            df['SMA50'] = ta.trend.sma_indicator(df['Close'], window=50)
+            df['SMA200'] = ta.trend.sma_indicator(df['Close'], window=200)
+            df['EMA12'] = ta.trend.ema_indicator(df['Close'], window=12)
+            df['EMA26'] = ta.trend.ema_indicator(df['Close'], window=26)
         
-        # RSI
-        df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
+            # RSI
+            df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
         
-        # MACD
-        macd = ta.trend.MACD(df['Close'])
-        df['MACD'] = macd.macd()
-        df['MACD_signal'] = macd.macd_signal()
-        df['MACD_diff'] = macd.macd_diff()
+            # MACD
+            macd = ta.trend.MACD(df['Close'])
+            df['MACD'] = macd.macd()
+            df['MACD_signal'] = macd.macd_signal()
+            df['MACD_diff'] = macd.macd_diff()
         
-        # Bollinger Bands
-        bb = ta.volatility.BollingerBands(df['Close'], window=20, window_dev=2)
-        df['BB_high'] = bb.bollinger_hband()
-        df['BB_mid'] = bb.bollinger_mavg()
-        df['BB_low'] = bb.bollinger_lband()
+            # Bollinger Bands
+            bb = ta.volatility.BollingerBands(df['Close'], window=20, window_dev=2)
+            df['BB_high'] = bb.bollinger_hband()
+            df['BB_mid'] = bb.bollinger_mavg()
+            df['BB_low'] = bb.bollinger_lband()
         
-        # Volume indicators
-        df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
+            # Volume indicators
+            df['Volume_SMA'] = df['Volume'].rolling(window=20).mean()
         
-        # ATR (Average True Range)
-        df['ATR'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'], window=14)
+            # ATR (Average True Range)
+            df['ATR'] = ta.volatility.average_true_range(df['High'], df['Low'], df['Close'], window=14)
         
-        return df
-    except Exception as e:
-        st.error(f"שגיאה בחישוב אינדיקטורים: {str(e)}")
-        return None
-
-@staticmethod
-def detect_signals(df):
-    """מזהה אותות קנייה/מכירה"""
-    if df is None or len(df) < 2:
-        return None
-    
-    signals = []
-    latest = df.iloc[-1]
-    prev = df.iloc[-2]
-    
-    # Golden Cross
-    if prev['SMA50'] <= prev['SMA200'] and latest['SMA50'] > latest['SMA200']:
-        signals.append(("🟢 Golden Cross", "אות קנייה חזק - SMA50 חצה מעל SMA200"))
-    
-    # Death Cross
-    if prev['SMA50'] >= prev['SMA200'] and latest['SMA50'] < latest['SMA200']:
-        signals.append(("🔴 Death Cross", "אות מכירה חזק - SMA50 חצה מתחת ל-SMA200"))
-    
-    # RSI Oversold/Overbought
-    if latest['RSI'] < 30:
-        signals.append(("🟢 RSI Oversold", f"RSI נמוך ({latest['RSI']:.1f}) - אזור קנייה פוטנציאלי"))
-    elif latest['RSI'] > 70:
-        signals.append(("🔴 RSI Overbought", f"RSI גבוה ({latest['RSI']:.1f}) - אזור מכירה פוטנציאלי"))
-    
-    # MACD Cross
-    if prev['MACD'] <= prev['MACD_signal'] and latest['MACD'] > latest['MACD_signal']:
-        signals.append(("🟢 MACD Cross Up", "MACD חצה מעל קו האות - מומנטום חיובי"))
-    elif prev['MACD'] >= prev['MACD_signal'] and latest['MACD'] < latest['MACD_signal']:
-        signals.append(("🔴 MACD Cross Down", "MACD חצה מתחת לקו האות - מומנטום שלילי"))
-    
-    # Bollinger Bands
-    if latest['Close'] < latest['BB_low']:
-        signals.append(("🟡 BB Breakout Low", "המחיר מתחת ל-Bollinger Band התחתון"))
-    elif latest['Close'] > latest['BB_high']:
-        signals.append(("🟡 BB Breakout High", "המחיר מעל ל-Bollinger Band העליון"))
-    
-    # Volume Surge
-    if latest['Volume'] > latest['Volume_SMA'] * 2:
-        signals.append(("📊 Volume Spike", "נפח מסחר חריג - פי 2 מהממוצע"))
-    
-    return signals if signals else [("⚪ No Signals", "אין אותות ברורים כרגע")]
+            return df
+        except Exception as e:
+            st.error(f"שגיאה בחישוב אינדיקטורים: {str(e)}")
+            return None
 
-@staticmethod
-def calculate_support_resistance(df, window=20):
-    """מחשב רמות תמיכה והתנגדות"""
-    if df is None or len(df) < window:
-        return None, None
+    @staticmethod
+    def detect_signals(df):
+        """מזהה אותות קנייה/מכירה בנר האחרון (אותם חוקים כמו סמני האותות בגרף)"""
+        return SignalEngine.latest(df)
+
+    @staticmethod
+    def calculate_support_resistance(df, window=20):
+        """מחשב רמות תמיכה והתנגדות"""
+        if df is None or len(df) < window:
+            return None, None
     
-    recent = df.tail(window)
-    resistance = recent['High'].max()
-    support = recent['Low'].min()
+        recent = df.tail(window)
+        resistance = recent['High'].max()
+        support = recent['Low'].min()
     
-    return support, resistance
-```
+        return support, resistance
 
 class MarketData:
-“”“מחלקה לטיפול בנתוני שוק”””
-
-```
-POPULAR_STOCKS = {
-    'Tech Giants': ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'AMD', 'INTC'],
-    'EV & Auto': ['TSLA', 'F', 'GM', 'RIVN', 'LCID'],
-    'Finance': ['JPM', 'BAC', 'GS', 'MS', 'WFC', 'V', 'MA'],
-    'Healthcare': ['JNJ', 'UNH', 'PFE', 'ABBV', 'TMO'],
-    'Crypto': ['BTC-USD', 'ETH-USD', 'BNB-USD'],
-    'Indices': ['^GSPC', '^DJI', '^IXIC', '^RUT']
-}
-
-@staticmethod
-@st.cache_data(ttl=300)
-def get_stock_data(symbol, period="1y"):
-    """מביא נתוני מניה עם cache של 5 דקות"""
-    try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(period=period)
+    """מחלקה לטיפול בנתוני שוק"""
+
+    POPULAR_STOCKS = {
+        'Tech Giants': ['AAPL', 'MSFT', 'GOOGL', 'AMZN', 'META', 'NVDA', 'AMD', 'INTC'],
+        'EV & Auto': ['TSLA', 'F', 'GM', 'RIVN', 'LCID'],
+        'Finance': ['JPM', 'BAC', 'GS', 'MS', 'WFC', 'V', 'MA'],
+        'Healthcare': ['JNJ', 'UNH', 'PFE', 'ABBV', 'TMO'],
+        'Crypto': ['BTC-USD', 'ETH-USD', 'BNB-USD'],
+        'Indices': ['^GSPC', '^DJI', '^IXIC', '^RUT']
+    }
+
+    # היסטוריה שמורה על הדיסק - רק נרות חדשים יורדים מהספק
+    STORE = OHLCVStore()
+
+    # מצב אינדיקטורים לכל סימבול - נר חדש מחושב ב-O(1)
+    INDICATORS = IndicatorEngine()
+
+    # פריימים בזיכרון ב-float32 בלי עמודות ספק מיותרות (PROTRADE_COMPACT_FRAMES=0 לביטול)
+    COMPACT_FRAMES = os.environ.get('PROTRADE_COMPACT_FRAMES', '1') != '0'
+
+    # הנר האחרון של כל סימבול שנטען - לסורק, לסינון ולמפת הסקטורים
+    SNAPSHOT = SnapshotTable(POPULAR_STOCKS, compact=COMPACT_FRAMES)
+
+    # פריימי היסטוריה עם אינדיקטורים בתקציב זיכרון קבוע (PROTRADE_HISTORY_CACHE_MB).
+    # סימבול שמפונה משחרר גם את מצב האינדיקטורים שלו - המנוע לא גדל מעבר ל-cache
+    HISTORY = HistoryCache(on_evict=INDICATORS.reset)
+
+    # נרות תוך-יומיים לכל (סימבול, אינטרוול) - ring buffer משותף לכל הסשנים
+    BARS = BarStore()
+
+    # ארכיון memmap של יקום גדול (PROTRADE_ARCHIVE_DIR) - נפתח בקריאה הראשונה ומחדש אחרי בנייה
+    ARCHIVE = None
+
+    # תוצאות סריקות שחושבו מראש ע"י scans.py (PROTRADE_SCAN_DIR)
+    SCANS = ScanStore()
+
+    @staticmethod
+    def get_archive():
+        """הארכיון הבינארי אם נבנה, אחרת None (נפתח מחדש כש-meta.json מתחלף)"""
+        version = HistoryArchive.version(DEFAULT_ARCHIVE_DIR)
+        archive = MarketData.ARCHIVE
+        if version is None:
+            archive = None
+        elif archive is None or archive.version != version:
+            archive = HistoryArchive(DEFAULT_ARCHIVE_DIR)
+        MarketData.ARCHIVE = archive
+        return archive
+
+    @staticmethod
+    def get_stock_data(symbol, period="1y"):
+        """מביא נתוני מניה עם cache של 5 דקות - תקופה קצרה נחתכת מתקופה ארוכה שכבר בזיכרון"""
+        try:
+            df = MarketData.HISTORY.get_or_load(
+                symbol, period, lambda: MarketData.load_history(symbol, period)
+            )
+            if df is None or df.empty or len(df) < 50:
+                return None
+            return df
         
-        if df.empty or len(df) < 50:
+        except Exception as e:
+            st.error(f"שגיאה בטעינת {symbol}: {str(e)}")
+            return None
+
+    @staticmethod
+    def load_history(symbol, period):
+        """כל ההיסטוריה השמורה עם אינדיקטורים (רק נרות חדשים יורדים ומחושבים)"""
+        provider = get_provider()
+        history = MarketData.STORE.sync(
+            symbol, period, lambda **kwargs: provider.history(symbol, **kwargs)
+        )
+    
+        if history is None or len(history) < 200:
             return None
+    
+        full = MarketData.INDICATORS.update(symbol, history)
+        MarketData.SNAPSHOT.update(symbol, full)
+        return compact_frame(full) if MarketData.COMPACT_FRAMES else full
+
+    @staticmethod
+    @shared_cache(ttl=60)
+    def get_batch(symbols, period="1d"):
+        """הורדה מרוכזת לכמה סימבולים (פריים של group_by='ticker') - משותפת לכל הסשנים"""
+        return get_provider().download(list(symbols), period=period)
+
+    @staticmethod
+    def get_intraday_data(symbol, interval="5m", period="1d"):
+        """נרות תוך-יומיים (1m/5m/15m/1h) - בלי cache של streamlit, רק נרות מאז הנר האחרון יורדים"""
+        try:
+            provider = get_provider()
+            last = MarketData.BARS.last_timestamp(symbol, interval)
+            if last is None:
+                history = provider.history(symbol, period=INTRADAY_PERIODS[interval], interval=interval)
+            else:
+                # יום המסחר של הנר האחרון ואילך - חופף לנר האחרון כך שהוא מתעדכן אם עוד לא נסגר
+                history = provider.history(symbol, start=last.strftime('%Y-%m-%d'), interval=interval)
         
-        # הוסף אינדיקטורים
-        df = StockAnalyzer.calculate_indicators(df)
-        return df
+            full = MarketData.BARS.update(symbol, interval, history)
+            if full is None or full.empty:
+                return None
         
-    except Exception as e:
-        st.error(f"שגיאה בטעינת {symbol}: {str(e)}")
-        return None
-
-@staticmethod
-@st.cache_data(ttl=60)
-def get_ticker_data():
-    """מביא נתונים לפס הרץ"""
-    try:
-        tickers = ['^GSPC', '^IXIC', 'NVDA', 'AAPL', 'TSLA', 'BTC-USD', 'MSFT', 'AMZN']
-        data = yf.download(tickers, period="1d", progress=False, threads=True)
+            # התקופה נחתכת יחסית לנר האחרון - גם מחוץ לשעות המסחר
+            df = slice_period(full, period, now=full.index[-1])
+            if len(df) < 2:
+                return None
+            return df
         
-        ticker_items = []
-        for t in tickers:
-            try:
-                if len(tickers) > 1:
-                    close = data['Close'][t].iloc[-1]
-                    open_price = data['Open'][t].iloc[0]
-                else:
-                    close = data['Close'].iloc[-1]
-                    open_price = data['Open'].iloc[0]
+        except Exception as e:
+            st.error(f"שגיאה בטעינת {symbol} ({interval}): {str(e)}")
+            return None
+
+    @staticmethod
+    def get_ticker_data():
+        """מביא נתונים לפס הרץ - מטבלת הציטוטים המשותפת, בלי קריאת רשת לכל סשן"""
+        try:
+            tickers = ['^GSPC', '^IXIC', 'NVDA', 'AAPL', 'TSLA', 'BTC-USD', 'MSFT', 'AMZN']
+            quotes = QUOTES.quotes(tickers)
+        
+            ticker_items = []
+            for t in tickers:
+                try:
+                    close, change, _ = quotes[t]
                 
-                change = ((close - open_price) / open_price) * 100
-                symbol = "▲" if change >= 0 else "▼"
-                color = "#00ff88" if change >= 0 else "#ff0055"
+                    symbol = "▲" if change >= 0 else "▼"
+                    color = "#00ff88" if change >= 0 else "#ff0055"
                 
-                display_name = t.replace('^', '').replace('-USD', '')
-                ticker_items.append(f'<span style="color:{color}">{display_name}: ${close:,.0f} {symbol}{abs(change):.1f}%</span>')
-            except:
-                continue
+                    display_name = t.replace('^', '').replace('-USD', '')
+                    ticker_items.append(f'<span style="color:{color}">{display_name}: ${close:,.0f} {symbol}{abs(change):.1f}%</span>')
+                except:
+                    continue
         
-        return " &nbsp;&nbsp;|&nbsp;&nbsp; ".join(ticker_items)
-    except:
-        return '🔴 לא ניתן לטעון נתוני שוק'
-
-@staticmethod
-@st.cache_data(ttl=600)
-def get_stock_info(symbol):
-    """מביא מידע בסיסי על המניה"""
-    try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        return {
-            'name': info.get('longName', symbol),
-            'sector': info.get('sector', 'N/A'),
-            'industry': info.get('industry', 'N/A'),
-            'marketCap': info.get('marketCap', 0),
-            'pe_ratio': info.get('trailingPE', 0),
-            'dividend': info.get('dividendYield', 0),
-            'beta': info.get('beta', 0),
-            '52w_high': info.get('fiftyTwoWeekHigh', 0),
-            '52w_low': info.get('fiftyTwoWeekLow', 0)
-        }
-    except:
-        return None
-```
+            return " &nbsp;&nbsp;|&nbsp;&nbsp; ".join(ticker_items)
+        except:
+            return '🔴 לא ניתן לטעון נתוני שוק'
+
+    @staticmethod
+    def get_index_quotes(tickers):
+        """מחיר ושינוי יומי לכמה סימבולים - מטבלת הציטוטים המשותפת"""
+        return {t: (quote.price, quote.change) for t, quote in QUOTES.quotes(tickers).items()}
+
+    @staticmethod
+    @shared_cache(ttl=600)
+    def get_stock_info(symbol):
+        """מביא מידע בסיסי על המניה"""
+        try:
+            info = get_provider().info(symbol)
+            return {
+                'name': info.get('longName', symbol),
+                'sector': info.get('sector', 'N/A'),
+                'industry': info.get('industry', 'N/A'),
+                'marketCap': info.get('marketCap', 0),
+                'pe_ratio': info.get('trailingPE', 0),
+                'dividend': info.get('dividendYield', 0),
+                'beta': info.get('beta', 0),
+                '52w_high': info.get('fiftyTwoWeekHigh', 0),
+                '52w_low': info.get('fiftyTwoWeekLow', 0)
+            }
+        except:
+            return None
 
 class NewsProvider:
-“”“מחלקה לטיפול בחדשות”””
-
-```
-@staticmethod
-@st.cache_data(ttl=600)
-def get_market_news():
-    """מביא חדשות שוק"""
-    sources = [
-        ("https://news.google.com/rss/search?q=stock+market&hl=en&gl=US&ceid=US:en", "Global Market"),
-        ("https://news.google.com/rss/search?q=nasdaq+nyse&hl=en&gl=US&ceid=US:en", "US Markets"),
-    ]
+    """מחלקה לטיפול בחדשות"""
+
+    @staticmethod
+    @shared_cache(ttl=600)
+    def get_market_news():
+        """מביא חדשות שוק"""
+        sources = [
+            ("https://news.google.com/rss/search?q=stock+market&hl=en&gl=US&ceid=US:en", "Global Market"),
+            ("https://news.google.com/rss/search?q=nasdaq+nyse&hl=en&gl=US&ceid=US:en", "US Markets"),
+        ]
+    
+        # כל הפידים במקביל
+        feeds = get_provider().news([url for url, _ in sources])
     
-    all_news = []
-    for url, source in sources:
+        all_news = []
+        for feed, (url, source) in zip(feeds, sources):
+            try:
+                for entry in feed.entries[:3]:
+                    all_news.append({
+                        'title': entry.title,
+                        'link': entry.link,
+                        'published': entry.get('published', 'N/A'),
+                        'source': source
+                    })
+            except:
+                continue
+    
+        return all_news[:10]
+
+    @staticmethod
+    @shared_cache(ttl=600)
+    def get_israel_news():
+        """חדשות מישראל"""
         try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:3]:
-                all_news.append({
-                    'title': entry.title,
-                    'link': entry.link,
-                    'published': entry.get('published', 'N/A'),
-                    'source': source
-                })
+            url = "https://news.google.com/rss/search?q=בורסה+תל+אביב&hl=he&gl=IL&ceid=IL:he"
+            feed = get_provider().news([url])[0]
+            return feed.entries[:8]
         except:
-            continue
-    
-    return all_news[:10]
-
-@staticmethod
-@st.cache_data(ttl=600)
-def get_israel_news():
-    """חדשות מישראל"""
-    try:
-        url = "https://news.google.com/rss/search?q=בורסה+תל+אביב&hl=he&gl=IL&ceid=IL:he"
-        feed = feedparser.parse(url)
-        return feed.entries[:8]
-    except:
-        return []
-```
+            return []
 
 class Portfolio:
-“”“מחלקה לניהול תיק השקעות”””
-
-```
-@staticmethod
-def calculate_portfolio_value(holdings):
-    """מחשב ערך תיק"""
-    total_value = 0
-    total_cost = 0
-    details = []
+    """מחלקה לניהול תיק השקעות"""
+
+    @staticmethod
+    @shared_cache(ttl=60)
+    def get_prices(symbols):
+        """מביא מחיר אחרון לכל הסימבולים בבקשה אחת"""
+        symbols = list(symbols)
+        data = get_provider().download(symbols, period="1d")
+        fields = MarketData.SNAPSHOT.update_prices(data, symbols)
+        return fields['Close'].ffill().iloc[-1].dropna()
+
+    @staticmethod
+    def calculate_portfolio_value(holdings):
+        """מחשב ערך תיק"""
+        if not holdings:
+            return {'total_value': 0, 'total_cost': 0, 'total_profit': 0, 'total_return': 0, 'holdings': []}
     
-    for symbol, data in holdings.items():
         try:
-            stock = yf.Ticker(symbol)
-            current_price = stock.history(period="1d")['Close'].iloc[-1]
-            
-            shares = data['shares']
-            avg_cost = data['avg_cost']
-            
-            current_value = shares * current_price
-            cost_basis = shares * avg_cost
-            profit = current_value - cost_basis
-            profit_pct = (profit / cost_basis) * 100
-            
-            total_value += current_value
-            total_cost += cost_basis
-            
-            details.append({
-                'Symbol': symbol,
-                'Shares': shares,
-                'Avg Cost': avg_cost,
-                'Current Price': current_price,
-                'Value': current_value,
-                'Profit/Loss': profit,
-                'Return %': profit_pct
-            })
-        except:
-            continue
+            prices = Portfolio.get_prices(tuple(sorted(holdings)))
+        except Exception:
+            prices = pd.Series(dtype=float)
     
-    return {
-        'total_value': total_value,
-        'total_cost': total_cost,
-        'total_profit': total_value - total_cost,
-        'total_return': ((total_value - total_cost) / total_cost * 100) if total_cost > 0 else 0,
-        'holdings': details
-    }
-```
+        # חישוב וקטורי על טבלת האחזקות
+        df = pd.DataFrame.from_dict(holdings, orient='index')
+        df['Current Price'] = prices.reindex(df.index)
+        df = df.dropna(subset=['Current Price'])
+    
+        df['Value'] = df['shares'] * df['Current Price']
+        cost_basis = df['shares'] * df['avg_cost']
+        df['Profit/Loss'] = df['Value'] - cost_basis
+        with np.errstate(divide='ignore', invalid='ignore'):
+            df['Return %'] = df['Profit/Loss'] / cost_basis * 100
+    
+        details = df.rename(columns={'shares': 'Shares', 'avg_cost': 'Avg Cost'}) \
+            .rename_axis('Symbol').reset_index()[
+                ['Symbol', 'Shares', 'Avg Cost', 'Current Price', 'Value', 'Profit/Loss', 'Return %']
+            ]
+    
+        total_value = df['Value'].sum()
+        total_cost = cost_basis.sum()
+    
+        return {
+            'total_value': total_value,
+            'total_cost': total_cost,
+            'total_profit': total_value - total_cost,
+            'total_return': ((total_value - total_cost) / total_cost * 100) if total_cost > 0 else 0,
+            'holdings': details.to_dict('records')
+        }
 
 def convert_df_to_csv(df):
-“”“המרת DataFrame ל-CSV להורדה”””
-return df.to_csv(index=True).encode(‘utf-8-sig’)
+    """המרת DataFrame ל-CSV להורדה"""
+    return df.to_csv(index=True).encode('utf-8-sig')
 
 def get_color_for_value(value):
-“”“מחזיר צבע בהתאם לערך חיובי/שלילי”””
-if value > 0:
-return “#00ff88”
-elif value < 0:
-return “#ff0055”
-return “#ffffff”
+    """מחזיר צבע בהתאם לערך חיובי/שלילי"""
+    if value > 0:
+        return "#00ff88"
+    elif value < 0:
+        return "#ff0055"
+    return "#ffffff"